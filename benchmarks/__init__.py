@@ -0,0 +1 @@
+"""Benchmarks of the API, run them with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,218 @@
+"""
+Shared parts of the benchmark suite.
+
+Benchmarks run against a database of their own on the configured
+Postgres server, it's created from the models before a run and
+dropped afterwards, like the one of the tests. The tarkov market API
+is replaced with a stub, so nothing leaves the machine.
+"""
+import json
+import math
+import platform
+import random
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from httpx import MockTransport, Request, Response, codes
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from tarkov_calculator_api.calculator.rates import Currency
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.db.utils import create_database, drop_database
+from tarkov_calculator_api.services.tarkov_market import (
+    TarkovMarketClient,
+    create_tarkov_market_client,
+)
+from tarkov_calculator_api.settings import settings
+
+# Database the benchmarks create and drop, never the configured one.
+BENCHMARK_DB_BASE = "tarkov_calculator_api_benchmark"
+# Seed of generated data, so every run sees the same items.
+SEED = 20261018
+MILLISECONDS = 1000
+# Reported percentiles of latencies.
+PERCENTILES = (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99))
+MAX_PRICE = 1000000
+MAX_BASE_PRICE = 100000
+WORDS = (
+    "ammo",
+    "armor",
+    "bolts",
+    "case",
+    "gas",
+    "helmet",
+    "key",
+    "magazine",
+    "medkit",
+    "nuts",
+    "rifle",
+    "scope",
+    "sugar",
+    "tape",
+    "water",
+)
+
+Result = Dict[str, Any]
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of sorted values.
+
+    :param ordered: values sorted in ascending order.
+    :param fraction: percentile as a fraction, e.g. 0.95.
+    :return: percentile, 0 if there are no values.
+    """
+    if not ordered:
+        return 0
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(name: str, latencies: Sequence[float], elapsed: float) -> Result:
+    """
+    Summarize latencies of a benchmark.
+
+    :param name: name of the benchmark.
+    :param latencies: seconds every operation took.
+    :param elapsed: wall clock seconds of the whole run.
+    :return: operation count, throughput and latencies in milliseconds.
+    """
+    ordered = sorted(latencies)
+    count = len(ordered)
+    summary: Result = {
+        "name": name,
+        "count": count,
+        "throughput": count / elapsed if elapsed else 0,
+        "mean_ms": sum(ordered) / count * MILLISECONDS if count else 0,
+    }
+    for key, fraction in PERCENTILES:
+        summary[key] = percentile(ordered, fraction) * MILLISECONDS
+    summary["max_ms"] = percentile(ordered, 1) * MILLISECONDS
+    return summary
+
+
+def report(results: Sequence[Result]) -> None:
+    """
+    Print results as a table.
+
+    :param results: summaries of benchmarks.
+    """
+    header = "{0:<32} {1:>8} {2:>10} {3:>9} {4:>9} {5:>9}".format(
+        "benchmark",
+        "count",
+        "ops/s",
+        "p50 ms",
+        "p95 ms",
+        "p99 ms",
+    )
+    print(header)  # noqa: WPS421
+    for result in results:
+        row = "{0:<32} {1:>8} {2:>10.0f} {3:>9.3f} {4:>9.3f} {5:>9.3f}".format(
+            result["name"],
+            result["count"],
+            result["throughput"],
+            result["p50_ms"],
+            result["p95_ms"],
+            result["p99_ms"],
+        )
+        print(row)  # noqa: WPS421
+
+
+def write_results(
+    path: Optional[Path],
+    suite: str,
+    parameters: Dict[str, Any],
+    results: List[Result],
+) -> None:
+    """
+    Write results to a JSON file, so runs can be compared.
+
+    :param path: file to write, nothing is written if it's None.
+    :param suite: name of the benchmark suite.
+    :param parameters: parameters of the run.
+    :param results: summaries of benchmarks.
+    """
+    if path is None:
+        return
+    document = {
+        "suite": suite,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2))
+
+
+def item_names(count: int) -> List[str]:
+    """
+    Generate unique, reproducible item names.
+
+    Currencies are always included, so conversions have rates.
+
+    :param count: number of names.
+    :return: names.
+    """
+    generator = random.Random(SEED)
+    names = [currency.value for currency in Currency]
+    while len(names) < count:
+        words = generator.sample(WORDS, 3)
+        words.append(str(len(names)))
+        names.append(" ".join(words))
+    return names[:count]
+
+
+@asynccontextmanager
+async def benchmark_database(items: int) -> AsyncIterator[AsyncEngine]:
+    """
+    Create the benchmark database and fill it with items.
+
+    :param items: number of items to create.
+    :yield: engine connected to the database.
+    """
+    from tarkov_calculator_api.db.meta import meta  # noqa: WPS433
+    from tarkov_calculator_api.db.models import load_all_models  # noqa: WPS433
+
+    load_all_models()
+    settings.db_base = BENCHMARK_DB_BASE
+    await create_database()
+    engine = create_async_engine(str(settings.db_url))
+    try:  # noqa: WPS501
+        async with engine.begin() as connection:
+            await connection.run_sync(meta.create_all)
+        async with AsyncSession(engine) as session:
+            generator = random.Random(SEED)
+            await TarkovItemDAO(session).load_tarkov_items(
+                (
+                    name,
+                    generator.randint(1, MAX_PRICE),
+                    generator.randint(1, MAX_BASE_PRICE),
+                )
+                for name in item_names(items)
+            )
+        yield engine
+    finally:
+        await engine.dispose()
+        await drop_database()
+
+
+def stub_market_client() -> TarkovMarketClient:
+    """
+    Create tarkov market client answering from memory.
+
+    Every item exists and costs the same, so refreshes
+    go through the whole path without leaving the process.
+
+    :return: tarkov market client.
+    """
+
+    def handler(request: Request) -> Response:  # noqa: WPS430
+        name = request.url.params.get("q", "")
+        item = {"name": name, "price": 1, "basePrice": 1}
+        return Response(codes.OK, json=[item])
+
+    return create_tarkov_market_client(transport=MockTransport(handler))
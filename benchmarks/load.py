@@ -0,0 +1,265 @@
+"""
+Load test of the whole application.
+
+The application is built with ``get_app()`` and started like a worker,
+with its own engine, cache, exchange rates and search index,
+against a benchmark database on the local Postgres. The refresh
+scheduler is turned off and the tarkov market client is a stub,
+so nothing leaves the machine.
+
+A fixed number of requests from a mix of read endpoints is sent
+by concurrent clients in-process, so the numbers are those
+of a single worker, without network and HTTP server overhead.
+
+Usage::
+
+    python -m benchmarks.load --concurrency 32 --requests 5000 --output load.json
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from pathlib import Path
+from random import Random
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI
+from httpx import AsyncClient, Response
+
+from benchmarks.common import (
+    SEED,
+    WORDS,
+    Result,
+    benchmark_database,
+    report,
+    stub_market_client,
+    summarize,
+    write_results,
+)
+from tarkov_calculator_api.settings import settings
+from tarkov_calculator_api.web.application import get_app
+
+DEFAULT_ITEMS = 5000
+DEFAULT_CONCURRENCY = 32
+DEFAULT_REQUESTS = 5000
+# Requests sent by every client before measuring.
+WARMUP_REQUESTS = 10
+BATCH_SIZE = 20
+SEARCH_PREFIX_LENGTH = 3
+
+Scenario = Callable[[AsyncClient, Random], Awaitable[Response]]
+Samples = Dict[str, List[float]]
+
+
+class ScenarioMix:
+    """Requests sent to the application, picked at random."""
+
+    def __init__(self, app: FastAPI, items: int) -> None:
+        self.app = app
+        self.items = items
+
+    def scenarios(self) -> Dict[str, Scenario]:
+        """
+        Get every scenario by name.
+
+        :return: scenarios.
+        """
+        return {
+            "GET /tarkov_item/": self.item_list,
+            "GET /tarkov_item/{id}": self.item,
+            "GET /tarkov_item/batch": self.batch,
+            "GET /tarkov_item/search": self.search,
+            "GET /convert/": self.convert,
+            "GET /tarkov_item/{id}/history": self.history,
+        }
+
+    async def item_list(self, client: AsyncClient, generator: Random) -> Response:
+        """
+        Get the first page of items.
+
+        :param client: client to send the request with.
+        :param generator: random generator of the client.
+        :return: response.
+        """
+        return await client.get(self.app.url_path_for("get_tarkov_item_models"))
+
+    async def item(self, client: AsyncClient, generator: Random) -> Response:
+        """
+        Get a random item.
+
+        :param client: client to send the request with.
+        :param generator: random generator of the client.
+        :return: response.
+        """
+        url = self.app.url_path_for(
+            "get_tarkov_item_model_by_id",
+            tarkov_item_id=self._random_id(generator),
+        )
+        return await client.get(url)
+
+    async def batch(self, client: AsyncClient, generator: Random) -> Response:
+        """
+        Get a batch of random items.
+
+        :param client: client to send the request with.
+        :param generator: random generator of the client.
+        :return: response.
+        """
+        ids = [self._random_id(generator) for _ in range(BATCH_SIZE)]
+        url = self.app.url_path_for("get_tarkov_item_batch")
+        return await client.get(url, params={"ids": ids})
+
+    async def search(self, client: AsyncClient, generator: Random) -> Response:
+        """
+        Autocomplete a random word.
+
+        :param client: client to send the request with.
+        :param generator: random generator of the client.
+        :return: response.
+        """
+        query = generator.choice(WORDS)[:SEARCH_PREFIX_LENGTH]
+        url = self.app.url_path_for("search_tarkov_items")
+        return await client.get(url, params={"q": query})
+
+    async def convert(self, client: AsyncClient, generator: Random) -> Response:
+        """
+        Convert euros to roubles.
+
+        :param client: client to send the request with.
+        :param generator: random generator of the client.
+        :return: response.
+        """
+        return await client.get(
+            self.app.url_path_for("convert"),
+            params={"amount": 100, "source": "euro", "target": "rouble"},
+        )
+
+    async def history(self, client: AsyncClient, generator: Random) -> Response:
+        """
+        Get price history of a random item.
+
+        :param client: client to send the request with.
+        :param generator: random generator of the client.
+        :return: response.
+        """
+        url = self.app.url_path_for(
+            "get_tarkov_item_price_history",
+            tarkov_item_id=self._random_id(generator),
+        )
+        return await client.get(url)
+
+    def _random_id(self, generator: Random) -> int:
+        return generator.randint(1, self.items)
+
+
+async def _client_loop(  # noqa: WPS210
+    client: AsyncClient,
+    scenarios: Dict[str, Scenario],
+    remaining: List[int],
+    samples: Samples,
+    seed: int,
+) -> int:
+    generator = Random(seed)
+    names = sorted(scenarios)
+    errors = 0
+    while remaining[0] > 0:
+        remaining[0] -= 1
+        name = generator.choice(names)
+        started_at = time.perf_counter()
+        response = await scenarios[name](client, generator)
+        samples[name].append(time.perf_counter() - started_at)
+        if response.is_error:
+            errors += 1
+    return errors
+
+
+async def run_load(  # noqa: WPS210
+    app: FastAPI,
+    items: int,
+    concurrency: int,
+    requests: int,
+) -> Tuple[List[Result], int]:
+    """
+    Send requests to the application from concurrent clients.
+
+    :param app: started application.
+    :param items: number of items in the database.
+    :param concurrency: number of concurrent clients.
+    :param requests: total number of requests.
+    :return: summaries of every endpoint and of all requests,
+        and number of failed requests.
+    """
+    scenarios = ScenarioMix(app, items).scenarios()
+    samples: Samples = defaultdict(list)
+    remaining = [requests]
+    async with AsyncClient(app=app, base_url="http://benchmark") as client:
+        started_at = time.perf_counter()
+        errors = await asyncio.gather(
+            *[
+                _client_loop(client, scenarios, remaining, samples, SEED + index)
+                for index in range(concurrency)
+            ],
+        )
+        elapsed = time.perf_counter() - started_at
+    results = [summarize(name, samples[name], elapsed) for name in sorted(samples)]
+    every_sample = [sample for latencies in samples.values() for sample in latencies]
+    results.append(summarize("all", every_sample, elapsed))
+    return results, sum(errors)
+
+
+async def main(  # noqa: WPS211
+    items: int,
+    concurrency: int,
+    requests: int,
+    output: Optional[Path],
+    metrics: bool = True,
+) -> None:
+    """
+    Start the application, load it and report results.
+
+    :param items: number of items in the database.
+    :param concurrency: number of concurrent clients.
+    :param requests: total number of requests.
+    :param output: JSON file to write results to.
+    :param metrics: whether requests are measured for Prometheus.
+    """
+    settings.scheduler_enabled = False
+    settings.metrics_enabled = metrics
+    async with benchmark_database(items):
+        app = get_app()
+        await app.router.startup()
+        await app.state.tarkov_market_client.close()
+        app.state.tarkov_market_client = stub_market_client()
+        try:  # noqa: WPS501
+            # Warm up connections and caches like a long running worker.
+            await run_load(app, items, concurrency, concurrency * WARMUP_REQUESTS)
+            results, errors = await run_load(app, items, concurrency, requests)
+        finally:
+            await app.router.shutdown()
+    report(results)
+    print(f"failed requests: {errors}")  # noqa: WPS421
+    parameters = {
+        "items": items,
+        "concurrency": concurrency,
+        "requests": requests,
+        "metrics": metrics,
+    }
+    write_results(output, "load", parameters, results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=DEFAULT_ITEMS)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument(
+        "--no-metrics",
+        action="store_false",
+        dest="metrics",
+        help="Turn off Prometheus metrics to measure their overhead.",
+    )
+    args = parser.parse_args()
+    asyncio.run(
+        main(args.items, args.concurrency, args.requests, args.output, args.metrics),
+    )
@@ -0,0 +1,274 @@
+"""
+Micro-benchmarks of TarkovItemDAO methods, DTO serialization and the rest.
+
+Recipe profits, flea fees and the metrics middleware are measured as well.
+
+Every operation is run sequentially on a single session, so latencies
+are those of one worker talking to the database without contention.
+The database is created, filled and dropped by the run.
+
+Usage::
+
+    python -m benchmarks.micro --items 5000 --iterations 500 --output micro.json
+"""
+import argparse
+import asyncio
+import random
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List, Optional
+
+import ujson
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.common import (
+    SEED,
+    Result,
+    benchmark_database,
+    item_names,
+    report,
+    summarize,
+    write_results,
+)
+from tarkov_calculator_api.calculator.flea import FleaTaxes, ItemPrices, parse_lines
+from tarkov_calculator_api.calculator.recipes import (
+    Recipe,
+    RecipeKind,
+    RecipeMetric,
+    RecipeProfits,
+)
+from tarkov_calculator_api.db.dao.tarkov_item_dao import (
+    TarkovItemDAO,
+    TarkovItemOrdering,
+)
+from tarkov_calculator_api.services.metrics import MetricsMiddleware
+from tarkov_calculator_api.services.price_updates import PriceChange
+from tarkov_calculator_api.services.search import SearchIndex
+from tarkov_calculator_api.web.api.tarkov_item.conditional import encode_content
+from tarkov_calculator_api.web.api.tarkov_item.schema import TarkovItemModelDTO
+
+DEFAULT_ITEMS = 5000
+DEFAULT_ITERATIONS = 500
+PAGE_SIZE = 100
+BATCH_SIZE = 50
+RECIPES = 5000
+# Items whose prices change between two refreshes.
+CHANGED_ITEMS = 100
+# Seconds, 20 hours.
+MAX_RECIPE_DURATION = 72000
+MAX_RECIPE_COUNT = 5
+MIN_PRICE = 1000
+MAX_PRICE = 100000
+FLEA_FEE_LINES = 10000
+
+Operation = Callable[[], Awaitable[Any]]
+
+
+async def _measure(name: str, operation: Operation, iterations: int) -> Result:
+    await operation()
+    latencies: List[float] = []
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        operation_started_at = time.perf_counter()
+        await operation()
+        latencies.append(time.perf_counter() - operation_started_at)
+    return summarize(name, latencies, time.perf_counter() - started_at)
+
+
+def _dao_operations(dao: TarkovItemDAO, names: List[str]) -> List[Any]:
+    generator = random.Random(SEED)
+    count = len(names)
+    upserts = [
+        {"name": name, "price": generator.randint(1, count), "base_price": 1}
+        for name in names[:PAGE_SIZE]
+    ]
+    return [
+        (
+            "dao.get_tarkov_item_by_id",
+            lambda: dao.get_tarkov_item_by_id(generator.randint(1, count)),
+        ),
+        (
+            "dao.get_tarkov_items_page",
+            lambda: dao.get_tarkov_items_page(
+                PAGE_SIZE,
+                TarkovItemOrdering.PRICE,
+            ),
+        ),
+        (
+            "dao.get_all_tarkov_items.offset",
+            lambda: dao.get_all_tarkov_items(PAGE_SIZE, count // 2),
+        ),
+        (
+            "dao.get_tarkov_items_by_names",
+            lambda: dao.get_tarkov_items_by_names(
+                generator.sample(names, BATCH_SIZE),
+            ),
+        ),
+        ("dao.bulk_upsert", lambda: dao.bulk_upsert(upserts)),
+        ("dao.get_tarkov_item_rows", dao.get_tarkov_item_rows),
+    ]
+
+
+async def _serialization_operations(dao: TarkovItemDAO) -> List[Any]:
+    page = await dao.get_tarkov_items_page(PAGE_SIZE)
+    dtos = [TarkovItemModelDTO.from_orm(item) for item in page]
+    search_index = SearchIndex(max_cached_queries=0)
+    search_index.replace(await dao.get_tarkov_item_rows())
+
+    async def from_orm() -> Any:  # noqa: WPS430
+        return [TarkovItemModelDTO.from_orm(item) for item in page]
+
+    async def encode() -> Any:  # noqa: WPS430
+        return encode_content(dtos)
+
+    async def search() -> Any:  # noqa: WPS430
+        return search_index.search("ri", 10)
+
+    return [
+        ("dto.from_orm", from_orm),
+        ("dto.encode_content", encode),
+        ("search_index.search.uncached", search),
+    ]
+
+
+class _FleaBenchmark:
+    """Flea fees of a batch of listings of random items."""
+
+    def __init__(self, rows: List[Any]) -> None:
+        generator = random.Random(SEED)
+        self.item_prices = ItemPrices()
+        self.item_prices.replace(rows)
+        names = [row.name for row in rows if row.base_price > 0]
+        self.lines = [
+            [generator.choice(names), generator.randint(MIN_PRICE, MAX_PRICE), 1]
+            for _ in range(FLEA_FEE_LINES)
+        ]
+        self.body = ujson.dumps(self.lines)
+
+    def operations(self) -> List[Any]:
+        return [("flea.fees", self.fees)]
+
+    async def fees(self) -> Any:
+        lines = parse_lines(ujson.loads(self.body))
+        fees = self.item_prices.flea_fees(lines, FleaTaxes())
+        return ujson.dumps(fees.to_dict())
+
+
+class _RecipeBenchmark:
+    """Random recipes over items of the benchmark database."""
+
+    def __init__(self, names: List[str]) -> None:
+        self.generator = random.Random(SEED)
+        self.names = names
+        self.recipe_profits = RecipeProfits(
+            [self._recipe(index) for index in range(RECIPES)],
+        )
+        self.prices = {name: self._price() for name in names}
+        self.recipe_profits.set_prices(self.prices)
+        self.used_names = list(self.recipe_profits.items)
+
+    def operations(self) -> List[Any]:
+        return [
+            ("recipes.set_prices", self.recompute),
+            ("recipes.update", self.update),
+            ("recipes.top", self.top),
+        ]
+
+    async def recompute(self) -> Any:
+        return self.recipe_profits.set_prices(self.prices)
+
+    async def update(self) -> Any:
+        changed = self.generator.sample(self.used_names, CHANGED_ITEMS)
+        return self.recipe_profits.update(
+            PriceChange(0, name, self._price(), 0) for name in changed
+        )
+
+    async def top(self) -> Any:
+        return self.recipe_profits.top(PAGE_SIZE, RecipeMetric.PROFIT_PER_HOUR)
+
+    def _recipe(self, index: int) -> Recipe:
+        inputs = self.generator.sample(self.names, self._count())
+        return Recipe(
+            name=f"recipe {index}",
+            kind=self.generator.choice(list(RecipeKind)),
+            duration=self.generator.randint(0, MAX_RECIPE_DURATION),
+            inputs=tuple((name, self._count()) for name in inputs),
+            outputs=((self.generator.choice(self.names), self._count()),),
+        )
+
+    def _count(self) -> int:
+        return self.generator.randint(1, MAX_RECIPE_COUNT)
+
+    def _price(self) -> int:
+        return self.generator.randint(MIN_PRICE, MAX_PRICE)
+
+
+def _metrics_operations() -> List[Any]:
+    scope = {"type": "http", "method": "GET", "route": APIRoute("/", _endpoint)}
+    start_message = {"type": "http.response.start", "status": 200}
+
+    async def respond(app_scope: Any, receive: Any, send: Any) -> None:  # noqa: WPS430
+        await send(start_message)
+
+    async def receive() -> Any:  # noqa: WPS430
+        return {"type": "http.disconnect"}
+
+    async def discard(message: Any) -> None:  # noqa: WPS430
+        """Drop the message."""
+
+    middleware = MetricsMiddleware(respond)
+
+    async def bare() -> Any:  # noqa: WPS430
+        return await respond(scope, receive, discard)
+
+    async def measured() -> Any:  # noqa: WPS430
+        return await middleware(scope, receive, discard)
+
+    # Overhead of metrics is the difference between the two.
+    return [
+        ("asgi.request", bare),
+        ("asgi.request.metrics", measured),
+    ]
+
+
+def _endpoint() -> None:
+    """Endpoint of the route requests are labeled with."""
+
+
+async def main(  # noqa: WPS210
+    items: int,
+    iterations: int,
+    output: Optional[Path],
+) -> None:
+    """
+    Run micro-benchmarks and report results.
+
+    :param items: number of items in the database.
+    :param iterations: number of calls of every operation.
+    :param output: JSON file to write results to.
+    """
+    results = []
+    async with benchmark_database(items) as engine:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            dao = TarkovItemDAO(session)
+            operations = _dao_operations(dao, item_names(items))
+            operations.extend(await _serialization_operations(dao))
+            operations.extend(_RecipeBenchmark(item_names(items)).operations())
+            rows = list(await dao.get_tarkov_item_rows())
+            operations.extend(_FleaBenchmark(rows).operations())
+            operations.extend(_metrics_operations())
+            for name, operation in operations:
+                results.append(await _measure(name, operation, iterations))
+    report(results)
+    parameters = {"items": items, "iterations": iterations}
+    write_results(output, "micro", parameters, results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=DEFAULT_ITEMS)
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.iterations, args.output))
@@ -0,0 +1,134 @@
+"""
+Requests per second of the item listing served from the cache.
+
+Compares cached pages encoded once with the previous behaviour,
+when cached DTOs went through response model validation
+and JSON encoding on every request. Both run in a single process,
+so the numbers are per worker. No database is needed,
+every request is a cache hit.
+
+Usage::
+
+    python -m benchmarks.snapshot_responses --items 1000 --requests 2000
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+
+from fastapi import Depends, FastAPI, Response
+from httpx import AsyncClient
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import (
+    TarkovItemDAO,
+    TarkovItemOrdering,
+)
+from tarkov_calculator_api.db.dependencies import (
+    get_db_primary_read_session,
+    get_db_read_session,
+    get_db_session,
+)
+from tarkov_calculator_api.services.cache import TarkovItemCache, get_tarkov_item_cache
+from tarkov_calculator_api.web.api.tarkov_item.conditional import (
+    conditional_response,
+    encode_content,
+    version_etag,
+)
+from tarkov_calculator_api.web.api.tarkov_item.pagination import (
+    NEXT_CURSOR_HEADER,
+    next_cursor,
+)
+from tarkov_calculator_api.web.api.tarkov_item.schema import TarkovItemModelDTO
+from tarkov_calculator_api.web.api.tarkov_item.snapshots import (
+    DEFAULT_LIMIT,
+    page_cache_key,
+)
+from tarkov_calculator_api.web.application import get_app
+
+DTO_PATH = "/benchmark/dto"
+CACHE_SIZE = 16
+CACHE_TTL = 3600
+DEFAULT_REQUESTS = 2000
+
+
+def _build_app(count: int) -> FastAPI:  # noqa: WPS210
+    items = [
+        TarkovItemModelDTO(id=index, name=f"item {index}", price=index, base_price=1)
+        for index in range(1, count + 1)
+    ]
+    tarkov_item_cache = TarkovItemCache(max_size=CACHE_SIZE, ttl=CACHE_TTL)
+    tarkov_item_cache.set(
+        page_cache_key(TarkovItemOrdering.ID, len(items), 0, None),
+        encode_content(items),
+    )
+    app = get_app()
+    app.dependency_overrides[get_db_session] = lambda: None
+    app.dependency_overrides[get_db_read_session] = lambda: None
+    app.dependency_overrides[get_db_primary_read_session] = lambda: None
+    app.dependency_overrides[get_tarkov_item_cache] = lambda: tarkov_item_cache
+
+    @app.get(DTO_PATH, response_model=List[TarkovItemModelDTO])
+    async def cached_dtos(  # noqa: WPS430
+        response: Response,
+        limit: int = DEFAULT_LIMIT,
+        tarkov_item_dao: TarkovItemDAO = Depends(),
+        cache: TarkovItemCache = Depends(get_tarkov_item_cache),
+    ) -> Any:
+        cache_key = page_cache_key(TarkovItemOrdering.ID, limit, 0, None)
+        encoded = cache.get(cache_key)
+        next_page = next_cursor(TarkovItemOrdering.ID, encoded.content, limit)
+        if next_page is not None:
+            response.headers[NEXT_CURSOR_HEADER] = next_page
+        conditional_response(response, encoded, version_etag(cache, cache_key))
+        return encoded.content
+
+    return app
+
+
+async def _requests_per_second(
+    client: AsyncClient,
+    url: str,
+    params: Dict[str, Any],
+    requests: int,
+) -> float:
+    await client.get(url, params=params)
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        await client.get(url, params=params)
+    return requests / (time.perf_counter() - started_at)
+
+
+async def main(items: int, requests: int) -> None:
+    """
+    Run the benchmark and print results.
+
+    :param items: number of items on the page.
+    :param requests: number of requests for each variant.
+    """
+    app = _build_app(items)
+    params = {"limit": items}
+    async with AsyncClient(app=app, base_url="http://benchmark") as client:
+        before = await _requests_per_second(client, DTO_PATH, params, requests)
+        after = await _requests_per_second(
+            client,
+            app.url_path_for("get_tarkov_item_models"),
+            params,
+            requests,
+        )
+    _report(items, before, after)
+
+
+def _report(items: int, before: float, after: float) -> None:
+    speedup = after / before
+    print(f"items per page:            {items}")  # noqa: WPS421
+    print(f"response model, req/s:     {before:.0f}")  # noqa: WPS421
+    print(f"pre-encoded bytes, req/s:  {after:.0f}")  # noqa: WPS421
+    print(f"speedup:                   {speedup:.2f}x")  # noqa: WPS421
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.requests))
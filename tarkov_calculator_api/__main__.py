@@ -1,8 +1,16 @@
 import argparse
+import asyncio
+from pathlib import Path
 
 import uvicorn
 
 from tarkov_calculator_api.gunicorn_runner import GunicornApplication
+from tarkov_calculator_api.services.bulk_load import (
+    load_items,
+    load_prices,
+    run_bulk_load,
+)
+from tarkov_calculator_api.services.metrics import child_exit, prepare_multiprocess_dir
 from tarkov_calculator_api.services.scheduler import TarkovItemScheduler
 from tarkov_calculator_api.settings import settings
 
@@ -17,6 +25,21 @@ parser.add_argument(
     action="store_true",
     help="Run the Tarkov Market Calculator API.",
 )
+parser.add_argument(
+    "--load-items",
+    type=Path,
+    metavar="FILE",
+    help="Load tarkov items from a CSV file with name,price,base_price columns.",
+)
+parser.add_argument(
+    "--load-history",
+    type=Path,
+    metavar="FILE",
+    help=(
+        "Load price history from a CSV file with "
+        "name,recorded_at,price,base_price columns."
+    ),
+)
 parser.set_defaults(service=False)
 parser.set_defaults(api=False)
 args = parser.parse_args()
@@ -24,9 +47,23 @@ args = parser.parse_args()
 # Use args.option1 and args.option2 in your code as needed
 
 
+def bulk_load() -> bool:
+    """
+    Run bulk loads requested on the command line.
+
+    :return: whether anything was loaded.
+    """
+    if args.load_items:
+        asyncio.run(run_bulk_load(load_items, args.load_items))
+    if args.load_history:
+        asyncio.run(run_bulk_load(load_prices, args.load_history))
+    return bool(args.load_items or args.load_history)
+
+
 def main() -> None:
     """Entrypoint of the application."""
-    if args.api is False and args.service is False:
+    loaded = bulk_load()
+    if args.api is False and args.service is False and not loaded:
         print("Please specify --api or --service... Exiting.")
     if args.service:
         TarkovItemScheduler().run()
@@ -45,6 +82,7 @@ def main() -> None:
             # We choose gunicorn only if reload
             # option is not used, because reload
             # feature doen't work with Uvicorn workers.
+            prepare_multiprocess_dir()
             GunicornApplication(
                 "tarkov_calculator_api.web.application:get_app",
                 host=settings.host,
@@ -54,6 +92,8 @@ def main() -> None:
                 accesslog="-",
                 loglevel=settings.log_level.value.lower(),
                 access_log_format='%r "-" %s "-" %Tf',  # noqa: WPS323
+                child_exit=child_exit,
+                preload_app=settings.preload_app,
             ).run()
 
 
@@ -0,0 +1 @@
+"""Calculations over tarkov market prices."""
@@ -0,0 +1,325 @@
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import repeat
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence
+
+import numpy as np
+from numpy import typing as npt
+from starlette.requests import Request
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+
+# Tax rates of the item value and of the listing price, Ti and Tr of the formula.
+DEFAULT_TAX_INPUTS = 0.03
+DEFAULT_TAX_REQUIREMENTS = 0.03
+# Exponent of price ratios in favour of the market, and base of the fee.
+RATIO_EXPONENT = 1.08
+FEE_BASE = 4
+# Halvings of the search interval, enough for double precision.
+BISECTION_STEPS = 64
+# Tax modifiers best price ratios are remembered for.
+CACHED_RATIOS = 64
+
+Vector = npt.NDArray[np.float64]
+Indices = npt.NDArray[np.intp]
+
+
+@dataclass(frozen=True)
+class FleaTaxes:
+    """
+    Tax modifiers of flea market fees.
+
+    Reduction is the share of the fee taken off by the intelligence
+    center and hideout management.
+    """
+
+    inputs: float = DEFAULT_TAX_INPUTS
+    requirements: float = DEFAULT_TAX_REQUIREMENTS
+    reduction: float = 0
+
+
+class FleaLines(NamedTuple):
+    """Columns of listings to calculate fees of."""
+
+    names: Sequence[str]
+    prices: Vector
+    quantities: Vector
+
+
+@dataclass(frozen=True)
+class FleaFees:
+    """
+    Fees and profits of listings, in the order of the lines.
+
+    Best price is the listing price with the most profit after the fee,
+    but not above the current flea price of the item.
+    """
+
+    base_prices: Vector
+    fees: Vector
+    profits: Vector
+    best_prices: Vector
+    best_profits: Vector
+
+    def to_dict(self) -> Dict[str, List[int]]:
+        """
+        Columns as lists of whole roubles, ready to be encoded.
+
+        :return: columns by name.
+        """
+        return {
+            "base_prices": self.base_prices.astype(np.int64).tolist(),
+            "fees": self.fees.astype(np.int64).tolist(),
+            "profits": self.profits.astype(np.int64).tolist(),
+            "best_prices": self.best_prices.astype(np.int64).tolist(),
+            "best_profits": self.best_profits.astype(np.int64).tolist(),
+        }
+
+
+class UnknownItemsError(ValueError):
+    """Listings of items without a base price."""
+
+    def __init__(self, names: List[str]) -> None:
+        super().__init__(f"Unknown tarkov items: {names}")
+        self.names = names
+
+
+def parse_lines(lines: Any) -> FleaLines:
+    """
+    Split listings into columns.
+
+    :param lines: list of item name, listing price and quantity triples.
+    :return: columns of the listings.
+    :raises ValueError: if a listing is malformed.
+    """
+    names, prices, quantities = _columns(lines)
+    if {type(name) for name in names} - {str}:
+        raise ValueError("Items must be names")
+    parsed = FleaLines(names, _numbers(prices), _numbers(quantities))
+    if (parsed.prices <= 0).any():
+        raise ValueError("Prices must be positive")
+    whole = parsed.quantities == np.floor(parsed.quantities)
+    if (parsed.quantities < 1).any() or not whole.all():
+        raise ValueError("Quantities must be positive integers")
+    return parsed
+
+
+def flea_fees(
+    base_prices: Vector,
+    prices: Vector,
+    quantities: Vector,
+    taxes: FleaTaxes,
+) -> Vector:
+    """
+    Calculate flea market fees of listings.
+
+    The fee is ``VO * Ti * 4 ** PO * Q + VR * Tr * 4 ** PR * Q``,
+    where VO is the base price, VR the listing price, Q the quantity,
+    ``PO = log10(VO / VR)`` and ``PR = log10(VR / VO)``. The ratio
+    in favour of the market is raised to the power of 1.08.
+
+    :param base_prices: base prices of items.
+    :param prices: listing prices of single items.
+    :param quantities: items listed at once.
+    :param taxes: tax modifiers.
+    :return: fees in whole roubles, rounded up.
+    """
+    ratios = np.log10(prices / base_prices)
+    item_taxes = base_prices * taxes.inputs * FEE_BASE ** _skew(-ratios)
+    price_taxes = prices * taxes.requirements * FEE_BASE ** _skew(ratios)
+    fees = (item_taxes + price_taxes) * quantities * (1 - taxes.reduction)
+    return np.ceil(fees)
+
+
+@lru_cache(maxsize=CACHED_RATIOS)
+def best_price_ratio(taxes: FleaTaxes) -> float:
+    """
+    Find listing price, relative to the base price, with the most profit.
+
+    Fees scale with the base price, so the best ratio is the same
+    for every item. Listing below the base price never pays, above it
+    profit grows until the fee catches up, so the ratio is found
+    by bisection on the derivative of profit by the log of the ratio.
+
+    :param taxes: tax modifiers.
+    :return: best listing price divided by the base price.
+    """
+    share = 1 - taxes.reduction
+    requirements = taxes.requirements * share
+    if requirements >= 1:
+        return 1
+    # Fees take the whole price at the upper bound.
+    upper = math.log(1 / requirements, FEE_BASE) ** (1 / RATIO_EXPONENT)
+    lower: float = 0
+    for _ in range(BISECTION_STEPS):
+        middle = (lower + upper) / 2
+        if _profit_slope(middle, taxes.inputs * share, requirements) > 0:
+            lower = middle
+        else:
+            upper = middle
+    return float(10**lower)
+
+
+class ItemPrices:
+    """
+    Per-worker snapshot of base and flea prices of every tarkov item.
+
+    Prices are kept in dense vectors indexed by item names,
+    so a batch of listings is priced with a single gather.
+    """
+
+    def __init__(self) -> None:
+        self.items: Dict[str, int] = {}
+        self.base_prices: Vector = np.zeros(0)
+        self.prices: Vector = np.zeros(0)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def replace(self, items: Sequence[Any]) -> None:
+        """
+        Keep exactly the given items, dropping everything else.
+
+        :param items: tarkov items with name, price and base_price.
+        """
+        self.items = {item.name: index for index, item in enumerate(items)}
+        self.base_prices = np.array(
+            [item.base_price for item in items],
+            dtype=np.float64,
+        )
+        self.prices = np.array([item.price for item in items], dtype=np.float64)
+
+    def update(self, items: Iterable[Any]) -> None:
+        """
+        Update prices of changed items, adding new ones.
+
+        :param items: tarkov items with name, price and base_price.
+        """
+        new_items = []
+        for item in items:
+            index = self.items.get(item.name)
+            if index is None:
+                new_items.append(item)
+            else:
+                self.base_prices[index] = item.base_price
+                self.prices[index] = item.price
+        if new_items:
+            self.replace([*self._rows(), *new_items])
+
+    async def reload(self, tarkov_item_dao: TarkovItemDAO) -> None:
+        """
+        Load prices of every item from the database.
+
+        :param tarkov_item_dao: DAO for tarkov_item models.
+        """
+        self.replace(await tarkov_item_dao.get_tarkov_item_rows())
+
+    def flea_fees(self, lines: FleaLines, taxes: FleaTaxes) -> FleaFees:
+        """
+        Calculate fees and best prices of listings.
+
+        Listings of unknown items, or items without a base price,
+        raise UnknownItemsError.
+
+        :param lines: listings.
+        :param taxes: tax modifiers.
+        :return: fees and profits in the order of the lines.
+        """
+        indices = self._indices(lines.names)
+        base_prices = self.base_prices[indices]
+        fees = flea_fees(base_prices, lines.prices, lines.quantities, taxes)
+        best_prices = self._best_prices(base_prices, self.prices[indices], taxes)
+        best_fees = flea_fees(base_prices, best_prices, lines.quantities, taxes)
+        return FleaFees(
+            base_prices=base_prices,
+            fees=fees,
+            profits=lines.prices * lines.quantities - fees,
+            best_prices=best_prices,
+            best_profits=best_prices * lines.quantities - best_fees,
+        )
+
+    def _indices(self, names: Sequence[str]) -> Indices:
+        indices = np.fromiter(
+            map(self.items.get, names, repeat(-1)),
+            dtype=np.intp,
+            count=len(names),
+        )
+        unknown = indices < 0
+        unknown[~unknown] = self.base_prices[indices[~unknown]] <= 0
+        if unknown.any():
+            raise UnknownItemsError([names[index] for index in np.flatnonzero(unknown)])
+        return indices
+
+    def _best_prices(
+        self,
+        base_prices: Vector,
+        prices: Vector,
+        taxes: FleaTaxes,
+    ) -> Vector:
+        best_prices = base_prices * best_price_ratio(taxes)
+        listed = prices > 0
+        best_prices[listed] = np.minimum(best_prices[listed], prices[listed])
+        return np.maximum(np.floor(best_prices), 1)
+
+    def _rows(self) -> List[Any]:
+        return [
+            _Row(name, self.prices[index], self.base_prices[index])
+            for name, index in self.items.items()
+        ]
+
+
+class _Row(NamedTuple):
+    name: str
+    price: float
+    base_price: float
+
+
+def get_item_prices(request: Request) -> ItemPrices:
+    """
+    Get item prices of the current worker.
+
+    :param request: current request.
+    :return: item prices.
+    """
+    return request.app.state.item_prices
+
+
+def _columns(lines: Any) -> Sequence[Sequence[Any]]:
+    if not isinstance(lines, list):
+        raise ValueError("Expected a list of [item, price, quantity] lines")
+    if {type(line) for line in lines} - {list}:
+        raise ValueError("Every line must be a list")
+    if {len(line) for line in lines} - {3}:
+        raise ValueError("Every line must have an item, a price and a quantity")
+    if not lines:
+        return ((), (), ())
+    return list(zip(*lines))
+
+
+def _numbers(column: Sequence[Any]) -> Vector:
+    if {type(number) for number in column} - {int, float}:
+        raise ValueError("Prices and quantities must be numbers")
+    numbers = np.fromiter(column, dtype=np.float64, count=len(column))
+    if not np.isfinite(numbers).all():
+        raise ValueError("Prices and quantities must be finite")
+    return numbers
+
+
+def _skew(ratios: Vector) -> Vector:
+    skewed = np.abs(ratios) ** RATIO_EXPONENT
+    return np.where(ratios > 0, skewed, ratios)
+
+
+def _profit_slope(  # noqa: WPS210
+    log_ratio: float,
+    inputs: float,
+    requirements: float,
+) -> float:
+    ratio = 10**log_ratio
+    price_tax = requirements * FEE_BASE ** (log_ratio**RATIO_EXPONENT)
+    skew_slope = RATIO_EXPONENT * log_ratio ** (RATIO_EXPONENT - 1)
+    revenue_slope = math.log(10) * ratio * (1 - price_tax)
+    item_tax_slope = inputs * math.log(FEE_BASE) * FEE_BASE**-log_ratio
+    price_tax_slope = ratio * price_tax * math.log(FEE_BASE) * skew_slope
+    return revenue_slope + item_tax_slope - price_tax_slope
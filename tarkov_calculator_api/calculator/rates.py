@@ -0,0 +1,152 @@
+import enum
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from starlette.requests import Request
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+
+
+class Currency(str, enum.Enum):  # noqa: WPS600
+    """Currencies that can be converted. Values are tarkov item names."""
+
+    ROUBLE = "rouble"
+    EURO = "euro"
+    DOLLAR = "dollar"
+
+
+class RateSide(str, enum.Enum):  # noqa: WPS600
+    """
+    Which price of the currency items to convert with.
+
+    Buy uses the market ``price``, sell uses the trader ``base_price``.
+    """
+
+    BUY = "buy"
+    SELL = "sell"
+
+
+RateMatrix = Dict[Tuple[RateSide, Currency, Currency], float]
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """
+    Immutable conversion rates between every pair of currencies.
+
+    Rates are computed once, when the table is built, so a conversion
+    is a single dict lookup and multiplication.
+    """
+
+    rates: RateMatrix
+    updated_at: datetime
+
+    @classmethod
+    def from_items(cls, items: Iterable[Any], updated_at: datetime) -> "RateTable":
+        """
+        Build rate table from currency items.
+
+        Currencies without an item, or with a zero price, are left out.
+
+        :param items: tarkov items with name, price and base_price.
+        :param updated_at: time the prices were read.
+        :return: new rate table.
+        """
+        rates: RateMatrix = {}
+        for side, side_roubles in _roubles_per_unit(items).items():
+            rates.update(_cross_rates(side, side_roubles))
+        return cls(rates=rates, updated_at=updated_at)
+
+    def rate(
+        self,
+        source: Currency,
+        target: Currency,
+        side: RateSide = RateSide.BUY,
+    ) -> Optional[float]:
+        """
+        Get amount of target currency for one unit of source currency.
+
+        :param source: currency to convert from.
+        :param target: currency to convert to.
+        :param side: which prices to use.
+        :return: rate, or None if one of currencies has no price.
+        """
+        return self.rates.get((side, source, target))
+
+
+def _roubles_per_unit(items: Iterable[Any]) -> Dict[RateSide, Dict[Currency, float]]:
+    roubles: Dict[RateSide, Dict[Currency, float]] = {
+        side: {Currency.ROUBLE: 1} for side in RateSide
+    }
+    currencies = {currency.value: currency for currency in Currency}
+    for item in items:
+        currency = currencies.get(item.name)
+        if currency is None or currency is Currency.ROUBLE:
+            continue
+        if item.price > 0:
+            roubles[RateSide.BUY][currency] = item.price
+        if item.base_price > 0:
+            roubles[RateSide.SELL][currency] = item.base_price
+    return roubles
+
+
+def _cross_rates(side: RateSide, roubles: Dict[Currency, float]) -> RateMatrix:
+    return {
+        (side, source, target): source_roubles / target_roubles
+        for source, source_roubles in roubles.items()
+        for target, target_roubles in roubles.items()
+    }
+
+
+class ExchangeRates:
+    """
+    Holder of the current rate table of a worker.
+
+    Tables are immutable, so readers never see a half-built one,
+    the holder just swaps them when prices change.
+    """
+
+    def __init__(self) -> None:
+        self.table: Optional[RateTable] = None
+        self._items: Dict[str, Any] = {}
+
+    def update(self, items: Iterable[Any], updated_at: datetime) -> None:
+        """
+        Rebuild rate table with changed items.
+
+        Items are merged with the ones seen before, so it's enough
+        to pass only the items whose prices changed. Non-currency
+        items are ignored, and if none of the currencies changed
+        the current table is kept.
+
+        :param items: changed tarkov items with name, price and base_price.
+        :param updated_at: time the prices were read.
+        """
+        currencies = {currency.value for currency in Currency}
+        changed = {item.name: item for item in items if item.name in currencies}
+        if not changed and self.table is not None:
+            return
+        self._items.update(changed)
+        self.table = RateTable.from_items(self._items.values(), updated_at)
+
+    async def reload(self, tarkov_item_dao: TarkovItemDAO) -> None:
+        """
+        Rebuild rate table from currency items in the database.
+
+        :param tarkov_item_dao: DAO for tarkov_item models.
+        """
+        items = await tarkov_item_dao.get_tarkov_items_by_names(
+            [currency.value for currency in Currency],
+        )
+        self.update(items, datetime.now(timezone.utc))
+
+
+def get_exchange_rates(request: Request) -> ExchangeRates:
+    """
+    Get exchange rates of the current worker.
+
+    :param request: current request.
+    :return: exchange rates.
+    """
+    return request.app.state.exchange_rates
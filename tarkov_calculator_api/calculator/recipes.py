@@ -0,0 +1,350 @@
+import enum
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import ujson
+from numpy import typing as npt
+from starlette.requests import Request
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+
+SECONDS_PER_HOUR = 3600
+
+Vector = npt.NDArray[np.float64]
+Indices = npt.NDArray[np.intp]
+RecipeItems = Tuple[Tuple[str, int], ...]
+
+
+class RecipeKind(str, enum.Enum):  # noqa: WPS600
+    """Possible kinds of recipes."""
+
+    CRAFT = "craft"
+    BARTER = "barter"
+
+
+class RecipeMetric(str, enum.Enum):  # noqa: WPS600
+    """Metrics recipes can be ranked by."""
+
+    PROFIT = "profit"
+    PROFIT_PER_HOUR = "profit_per_hour"
+    ROI = "roi"
+
+
+@dataclass(frozen=True)
+class Recipe:
+    """
+    Hideout craft or trader barter.
+
+    Inputs and outputs are pairs of tarkov item name and count.
+    Duration is in seconds, barters take no time.
+    """
+
+    name: str
+    kind: RecipeKind
+    duration: float
+    inputs: RecipeItems
+    outputs: RecipeItems
+
+
+@dataclass(frozen=True)
+class RecipeProfit:
+    """Profitability of a recipe at current prices."""
+
+    recipe: Recipe
+    cost: float
+    revenue: float
+    profit: float
+    profit_per_hour: Optional[float]
+    roi: Optional[float]
+
+
+def load_recipes(path: Path) -> List[Recipe]:
+    """
+    Load recipes from a JSON file.
+
+    The file holds a list of objects with name, kind, duration in seconds,
+    and inputs and outputs as lists of objects with item name and count.
+
+    :param path: JSON file.
+    :return: recipes.
+    :raises ValueError: if the file is malformed.
+    """
+    raw_recipes = ujson.loads(path.read_text())
+    if not isinstance(raw_recipes, list):
+        raise ValueError(f"{path}: expected a list of recipes")
+    recipes = []
+    for index, raw_recipe in enumerate(raw_recipes):
+        try:
+            recipes.append(_parse_recipe(raw_recipe))
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError(f"{path}: recipe {index}: {error!r}") from error
+    return recipes
+
+
+class _Entries:
+    """
+    Sparse recipe by item matrix of counts, in coordinate format.
+
+    Multiplying it by a price vector gives a value for every recipe.
+    """
+
+    def __init__(self, recipe_index: Indices, item_index: Indices, count: Vector):
+        self.recipe_index = recipe_index
+        self.item_index = item_index
+        self.count = count
+
+    @classmethod
+    def build(  # noqa: WPS210
+        cls,
+        recipe_items: Iterable[RecipeItems],
+        items: Dict[str, int],
+    ) -> "_Entries":
+        recipe_index: List[int] = []
+        item_index: List[int] = []
+        counts: List[int] = []
+        for index, entries in enumerate(recipe_items):
+            for name, count in entries:
+                recipe_index.append(index)
+                item_index.append(items.setdefault(name, len(items)))
+                counts.append(count)
+        return cls(
+            np.array(recipe_index, dtype=np.intp),
+            np.array(item_index, dtype=np.intp),
+            np.array(counts, dtype=np.float64),
+        )
+
+    def values(self, prices: Vector, recipes: int) -> Vector:
+        weights = self.count * prices[self.item_index]
+        return self._sum(weights, recipes)
+
+    def missing(self, prices: Vector, recipes: int) -> Vector:
+        weights = (prices[self.item_index] <= 0).astype(np.float64)
+        return self._sum(weights, recipes)
+
+    def changes(
+        self,
+        changed: npt.NDArray[np.bool_],
+        price_delta: Vector,
+        missing_delta: Vector,
+    ) -> Tuple[Indices, Vector, Vector]:
+        selected = np.flatnonzero(changed[self.item_index])
+        item_index = self.item_index[selected]
+        return (
+            self.recipe_index[selected],
+            self.count[selected] * price_delta[item_index],
+            missing_delta[item_index],
+        )
+
+    def _sum(self, weights: Vector, recipes: int) -> Vector:
+        totals = np.bincount(self.recipe_index, weights=weights, minlength=recipes)
+        return np.asarray(totals, dtype=np.float64)
+
+
+class RecipeProfits:
+    """
+    Profitability of every recipe, kept up to date with prices.
+
+    Recipes are a sparse matrix of input and output counts
+    over the items they use, and prices of those items a dense vector,
+    so costs and revenues of all recipes are a product of the two.
+    When prices change, only entries of changed items are added
+    to the totals, so an update costs the same however many recipes
+    there are. Rankings are computed for all recipes at once.
+
+    Recipes with an item that has no price are never ranked.
+    """
+
+    def __init__(self, recipes: Sequence[Recipe]) -> None:
+        self.recipes = list(recipes)
+        self.items: Dict[str, int] = {}
+        self._inputs = _Entries.build((recipe.inputs for recipe in recipes), self.items)
+        self._outputs = _Entries.build(
+            (recipe.outputs for recipe in recipes),
+            self.items,
+        )
+        self._kinds = np.array([recipe.kind.value for recipe in recipes])
+        self._hours = np.array(
+            [recipe.duration / SECONDS_PER_HOUR for recipe in recipes],
+            dtype=np.float64,
+        )
+        self.prices = np.zeros(len(self.items), dtype=np.float64)
+        self._recompute()
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def set_prices(self, prices: Mapping[str, float]) -> None:
+        """
+        Replace all prices and recompute every recipe.
+
+        :param prices: prices by item name, missing items have no price.
+        """
+        self.prices = np.zeros(len(self.items), dtype=np.float64)
+        for name, price in prices.items():
+            index = self.items.get(name)
+            if index is not None:
+                self.prices[index] = price
+        self._recompute()
+
+    def update(self, items: Iterable[Any]) -> None:  # noqa: WPS210
+        """
+        Update prices of changed items.
+
+        Items recipes don't use are ignored.
+
+        :param items: changed tarkov items with name and price.
+        """
+        new_prices = self._new_prices(items)
+        changed = new_prices != self.prices
+        if not changed.any():
+            return
+        price_delta = new_prices - self.prices
+        missing_delta = (new_prices <= 0).astype(np.float64) - (self.prices <= 0)
+        sides = ((self._inputs, self._cost), (self._outputs, self._revenue))
+        for entries, totals in sides:
+            recipe_index, value_delta, entry_missing = entries.changes(
+                changed,
+                price_delta,
+                missing_delta,
+            )
+            np.add.at(totals, recipe_index, value_delta)
+            np.add.at(self._missing, recipe_index, entry_missing)
+        self.prices = new_prices
+
+    async def reload(self, tarkov_item_dao: TarkovItemDAO) -> None:
+        """
+        Load prices of every item recipes use from the database.
+
+        :param tarkov_item_dao: DAO for tarkov_item models.
+        """
+        items = await tarkov_item_dao.get_tarkov_items_by_names(list(self.items))
+        self.set_prices({item.name: item.price for item in items})
+
+    def top(
+        self,
+        limit: int,
+        metric: RecipeMetric = RecipeMetric.PROFIT,
+        kind: Optional[RecipeKind] = None,
+    ) -> List[RecipeProfit]:
+        """
+        Get the most profitable recipes.
+
+        Recipes that take no time have no profit per hour,
+        and recipes that cost nothing have no ROI, so they're left out
+        of rankings by those metrics.
+
+        :param limit: most recipes to return.
+        :param metric: metric to rank recipes by.
+        :param kind: only rank recipes of this kind.
+        :return: recipes with the highest metric first.
+        """
+        values, rankable = self._metric(metric)
+        if kind is not None:
+            rankable &= self._kinds == kind.value
+        candidates = np.flatnonzero(rankable)
+        if limit < len(candidates):
+            order = np.argpartition(-values[candidates], limit - 1)
+            candidates = candidates[order[:limit]]
+        ranked = candidates[np.argsort(-values[candidates], kind="stable")]
+        return [self.profit(int(index)) for index in ranked]
+
+    def profit(self, index: int) -> RecipeProfit:
+        """
+        Get profitability of a single recipe.
+
+        :param index: position of the recipe.
+        :return: profitability at current prices.
+        """
+        cost = float(self._cost[index])
+        revenue = float(self._revenue[index])
+        profit = revenue - cost
+        hours = float(self._hours[index])
+        return RecipeProfit(
+            recipe=self.recipes[index],
+            cost=cost,
+            revenue=revenue,
+            profit=profit,
+            profit_per_hour=profit / hours if hours > 0 else None,
+            roi=profit / cost if cost > 0 else None,
+        )
+
+    def price(self, name: str) -> float:
+        """
+        Get current price of an item recipes use.
+
+        :param name: tarkov item name.
+        :return: price, 0 if it has none.
+        """
+        return float(self.prices[self.items[name]])
+
+    def _new_prices(self, items: Iterable[Any]) -> Vector:
+        new_prices = self.prices.copy()
+        for item in items:
+            index = self.items.get(item.name)
+            if index is not None:
+                new_prices[index] = item.price
+        return new_prices
+
+    def _recompute(self) -> None:
+        recipes = len(self.recipes)
+        self._cost = self._inputs.values(self.prices, recipes)
+        self._revenue = self._outputs.values(self.prices, recipes)
+        self._missing = self._inputs.missing(self.prices, recipes)
+        self._missing += self._outputs.missing(self.prices, recipes)
+
+    def _metric(self, metric: RecipeMetric) -> Tuple[Vector, npt.NDArray[np.bool_]]:
+        profit = self._revenue - self._cost
+        rankable = self._missing == 0
+        if metric is RecipeMetric.PROFIT_PER_HOUR:
+            return self._ratio(profit, self._hours, rankable)
+        if metric is RecipeMetric.ROI:
+            return self._ratio(profit, self._cost, rankable)
+        return profit, rankable
+
+    def _ratio(
+        self,
+        profit: Vector,
+        divisor: Vector,
+        rankable: npt.NDArray[np.bool_],
+    ) -> Tuple[Vector, npt.NDArray[np.bool_]]:
+        rankable &= divisor > 0
+        ratio = np.zeros_like(profit)
+        np.divide(profit, divisor, out=ratio, where=rankable)
+        return ratio, rankable
+
+
+def get_recipe_profits(request: Request) -> RecipeProfits:
+    """
+    Get recipe profits of the current worker.
+
+    :param request: current request.
+    :return: recipe profits.
+    """
+    return request.app.state.recipe_profits
+
+
+def _parse_recipe(raw_recipe: Dict[str, Any]) -> Recipe:
+    duration = float(raw_recipe.get("duration", 0))
+    if duration < 0:
+        raise ValueError("duration can't be negative")
+    return Recipe(
+        name=str(raw_recipe["name"]),
+        kind=RecipeKind(raw_recipe["kind"]),
+        duration=duration,
+        inputs=_parse_items(raw_recipe["inputs"]),
+        outputs=_parse_items(raw_recipe["outputs"]),
+    )
+
+
+def _parse_items(raw_items: List[Dict[str, Any]]) -> RecipeItems:
+    items = []
+    for raw_item in raw_items:
+        count = raw_item.get("count", 1)
+        if type(count) is not int or count < 1:  # noqa: WPS516
+            raise ValueError(f"invalid count {count!r}")
+        items.append((str(raw_item["item"]), count))
+    if not items:
+        raise ValueError("recipes need at least one input and output")
+    return tuple(items)
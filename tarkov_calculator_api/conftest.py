@@ -1,8 +1,8 @@
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
 
 import pytest
 from fastapi import FastAPI
-from httpx import AsyncClient
+from httpx import AsyncClient, MockTransport, Request, Response
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -10,8 +10,29 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
-from tarkov_calculator_api.db.dependencies import get_db_session
+from tarkov_calculator_api.calculator.rates import ExchangeRates, get_exchange_rates
+from tarkov_calculator_api.db.dependencies import (
+    get_db_primary_read_session,
+    get_db_read_session,
+    get_db_session,
+)
 from tarkov_calculator_api.db.utils import create_database, drop_database
+from tarkov_calculator_api.services.cache import TarkovItemCache, get_tarkov_item_cache
+from tarkov_calculator_api.services.fingerprints import (
+    UpstreamFingerprints,
+    get_upstream_fingerprints,
+)
+from tarkov_calculator_api.services.price_snapshot import (
+    PriceSnapshot,
+    get_price_snapshot,
+)
+from tarkov_calculator_api.services.price_updates import PriceUpdates, get_price_updates
+from tarkov_calculator_api.services.search import SearchIndex, get_search_index
+from tarkov_calculator_api.services.tarkov_market import (
+    TarkovMarketClient,
+    create_tarkov_market_client,
+    get_tarkov_market_client,
+)
 from tarkov_calculator_api.settings import settings
 from tarkov_calculator_api.web.application import get_app
 
@@ -81,9 +102,127 @@ async def dbsession(
         await connection.close()
 
 
+@pytest.fixture
+def tarkov_item_cache() -> TarkovItemCache:
+    """
+    Fresh tarkov item cache for each test.
+
+    :return: empty cache.
+    """
+    return TarkovItemCache(
+        max_size=settings.tarkov_item_cache_size,
+        ttl=settings.tarkov_item_cache_ttl,
+    )
+
+
+@pytest.fixture
+def exchange_rates() -> ExchangeRates:
+    """
+    Exchange rates that are not loaded yet.
+
+    :return: empty exchange rates.
+    """
+    return ExchangeRates()
+
+
+@pytest.fixture
+def search_index() -> SearchIndex:
+    """
+    Search index that is not loaded yet.
+
+    :return: empty search index.
+    """
+    return SearchIndex()
+
+
+@pytest.fixture
+def upstream_fingerprints() -> UpstreamFingerprints:
+    """
+    Upstream fingerprints of nothing written yet.
+
+    :return: empty fingerprints.
+    """
+    return UpstreamFingerprints()
+
+
+@pytest.fixture
+def price_snapshot() -> PriceSnapshot:
+    """
+    Price snapshot that is turned off.
+
+    :return: price snapshot without a directory.
+    """
+    return PriceSnapshot(None)
+
+
+@pytest.fixture
+def price_updates(
+    tarkov_item_cache: TarkovItemCache,
+    exchange_rates: ExchangeRates,
+    search_index: SearchIndex,
+) -> PriceUpdates:
+    """
+    Price updates hub that isn't listening to other workers.
+
+    :param tarkov_item_cache: tarkov item cache.
+    :param exchange_rates: exchange rates.
+    :param search_index: search index.
+    :return: price updates hub.
+    """
+    return PriceUpdates(
+        tarkov_item_cache,
+        exchange_rates,
+        queue_size=settings.price_stream_queue_size,
+        search_index=search_index,
+    )
+
+
+@pytest.fixture
+def tarkov_market_items() -> Dict[str, Dict[str, Any]]:
+    """
+    Items served by the mocked tarkov market API.
+
+    Tests can fill this dict, keyed by search query.
+
+    :return: empty dict of items.
+    """
+    return {}
+
+
+@pytest.fixture
+async def tarkov_market_client(
+    tarkov_market_items: Dict[str, Dict[str, Any]],
+) -> AsyncGenerator[TarkovMarketClient, None]:
+    """
+    Tarkov market client that never leaves the process.
+
+    :param tarkov_market_items: items to serve.
+    :yield: tarkov market client.
+    """
+
+    def handler(request: Request) -> Response:  # noqa: WPS430
+        item = tarkov_market_items.get(request.url.params["q"])
+        return Response(200, json=[item] if item else [])
+
+    market_client = create_tarkov_market_client(
+        transport=MockTransport(handler),
+    )
+    try:
+        yield market_client
+    finally:
+        await market_client.close()
+
+
 @pytest.fixture
 def fastapi_app(
     dbsession: AsyncSession,
+    tarkov_item_cache: TarkovItemCache,
+    exchange_rates: ExchangeRates,
+    tarkov_market_client: TarkovMarketClient,
+    price_updates: PriceUpdates,
+    search_index: SearchIndex,
+    upstream_fingerprints: UpstreamFingerprints,
+    price_snapshot: PriceSnapshot,
 ) -> FastAPI:
     """
     Fixture for creating FastAPI app.
@@ -92,6 +231,19 @@ def fastapi_app(
     """
     application = get_app()
     application.dependency_overrides[get_db_session] = lambda: dbsession
+    application.dependency_overrides[get_db_read_session] = lambda: dbsession
+    application.dependency_overrides[get_db_primary_read_session] = lambda: dbsession
+    application.dependency_overrides[get_tarkov_item_cache] = lambda: tarkov_item_cache
+    application.dependency_overrides[get_exchange_rates] = lambda: exchange_rates
+    application.dependency_overrides[
+        get_tarkov_market_client
+    ] = lambda: tarkov_market_client
+    application.dependency_overrides[get_price_updates] = lambda: price_updates
+    application.dependency_overrides[get_search_index] = lambda: search_index
+    application.dependency_overrides[
+        get_upstream_fingerprints
+    ] = lambda: upstream_fingerprints
+    application.dependency_overrides[get_price_snapshot] = lambda: price_snapshot
     return application  # noqa: WPS331
 
 
@@ -1,11 +1,60 @@
-from typing import List, Optional
+import enum
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import ARRAY, Integer, String, bindparam, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
 
-from tarkov_calculator_api.db.dependencies import get_db_session
+from tarkov_calculator_api.db.dependencies import (
+    get_db_primary_read_session,
+    get_db_read_session,
+    get_db_session,
+)
 from tarkov_calculator_api.db.models.tarkov_item_model import TarkovItem
+from tarkov_calculator_api.db.models.tarkov_item_price_model import TarkovItemPrice
+from tarkov_calculator_api.db.staging import (
+    CopyRecords,
+    copy_records,
+    tarkov_items_staging,
+)
+
+
+class TarkovItemOrdering(str, enum.Enum):  # noqa: WPS600
+    """Possible orderings of tarkov item listings."""
+
+    ID = "id"
+    NAME = "name"
+    PRICE = "price"
+
+
+# Columns that uniquely identify position of an item in each ordering.
+# Every ordering is backed by an index on exactly these columns.
+ORDERING_KEYS: Dict[TarkovItemOrdering, Tuple[str, ...]] = {
+    TarkovItemOrdering.ID: ("id",),
+    TarkovItemOrdering.NAME: ("name",),
+    TarkovItemOrdering.PRICE: ("price", "id"),
+}
+
+
+def _upsert_from(values: Select[Tuple[str, int, int]]) -> Insert:
+    insert_query = insert(TarkovItem).from_select(
+        ["name", "price", "base_price"],
+        values,
+    )
+    return insert_query.on_conflict_do_update(
+        index_elements=[TarkovItem.name],
+        set_={
+            "price": insert_query.excluded.price,
+            "base_price": insert_query.excluded.base_price,
+        },
+        where=or_(
+            TarkovItem.price != insert_query.excluded.price,
+            TarkovItem.base_price != insert_query.excluded.base_price,
+        ),
+    )
 
 
 class TarkovItemDAO:
@@ -14,6 +63,32 @@ class TarkovItemDAO:
     def __init__(self, session: AsyncSession = Depends(get_db_session)):
         self.session = session
 
+    @classmethod
+    def read_only(
+        cls,
+        session: AsyncSession = Depends(get_db_read_session),
+    ) -> "TarkovItemDAO":
+        """
+        Create DAO for requests that only read.
+
+        :param session: session for reads only.
+        :return: DAO.
+        """
+        return cls(session)
+
+    @classmethod
+    def read_only_primary(
+        cls,
+        session: AsyncSession = Depends(get_db_primary_read_session),
+    ) -> "TarkovItemDAO":
+        """
+        Create DAO for requests that only read, but fill caches.
+
+        :param session: session for reads only on the primary.
+        :return: DAO.
+        """
+        return cls(session)
+
     async def create_tarkov_item_model(
         self,
         name: str,
@@ -29,20 +104,59 @@ class TarkovItemDAO:
         """
         self.session.add(TarkovItem(name=name, price=price, base_price=base_price))
 
-    async def get_all_tarkov_items(self, limit: int, offset: int) -> List[TarkovItem]:
+    async def get_all_tarkov_items(
+        self,
+        limit: int,
+        offset: int,
+        order_by: TarkovItemOrdering = TarkovItemOrdering.ID,
+    ) -> List[TarkovItem]:
         """
         Get all tarkov item models with limit/offset pagination.
 
+        Deep offsets have to skip over all previous rows,
+        prefer ``get_tarkov_items_page`` for paging through the table.
+
         :param limit: limit of tarkov items.
         :param offset: offset of tarkov items.
+        :param order_by: ordering of tarkov items.
         :return: stream of tarkov items.
         """
         raw_tarkov_items = await self.session.execute(
-            select(TarkovItem).limit(limit).offset(offset),
+            select(TarkovItem)
+            .order_by(*self._ordering_columns(order_by))
+            .limit(limit)
+            .offset(offset),
         )
 
         return list(raw_tarkov_items.scalars().fetchall())
 
+    async def get_tarkov_items_page(
+        self,
+        limit: int,
+        order_by: TarkovItemOrdering = TarkovItemOrdering.ID,
+        after: Optional[Sequence[Any]] = None,
+    ) -> List[TarkovItem]:
+        """
+        Get tarkov item models with keyset pagination.
+
+        Instead of skipping rows, the query seeks the ordering index
+        right past the last item of the previous page, so every page
+        costs the same no matter how deep it is.
+
+        :param limit: limit of tarkov items.
+        :param order_by: ordering of tarkov items.
+        :param after: ``ORDERING_KEYS`` values of the last item
+            of the previous page, None for the first page.
+        :return: stream of tarkov items.
+        """
+        columns = self._ordering_columns(order_by)
+        query = select(TarkovItem).order_by(*columns).limit(limit)
+        if after is not None:
+            query = query.where(tuple_(*columns) > tuple(after))
+        raw_tarkov_items = await self.session.execute(query)
+
+        return list(raw_tarkov_items.scalars().fetchall())
+
     async def filter(
         self,
         name: Optional[str] = None,
@@ -59,6 +173,120 @@ class TarkovItemDAO:
         rows = await self.session.execute(query)
         return list(rows.scalars().fetchall())
 
+    async def get_tarkov_items_by_names(
+        self,
+        names: Sequence[str],
+    ) -> List[TarkovItem]:
+        """
+        Get tarkov item models with any of the names.
+
+        :param names: names of tarkov items.
+        :return: found tarkov item models.
+        """
+        query = select(TarkovItem).where(
+            TarkovItem.name
+            == func.any(
+                bindparam("names", list(names), type_=ARRAY(String())),
+            ),
+        )
+        rows = await self.session.execute(query)
+        return list(rows.scalars().fetchall())
+
+    async def get_tarkov_items_by_ids_or_names(
+        self,
+        ids: Sequence[int],
+        names: Sequence[str],
+    ) -> List[TarkovItem]:
+        """
+        Get tarkov item models with any of the ids or names in one query.
+
+        :param ids: ids of tarkov items.
+        :param names: names of tarkov items.
+        :return: found tarkov item models.
+        """
+        query = select(TarkovItem).where(
+            or_(
+                TarkovItem.id
+                == func.any(bindparam("ids", list(ids), type_=ARRAY(Integer()))),
+                TarkovItem.name
+                == func.any(bindparam("names", list(names), type_=ARRAY(String()))),
+            ),
+        )
+        rows = await self.session.execute(query)
+        return list(rows.scalars().fetchall())
+
+    async def get_tarkov_item_rows(self) -> Sequence[Row[Any]]:
+        """
+        Get prices of every tarkov item without loading models.
+
+        :return: rows with id, name, price and base_price columns.
+        """
+        rows = await self.session.execute(
+            select(
+                TarkovItem.id,
+                TarkovItem.name,
+                TarkovItem.price,
+                TarkovItem.base_price,
+            ),
+        )
+        return rows.all()
+
+    async def get_tarkov_item_stamped_rows(self) -> Sequence[Row[Any]]:
+        """
+        Get prices of every tarkov item with the time they were recorded.
+
+        Prices and times are read by a single statement, so they are
+        consistent even outside of a transaction.
+
+        :return: rows with id, name, price, base_price and recorded_at columns,
+            recorded_at is None for items without price history.
+        """
+        recorded_at = (
+            select(func.max(TarkovItemPrice.recorded_at))
+            .where(TarkovItemPrice.item_id == TarkovItem.id)
+            .scalar_subquery()
+        )
+        rows = await self.session.execute(
+            select(
+                TarkovItem.id,
+                TarkovItem.name,
+                TarkovItem.price,
+                TarkovItem.base_price,
+                recorded_at.label("recorded_at"),
+            ),
+        )
+        return rows.all()
+
+    async def search_tarkov_items(self, query: str, limit: int) -> List[TarkovItem]:
+        """
+        Find tarkov items with names similar to the query.
+
+        Names containing the query, in any case, match as well as
+        names similar to it by trigrams, so typos are tolerated.
+        Both use the trigram index on names. Names starting with
+        the query rank first, then the most similar ones.
+
+        :param query: text to look for.
+        :param limit: most items to return.
+        :return: best ranked tarkov items.
+        """
+        name = TarkovItem.name
+        similarity = func.similarity(name, query)
+        rows = await self.session.execute(
+            select(TarkovItem)
+            .where(
+                or_(name.icontains(query, autoescape=True), name.op("%")(query)),
+            )
+            .order_by(
+                name.istartswith(query, autoescape=True).desc(),
+                similarity.desc(),
+                func.length(name),
+                name,
+            )
+            .limit(limit),
+        )
+        return list(rows.scalars().fetchall())
+
     async def update_tarkov_item(
         self,
         item_id: int,
@@ -102,3 +330,94 @@ class TarkovItemDAO:
         query = select(TarkovItem).filter(TarkovItem.id == item_id)
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
+
+    async def bulk_upsert(
+        self,
+        items: Sequence[Mapping[str, Any]],
+    ) -> Sequence[Row[Any]]:
+        """
+        Insert or update many TarkovItems in one statement.
+
+        Items are matched by name. The whole batch is sent as three
+        arrays, so the statement doesn't grow with the number of items.
+        Rows whose prices didn't change are left untouched.
+        If the same name appears more than once, the last item wins.
+        Nothing is committed, so the caller can write more
+        in the same transaction.
+
+        :param items: mappings with name, price and base_price keys.
+        :return: id, name, price and base_price of inserted or updated rows.
+        """
+        rows = {item["name"]: item for item in items}
+        if not rows:
+            return []
+
+        values = (
+            func.unnest(
+                bindparam("names", list(rows), type_=ARRAY(String())),
+                bindparam(
+                    "prices",
+                    [row["price"] for row in rows.values()],
+                    type_=ARRAY(Integer()),
+                ),
+                bindparam(
+                    "base_prices",
+                    [row["base_price"] for row in rows.values()],
+                    type_=ARRAY(Integer()),
+                ),
+            )
+            .table_valued("name", "price", "base_price")
+            .render_derived()
+        )
+        query = _upsert_from(
+            select(values.c.name, values.c.price, values.c.base_price),
+        ).returning(
+            TarkovItem.id,
+            TarkovItem.name,
+            TarkovItem.price,
+            TarkovItem.base_price,
+        )
+
+        return (await self.session.execute(query)).all()
+
+    async def load_tarkov_items(self, rows: CopyRecords) -> Sequence[Row[Any]]:
+        """
+        Insert or update a large number of TarkovItems.
+
+        Rows are loaded into a temporary staging table with binary COPY
+        and merged into tarkov_items with a single statement,
+        so loads of hundreds of thousands of rows take seconds.
+        Items are matched by name, rows whose prices didn't change
+        are left untouched and if the same name appears more than once,
+        the last row wins.
+
+        :param rows: tuples of name, price and base_price.
+        :return: id, name, price and base_price of inserted or updated rows.
+        """
+        connection = await self.session.connection()
+        await connection.run_sync(tarkov_items_staging.create)
+        await copy_records(
+            self.session,
+            tarkov_items_staging,
+            ["name", "price", "base_price"],
+            rows,
+        )
+        staged = tarkov_items_staging.c
+        query = _upsert_from(
+            select(staged.name, staged.price, staged.base_price)
+            .distinct(staged.name)
+            .order_by(staged.name, staged.position.desc()),
+        ).returning(
+            TarkovItem.id,
+            TarkovItem.name,
+            TarkovItem.price,
+            TarkovItem.base_price,
+        )
+        written = (await self.session.execute(query)).all()
+        await connection.run_sync(tarkov_items_staging.drop)
+        await self.session.commit()
+        return written
+
+    @staticmethod
+    def _ordering_columns(order_by: TarkovItemOrdering) -> List[Any]:
+        return [getattr(TarkovItem, key) for key in ORDERING_KEYS[order_by]]
@@ -0,0 +1,288 @@
+from datetime import datetime, timezone
+from typing import Any, List, Sequence, cast
+
+from fastapi import Depends
+from sqlalchemy import ARRAY, Integer, String, bindparam, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Subquery
+
+from tarkov_calculator_api.db.dependencies import get_db_read_session, get_db_session
+from tarkov_calculator_api.db.models.tarkov_item_model import TarkovItem
+from tarkov_calculator_api.db.models.tarkov_item_price_model import TarkovItemPrice
+from tarkov_calculator_api.db.staging import (
+    CopyRecords,
+    copy_records,
+    tarkov_item_prices_staging,
+)
+
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month: datetime) -> datetime:
+    if month.month == 12:  # noqa: WPS432
+        return month.replace(year=month.year + 1, month=1)
+    return month.replace(month=month.month + 1)
+
+
+def _price_segments(item_id: int, start: datetime, end: datetime) -> Subquery:
+    """
+    Periods every price of the item held for, in seconds since start.
+
+    :param item_id: ID of the TarkovItem.
+    :param start: timezone-aware start of the period.
+    :param end: timezone-aware end of the period.
+    :return: subquery with price, base_price, held_from, held_until
+        and sampled columns, sampled is false for the carried sample.
+    """
+    columns = (
+        TarkovItemPrice.recorded_at,
+        TarkovItemPrice.price,
+        TarkovItemPrice.base_price,
+    )
+    carried = (
+        select(*columns)
+        .where(
+            TarkovItemPrice.item_id == item_id,
+            TarkovItemPrice.recorded_at < start,
+        )
+        .order_by(TarkovItemPrice.recorded_at.desc())
+        .limit(1)
+        .subquery()
+    )
+    samples = (
+        select(carried)
+        .union_all(
+            select(*columns).where(
+                TarkovItemPrice.item_id == item_id,
+                TarkovItemPrice.recorded_at >= start,
+                TarkovItemPrice.recorded_at < end,
+            ),
+        )
+        .subquery()
+    )
+    recorded_at = func.extract("epoch", samples.c.recorded_at) - start.timestamp()
+    held_until = func.lead(recorded_at).over(order_by=samples.c.recorded_at)
+    return select(
+        samples.c.price,
+        samples.c.base_price,
+        func.greatest(recorded_at, 0).label("held_from"),
+        func.coalesce(
+            held_until,
+            func.least(
+                func.extract("epoch", func.now()) - start.timestamp(),
+                (end - start).total_seconds(),
+            ),
+        ).label("held_until"),
+        (recorded_at >= 0).label("sampled"),
+    ).subquery()
+
+
+def _bucket_of(offset: Any, bucket_width: float, buckets: int) -> Any:
+    # Offsets right at the end may round up past the last bucket.
+    bucket = func.floor(offset / bucket_width).cast(Integer)
+    return func.least(bucket, buckets - 1)
+
+
+def _time_weighted(column: Any, held: Any) -> Any:
+    return func.sum(column * held) / func.sum(held)
+
+
+class TarkovItemPriceDAO:
+    """Class for accessing TarkovItemPrice table."""
+
+    def __init__(self, session: AsyncSession = Depends(get_db_session)):
+        self.session = session
+
+    @classmethod
+    def read_only(
+        cls,
+        session: AsyncSession = Depends(get_db_read_session),
+    ) -> "TarkovItemPriceDAO":
+        """
+        Create DAO for requests that only read.
+
+        :param session: session for reads only.
+        :return: DAO.
+        """
+        return cls(session)
+
+    async def create_partitions(self, moment: datetime) -> None:
+        """
+        Create monthly partitions for the moment's month and the next one.
+
+        Creating the next month ahead of time makes sure rows
+        never have to go to the default partition.
+
+        :param moment: timezone-aware moment in the first month to cover.
+        """
+        month = _month_start(moment.astimezone(timezone.utc))
+        for _ in range(2):
+            await self._create_partition(month)
+            month = _next_month(month)
+        await self.session.commit()
+
+    async def record_prices(self, names: Sequence[str], recorded_at: datetime) -> None:
+        """
+        Append current prices of the items to their history.
+
+        Prices are copied over inside the database,
+        so they don't have to travel to the application and back.
+        Nothing is committed, so the samples can be written in the same
+        transaction as the prices.
+
+        :param names: names of tarkov items to record.
+        :param recorded_at: timezone-aware time of the sample.
+        """
+        if not names:
+            return
+        query = (
+            insert(TarkovItemPrice)
+            .from_select(
+                ["item_id", "recorded_at", "price", "base_price"],
+                select(
+                    TarkovItem.id,
+                    literal(recorded_at, TarkovItemPrice.recorded_at.type),
+                    TarkovItem.price,
+                    TarkovItem.base_price,
+                ).where(
+                    TarkovItem.name
+                    == func.any(
+                        bindparam("names", list(names), type_=ARRAY(String())),
+                    ),
+                ),
+            )
+            .on_conflict_do_nothing()
+        )
+        await self.session.execute(query)
+
+    async def load_prices(self, rows: CopyRecords) -> int:  # noqa: WPS210
+        """
+        Append a large number of historical prices.
+
+        Rows are loaded into a temporary staging table with binary COPY,
+        partitions are created for every month found in them and
+        the rows are merged into the history with a single statement.
+        Rows of unknown items and samples that are already
+        recorded are skipped.
+
+        :param rows: tuples of item name, timezone-aware recorded_at,
+            price and base_price.
+        :return: number of inserted rows.
+        """
+        connection = await self.session.connection()
+        await connection.run_sync(tarkov_item_prices_staging.create)
+        await copy_records(
+            self.session,
+            tarkov_item_prices_staging,
+            ["name", "recorded_at", "price", "base_price"],
+            rows,
+        )
+        staged = tarkov_item_prices_staging.c
+        months = await self.session.scalars(
+            select(
+                func.date_trunc("month", staged.recorded_at, "UTC"),
+            ).distinct(),
+        )
+        for month in months.all():
+            await self._create_partition(month.astimezone(timezone.utc))
+        query = (
+            insert(TarkovItemPrice)
+            .from_select(
+                ["item_id", "recorded_at", "price", "base_price"],
+                select(
+                    TarkovItem.id,
+                    staged.recorded_at,
+                    staged.price,
+                    staged.base_price,
+                ).join_from(
+                    tarkov_item_prices_staging,
+                    TarkovItem,
+                    TarkovItem.name == staged.name,
+                ),
+            )
+            .on_conflict_do_nothing()
+        )
+        written = cast(CursorResult[Any], await self.session.execute(query))
+        await connection.run_sync(tarkov_item_prices_staging.drop)
+        await self.session.commit()
+        return written.rowcount
+
+    async def get_price_history(  # noqa: WPS210
+        self,
+        item_id: int,
+        start: datetime,
+        end: datetime,
+        buckets: int,
+    ) -> List[Any]:
+        """
+        Get price history of an item downsampled to equal time buckets.
+
+        Samples are only recorded when prices change, so every price
+        holds until the next sample, and the last one until the end
+        of the period or now, whichever is earlier. Prices are averaged
+        over time, weighted by how long each of them held in the bucket.
+        The last sample before the period is carried into it, buckets
+        before the first sample are omitted.
+
+        Aggregation is done by the database, which only reads
+        the partitions and index range covering the requested period.
+
+        :param item_id: ID of the TarkovItem.
+        :param start: timezone-aware start of the period, inclusive.
+        :param end: timezone-aware end of the period, exclusive.
+        :param buckets: number of buckets to split the period into.
+        :return: rows with bucket, price, price_min, price_max,
+            base_price and samples columns, ordered by bucket.
+            Samples are the ones recorded within the bucket.
+        """
+        bucket_width = (end - start).total_seconds() / buckets
+        segments = _price_segments(item_id, start, end)
+        first = _bucket_of(segments.c.held_from, bucket_width, buckets)
+        last = func.least(
+            func.ceil(segments.c.held_until / bucket_width).cast(Integer) - 1,
+            buckets - 1,
+        )
+        bucket = (
+            func.generate_series(first, last)
+            .table_valued("bucket")
+            .render_derived()
+            .lateral()
+        )
+        held = func.least(
+            segments.c.held_until,
+            (bucket.c.bucket + 1) * bucket_width,
+        ) - func.greatest(segments.c.held_from, bucket.c.bucket * bucket_width)
+        query = (
+            select(
+                bucket.c.bucket,
+                _time_weighted(segments.c.price, held).label("price"),
+                func.min(segments.c.price).label("price_min"),
+                func.max(segments.c.price).label("price_max"),
+                _time_weighted(segments.c.base_price, held).label("base_price"),
+                func.count()
+                .filter(segments.c.sampled, first == bucket.c.bucket)
+                .label("samples"),
+            )
+            .select_from(segments.join(bucket, literal(value=True)))
+            .where(held > 0)
+            .group_by(bucket.c.bucket)
+            .order_by(bucket.c.bucket)
+        )
+        rows = await self.session.execute(query)
+        return list(rows.fetchall())
+
+    async def _create_partition(self, month: datetime) -> None:
+        next_month = _next_month(month)
+        await self.session.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS "  # noqa: S608
+                f"tarkov_item_prices_y{month:%Y}m{month:%m} "
+                "PARTITION OF tarkov_item_prices "
+                f"FOR VALUES FROM ('{month.isoformat()}') "
+                f"TO ('{next_month.isoformat()}')",
+            ),
+        )
@@ -1,13 +1,39 @@
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from starlette.requests import Request
 
+from tarkov_calculator_api.db.replicas import ReplicaRouter
+
+
+def get_db_engine(request: Request) -> AsyncEngine:
+    """
+    Get database engine of the worker.
+
+    :param request: current request.
+    :return: database engine.
+    """
+    return request.app.state.db_engine
+
+
+def get_db_replicas(request: Request) -> ReplicaRouter:
+    """
+    Get router of read sessions to replicas of the worker.
+
+    :param request: current request.
+    :return: replica router.
+    """
+    return request.app.state.db_replicas
+
 
 async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     Create and get database session.
 
+    The session checks out a connection on first use, so requests
+    answered without touching the database cost nothing. Open
+    transactions are committed after the request.
+
     :param request: current request.
     :yield: database session.
     """
@@ -16,5 +42,52 @@ async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]
     try:  # noqa: WPS501
         yield session
     finally:
-        await session.commit()
+        if session.in_transaction():
+            await session.commit()
+        await session.close()
+
+
+async def get_db_read_session(
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Create and get database session for reads only.
+
+    The session is on a replica if there are healthy ones,
+    otherwise on the primary.
+
+    Unlike ``get_db_session`` it's never committed. Depending on
+    settings, every query runs on its own without BEGIN and COMMIT,
+    or in a READ ONLY transaction that's rolled back after the request.
+
+    :param request: current request.
+    :yield: database session.
+    """
+    session: AsyncSession = request.app.state.db_read_session_factory()
+
+    try:  # noqa: WPS501
+        yield session
+    finally:
+        await session.close()
+
+
+async def get_db_primary_read_session(
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Create and get database session for reads only on the primary.
+
+    It's meant for reads that fill caches. Once a price change
+    is announced, cached entries are tagged with the new version
+    of prices, and replicas may not have replayed the change yet,
+    so their rows would be cached as the new version.
+
+    :param request: current request.
+    :yield: database session.
+    """
+    session: AsyncSession = request.app.state.db_replicas.primary()
+
+    try:  # noqa: WPS501
+        yield session
+    finally:
         await session.close()
@@ -0,0 +1,33 @@
+"""Unique index on tarkov item name.
+
+Revision ID: cca37d84ce64
+Revises: 0e80e8853902
+Create Date: 2026-10-18 10:12:41.270301
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "cca37d84ce64"
+down_revision = "0e80e8853902"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the oldest row for every name, the refresh path always updated it.
+    op.execute(
+        "DELETE FROM tarkov_items AS duplicate "
+        "USING tarkov_items AS original "
+        "WHERE duplicate.name = original.name AND duplicate.id > original.id",
+    )
+    op.create_index(
+        op.f("ix_tarkov_items_name"),
+        "tarkov_items",
+        ["name"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_tarkov_items_name"), table_name="tarkov_items")
@@ -0,0 +1,27 @@
+"""Index for listing tarkov items by price.
+
+Revision ID: e215f3b5d9ee
+Revises: cca37d84ce64
+Create Date: 2026-10-18 11:40:09.118426
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e215f3b5d9ee"
+down_revision = "cca37d84ce64"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_tarkov_items_price_id",
+        "tarkov_items",
+        ["price", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tarkov_items_price_id", table_name="tarkov_items")
@@ -0,0 +1,42 @@
+"""Partitioned tarkov item price history.
+
+Revision ID: 7cd86ded883c
+Revises: e215f3b5d9ee
+Create Date: 2026-10-18 13:05:52.604117
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7cd86ded883c"
+down_revision = "e215f3b5d9ee"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tarkov_item_prices",
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("recorded_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("price", sa.Integer(), nullable=False),
+        sa.Column("base_price", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["item_id"],
+            ["tarkov_items.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("item_id", "recorded_at"),
+        postgresql_partition_by="RANGE (recorded_at)",
+    )
+    # Monthly partitions are created by the refresh path,
+    # this one catches everything else.
+    op.execute(
+        "CREATE TABLE tarkov_item_prices_default "
+        "PARTITION OF tarkov_item_prices DEFAULT",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("tarkov_item_prices")
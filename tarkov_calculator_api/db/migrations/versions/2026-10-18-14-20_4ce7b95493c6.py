@@ -0,0 +1,34 @@
+"""Trigram index for searching tarkov items by name.
+
+Revision ID: 4ce7b95493c6
+Revises: 7cd86ded883c
+Create Date: 2026-10-18 14:20:31.550187
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "4ce7b95493c6"
+down_revision = "7cd86ded883c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Serves substring and similarity matches, which the btree
+    # index on names can't. The operator class needs pg_trgm,
+    # so the index is left out of the model metadata.
+    op.create_index(
+        "ix_tarkov_items_name_trgm",
+        "tarkov_items",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    # The extension may be used by others, so it's kept.
+    op.drop_index("ix_tarkov_items_name_trgm", table_name="tarkov_items")
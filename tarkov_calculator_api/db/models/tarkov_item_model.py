@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql.sqltypes import Integer, String
 
@@ -8,8 +9,13 @@ class TarkovItem(Base):
     """Model for demo purpose."""
 
     __tablename__ = "tarkov_items"
+    __table_args__ = (Index("ix_tarkov_items_price_id", "price", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String(length=200))  # noqa: WPS432
+    name: Mapped[str] = mapped_column(
+        String(length=200),  # noqa: WPS432
+        unique=True,
+        index=True,
+    )
     price: Mapped[int] = mapped_column(Integer())  # noqa: WPS432
     base_price: Mapped[int] = mapped_column(Integer())  # noqa: WPS432
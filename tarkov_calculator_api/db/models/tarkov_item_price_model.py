@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from sqlalchemy import DDL, ForeignKey, event
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.sqltypes import DateTime, Integer
+
+from tarkov_calculator_api.db.base import Base
+
+
+class TarkovItemPrice(Base):
+    """
+    Price of a tarkov item at some point in time.
+
+    The table is append-only and range-partitioned by ``recorded_at``,
+    one partition per month. Rows outside of existing partitions
+    land in the default one.
+    """
+
+    __tablename__ = "tarkov_item_prices"
+    __table_args__ = {"postgresql_partition_by": "RANGE (recorded_at)"}
+
+    item_id: Mapped[int] = mapped_column(
+        ForeignKey("tarkov_items.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    recorded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+    )
+    price: Mapped[int] = mapped_column(Integer())
+    base_price: Mapped[int] = mapped_column(Integer())
+
+
+event.listen(
+    TarkovItemPrice.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE tarkov_item_prices_default "
+        "PARTITION OF tarkov_item_prices DEFAULT",
+    ),
+)
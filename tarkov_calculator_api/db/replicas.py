@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from itertools import count
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from tarkov_calculator_api.services.metrics import pool_info
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaRouter:
+    """
+    Creates read sessions on replicas of the database.
+
+    Sessions are spread over healthy replicas round-robin. Replicas
+    are checked in the background, one gets sessions only after
+    it passed the last check. If no replica is healthy,
+    sessions are created on the primary.
+
+    Replicas lag behind the primary, so sessions of requests that
+    have to read their own writes, or fill caches tagged with
+    the latest version of prices, must come from the primary.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Sequence[AsyncEngine],
+        read_options: Dict[str, Any],
+    ) -> None:
+        self.replicas = list(replicas)
+        self.healthy = [False for _ in self.replicas]
+        self._primary_factory = self._factory(primary, read_options)
+        self._replica_factories = [
+            self._factory(replica, read_options) for replica in self.replicas
+        ]
+        self._turns = count()
+
+    def __call__(self) -> AsyncSession:
+        """
+        Create read session on the next healthy replica.
+
+        :return: session on a replica, or on the primary if no replica is healthy.
+        """
+        healthy = [
+            factory
+            for factory, is_healthy in zip(self._replica_factories, self.healthy)
+            if is_healthy
+        ]
+        if not healthy:
+            return self._primary_factory()
+        return healthy[next(self._turns) % len(healthy)]()
+
+    def primary(self) -> AsyncSession:
+        """
+        Create read session on the primary.
+
+        :return: session on the primary.
+        """
+        return self._primary_factory()
+
+    async def check(self, timeout: float) -> None:
+        """
+        Check every replica at once.
+
+        :param timeout: seconds a replica has to answer in.
+        """
+        results = await asyncio.gather(
+            *[self._check_replica(replica, timeout) for replica in self.replicas],
+        )
+        for index, is_healthy in enumerate(results):
+            if is_healthy != self.healthy[index]:
+                state = "healthy" if is_healthy else "unhealthy"
+                logger.warning(f"Database replica {index} is {state}")
+            self.healthy[index] = is_healthy
+
+    async def run(self, interval: float, timeout: float) -> None:
+        """
+        Check replicas until cancelled.
+
+        :param interval: seconds between checks.
+        :param timeout: seconds a replica has to answer in.
+        """
+        while True:  # noqa: WPS457
+            await self.check(timeout)
+            await asyncio.sleep(interval)
+
+    def info(self) -> List[Dict[str, Any]]:
+        """
+        Health and pool statistics of every replica.
+
+        :return: statistics of replicas in order of settings.
+        """
+        return [
+            {"healthy": is_healthy, **pool_info(replica.pool)}
+            for replica, is_healthy in zip(self.replicas, self.healthy)
+        ]
+
+    async def dispose(self) -> None:
+        """Close connections to all replicas."""
+        for replica in self.replicas:
+            await replica.dispose()
+
+    def _factory(
+        self,
+        engine: AsyncEngine,
+        read_options: Dict[str, Any],
+    ) -> "async_sessionmaker[AsyncSession]":
+        return async_sessionmaker(
+            engine.execution_options(**read_options),
+            expire_on_commit=False,
+        )
+
+    async def _check_replica(self, replica: AsyncEngine, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._ping(replica), timeout)
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError):
+            return False
+        return True
+
+    async def _ping(self, replica: AsyncEngine) -> None:
+        async with replica.connect() as connection:
+            await connection.execute(text("SELECT 1"))
@@ -0,0 +1,64 @@
+from typing import Any, AsyncIterable, Iterable, Sequence, Union
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, MetaData, Table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tarkov_calculator_api.db.models.tarkov_item_model import TarkovItem
+
+# Rows loaded by COPY, synchronous or asynchronous iterables of tuples.
+CopyRecord = Sequence[Any]
+CopyRecords = Union[Iterable[CopyRecord], AsyncIterable[CopyRecord]]
+
+# Temporary tables bulk loads are copied into before they are merged.
+# They have metadata of their own, so migrations don't see them.
+# Position keeps the order rows were copied in.
+staging_meta = MetaData()
+
+tarkov_items_staging = Table(
+    "tarkov_items_staging",
+    staging_meta,
+    Column("position", BigInteger, primary_key=True),
+    Column("name", TarkovItem.name.type, nullable=False),
+    Column("price", Integer, nullable=False),
+    Column("base_price", Integer, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+tarkov_item_prices_staging = Table(
+    "tarkov_item_prices_staging",
+    staging_meta,
+    Column("position", BigInteger, primary_key=True),
+    Column("name", TarkovItem.name.type, nullable=False),
+    Column("recorded_at", DateTime(timezone=True), nullable=False),
+    Column("price", Integer, nullable=False),
+    Column("base_price", Integer, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
+async def copy_records(
+    session: AsyncSession,
+    table: Table,
+    columns: Sequence[str],
+    records: CopyRecords,
+) -> None:
+    """
+    Copy records into a table with binary COPY.
+
+    It runs on the connection of the session, so it's a part of
+    the session's transaction. Records are streamed to the database
+    while they're produced, so they don't have to fit in memory.
+
+    :param session: session to copy with.
+    :param table: table to copy into.
+    :param columns: columns of the records.
+    :param records: rows as tuples.
+    """
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection: Any = raw_connection.driver_connection
+    await driver_connection.copy_records_to_table(
+        table.name,
+        records=records,
+        columns=list(columns),
+    )
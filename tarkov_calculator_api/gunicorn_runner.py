@@ -1,9 +1,12 @@
+import time
 from typing import Any
 
 from gunicorn.app.base import BaseApplication
 from gunicorn.util import import_app
 from uvicorn.workers import UvicornWorker as BaseUvicornWorker
 
+from tarkov_calculator_api.web.startup import AppFactory
+
 try:
     import uvloop  # noqa: WPS433 (Found nested import)
 except ImportError:
@@ -66,14 +69,20 @@ class GunicornApplication(BaseApplication):
             if key in self.cfg.settings and value is not None:
                 self.cfg.set(key.lower(), value)
 
-    def load(self) -> str:
+    def load(self) -> AppFactory:
         """
         Load actual application.
 
         Gunicorn loads application based on this
-        function's returns. We return python's path to
-        the app's factory.
+        function's returns. We return the app's factory,
+        with ``preload_app`` the app is built right away,
+        in the master, and shared by forked workers.
 
-        :returns: python path to app factory.
+        :returns: app factory.
         """
-        return import_app(self.app)
+        started_at = time.perf_counter()
+        factory = import_app(self.app)
+        app_factory = AppFactory(factory, time.perf_counter() - started_at)
+        if self.cfg.preload_app:
+            app_factory.build(preloaded=True)
+        return app_factory
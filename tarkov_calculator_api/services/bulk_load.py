@@ -0,0 +1,172 @@
+import csv
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from tarkov_calculator_api.calculator.rates import ExchangeRates
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.db.dao.tarkov_item_price_dao import TarkovItemPriceDAO
+from tarkov_calculator_api.services.cache import TarkovItemCache
+from tarkov_calculator_api.services.price_updates import PriceChange, PriceUpdates
+from tarkov_calculator_api.services.shared_cache import create_shared_cache
+from tarkov_calculator_api.settings import settings
+
+ITEM_COLUMNS = ("name", "price", "base_price")
+PRICE_COLUMNS = ("name", "recorded_at", "price", "base_price")
+
+CSVRow = Dict[str, str]
+Record = Tuple[Any, ...]
+Loader = Callable[[AsyncSession, Path, PriceUpdates], Awaitable[int]]
+
+
+def _item_record(row: CSVRow) -> Record:
+    price = int(row["price"])
+    base_price = int(row["base_price"])
+    return row["name"], price, base_price
+
+
+def _price_record(row: CSVRow) -> Record:
+    recorded_at = datetime.fromisoformat(row["recorded_at"])
+    if recorded_at.tzinfo is None:
+        recorded_at = recorded_at.replace(tzinfo=timezone.utc)
+    price = int(row["price"])
+    base_price = int(row["base_price"])
+    return row["name"], recorded_at, price, base_price
+
+
+def read_records(
+    path: Path,
+    columns: Sequence[str],
+    parse: Callable[[CSVRow], Record],
+) -> Iterator[Record]:
+    """
+    Read records from a CSV file with a header.
+
+    Rows are read lazily, so files of any size can be loaded.
+
+    :param path: path of the file.
+    :param columns: columns the header must have.
+    :param parse: function converting a row to a record.
+    :yields: parsed records.
+    :raises ValueError: if a column is missing or a row is invalid.
+    """
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        reader = csv.DictReader(csv_file)
+        missing = set(columns).difference(reader.fieldnames or [])
+        if missing:
+            missing_columns = ", ".join(sorted(missing))
+            raise ValueError(f"{path}: missing columns {missing_columns}")
+        for row in reader:
+            try:
+                yield parse(row)
+            except (TypeError, ValueError) as error:
+                raise ValueError(f"{path}:{reader.line_num}: {error}") from error
+
+
+def read_items(path: Path) -> Iterator[Record]:
+    """
+    Read tarkov items from a CSV file.
+
+    :param path: file with name, price and base_price columns.
+    :return: tuples of name, price and base_price.
+    """
+    return read_records(path, ITEM_COLUMNS, _item_record)
+
+
+def read_prices(path: Path) -> Iterator[Record]:
+    """
+    Read price history from a CSV file.
+
+    Timestamps without a timezone are treated as UTC.
+
+    :param path: file with name, recorded_at, price and base_price columns.
+    :return: tuples of name, recorded_at, price and base_price.
+    """
+    return read_records(path, PRICE_COLUMNS, _price_record)
+
+
+async def load_items(
+    session: AsyncSession,
+    path: Path,
+    price_updates: PriceUpdates,
+) -> int:
+    """
+    Load tarkov items from a CSV file.
+
+    Changed prices are published like the ones of a refresh,
+    so running workers drop cached reads and update their prices.
+
+    :param session: session to load with.
+    :param path: file with name, price and base_price columns.
+    :param price_updates: hub to publish changed prices to.
+    :return: number of inserted or updated items.
+    """
+    written = await TarkovItemDAO(session).load_tarkov_items(read_items(path))
+    changes = [PriceChange(*row) for row in written]
+    await price_updates.publish(session, changes, datetime.now(timezone.utc))
+    return len(changes)
+
+
+async def load_prices(
+    session: AsyncSession,
+    path: Path,
+    price_updates: PriceUpdates,
+) -> int:
+    """
+    Load price history from a CSV file.
+
+    History isn't cached and current prices stay as they are,
+    so nothing is published.
+
+    :param session: session to load with.
+    :param path: file with name, recorded_at, price and base_price columns.
+    :param price_updates: hub to publish changed prices to, unused.
+    :return: number of inserted prices.
+    """
+    return await TarkovItemPriceDAO(session).load_prices(read_prices(path))
+
+
+def create_price_updates() -> PriceUpdates:
+    """
+    Create hub to publish price changes of a bulk load with.
+
+    Its cache shares the generation of entries with the workers
+    through the shared cache, if there is one.
+
+    :return: price updates hub.
+    """
+    shared = create_shared_cache(
+        settings.shared_cache_url,
+        settings.shared_cache_prefix,
+        settings.shared_cache_timeout,
+    )
+    return PriceUpdates(
+        TarkovItemCache(max_size=1, ttl=settings.tarkov_item_cache_ttl, shared=shared),
+        ExchangeRates(),
+        queue_size=1,
+    )
+
+
+async def run_bulk_load(load: Loader, path: Path) -> None:  # noqa: WPS210
+    """
+    Run a bulk load against the configured database and report it.
+
+    :param load: loader to run.
+    :param path: file to load.
+    """
+    engine = create_async_engine(str(settings.db_url), echo=settings.db_echo)
+    price_updates = create_price_updates()
+    started = time.perf_counter()
+    try:  # noqa: WPS501
+        async with AsyncSession(engine) as session:
+            loaded = await load(session, path, price_updates)
+    finally:
+        await engine.dispose()
+        if price_updates.tarkov_item_cache.shared is not None:
+            await price_updates.tarkov_item_cache.shared.close()
+    elapsed = time.perf_counter() - started
+    report = f"Loaded {loaded} rows in {elapsed:.2f}s."
+    print(report)  # noqa: WPS421
@@ -0,0 +1,284 @@
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from starlette.requests import Request
+
+from tarkov_calculator_api.services.metrics import (
+    SHARED_CACHE_ERRORS,
+    SHARED_CACHE_HITS,
+    SHARED_CACHE_MISSES,
+    TARKOV_ITEM_CACHE_HITS,
+    TARKOV_ITEM_CACHE_MISSES,
+)
+from tarkov_calculator_api.services.shared_cache import SharedCache, SharedCacheError
+
+logger = logging.getLogger(__name__)
+
+# Shared cache key of the generation entries are currently stored under.
+GENERATION_KEY = "generation"
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class SharedCodec:
+    """Encodes values stored in the shared cache and decodes them back."""
+
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes], Any]
+
+
+@dataclass
+class CacheStats:
+    """Counters describing how a cache is performing."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    shared_hits: int = 0
+    shared_misses: int = 0
+    shared_errors: int = 0
+
+
+class TarkovItemCache:
+    """
+    Per-worker read-through cache for tarkov item queries.
+
+    Entries are evicted in LRU order once ``max_size`` is reached
+    and expire after ``ttl`` seconds. ``invalidate`` bumps the cache
+    version, and values are only stored if they were loaded under the
+    current version, so a read racing with a refresh can't put
+    outdated prices back into the cache.
+
+    With a shared cache, this one is the first level in front of it.
+    Values that have a codec are looked up in the shared cache
+    on a miss, and stored in both. Shared entries are namespaced
+    by a generation, which changes with every invalidation, so they
+    are never deleted, they just expire. Until the current generation
+    is synced from the shared cache, a random one is used, so entries
+    of other workers are only read once it's known they're fresh.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+        shared: Optional[SharedCache] = None,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version = 0
+        self.stats = CacheStats()
+        self.shared = shared
+        self.generation = uuid.uuid4().hex
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, Any]]" = OrderedDict()
+        self._shared_healthy = True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get cached value.
+
+        :param key: cache key.
+        :param default: value to return if key is not cached.
+        :return: cached value or default.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            TARKOV_ITEM_CACHE_MISSES.inc()
+            return default
+        version, expires_at, value = entry
+        if version != self.version or expires_at <= self._clock():
+            del self._entries[key]  # noqa: WPS420
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            TARKOV_ITEM_CACHE_MISSES.inc()
+            return default
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        TARKOV_ITEM_CACHE_HITS.inc()
+        return value
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        """
+        Put value in the cache.
+
+        If the value was loaded under an older version than the current one,
+        it is silently dropped, because data has changed since it was read.
+
+        :param key: cache key.
+        :param value: value to store.
+        :param version: version the value was loaded under, defaults to current.
+        """
+        if version is None:
+            version = self.version
+        if version != self.version or self.max_size <= 0:
+            return
+        self._entries[key] = (version, self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def put(
+        self,
+        key: Hashable,
+        value: Any,
+        version: Optional[int] = None,
+        codec: Optional[SharedCodec] = None,
+    ) -> None:
+        """
+        Put value in the cache, and in the shared cache if it has a codec.
+
+        Like with ``set``, values loaded under an older version are dropped.
+
+        :param key: cache key.
+        :param value: value to store.
+        :param version: version the value was loaded under, defaults to current.
+        :param codec: codec of the value in the shared cache.
+        """
+        if version is None:
+            version = self.version
+        if version != self.version:
+            return
+        self.set(key, value, version=version)
+        if codec is None or self.shared is None:
+            return
+        shared_key = self._shared_key(key)
+        try:
+            await self.shared.set(shared_key, codec.encode(value), self.ttl)
+        except SharedCacheError as error:
+            self._shared_failed(error)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        codec: Optional[SharedCodec] = None,
+    ) -> Any:
+        """
+        Get value from the cache or load it and cache the result.
+
+        ``None`` results are never cached.
+
+        :param key: cache key.
+        :param loader: coroutine function producing the value on a miss.
+        :param codec: codec of the value in the shared cache.
+        :return: cached or freshly loaded value.
+        """
+        cached = self.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        version = self.version
+        if codec is not None:
+            shared_value = await self._get_shared(key, codec)
+            if shared_value is not None:
+                self.set(key, shared_value, version=version)
+                return shared_value
+        value = await loader()
+        if value is not None:
+            await self.put(key, value, version=version, codec=codec)
+        return value
+
+    def invalidate(self, generation: Optional[str] = None) -> None:
+        """
+        Bump the version, making every cached entry stale.
+
+        :param generation: new generation of shared entries, random if None.
+        """
+        self.version += 1
+        self.generation = generation or uuid.uuid4().hex
+        self.stats.invalidations += 1
+        self._entries.clear()
+
+    async def share_generation(self) -> None:
+        """Make the current generation the one of every worker."""
+        if self.shared is None:
+            return
+        try:
+            await self.shared.set(GENERATION_KEY, self.generation.encode(), None)
+        except SharedCacheError as error:
+            self._shared_failed(error)
+
+    async def sync_generation(self) -> None:
+        """Switch to the generation shared by other workers."""
+        if self.shared is None:
+            return
+        try:
+            generation = await self.shared.get(GENERATION_KEY)
+        except SharedCacheError as error:
+            self._shared_failed(error)
+            return
+        if generation is not None:
+            self.generation = generation.decode()
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        :return: counters along with current size and version.
+        """
+        return {
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "evictions": self.stats.evictions,
+            "expirations": self.stats.expirations,
+            "invalidations": self.stats.invalidations,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "version": self.version,
+            "shared": None if self.shared is None else self.shared.name,
+            "shared_hits": self.stats.shared_hits,
+            "shared_misses": self.stats.shared_misses,
+            "shared_errors": self.stats.shared_errors,
+            "generation": self.generation,
+        }
+
+    async def _get_shared(self, key: Hashable, codec: SharedCodec) -> Any:
+        if self.shared is None:
+            return None
+        try:
+            encoded = await self.shared.get(self._shared_key(key))
+        except SharedCacheError as error:
+            self._shared_failed(error)
+            return None
+        self._shared_healthy = True
+        if encoded is None:
+            self.stats.shared_misses += 1
+            SHARED_CACHE_MISSES.inc()
+            return None
+        self.stats.shared_hits += 1
+        SHARED_CACHE_HITS.inc()
+        return codec.decode(encoded)
+
+    def _shared_key(self, key: Hashable) -> str:
+        return f"{self.generation}:{key!r}"
+
+    def _shared_failed(self, error: SharedCacheError) -> None:
+        self.stats.shared_errors += 1
+        SHARED_CACHE_ERRORS.inc()
+        # Every request fails while the shared cache is down, it's only logged once.
+        if self._shared_healthy:
+            logger.warning(f"Shared cache failed: {error}")
+        self._shared_healthy = False
+
+
+def get_tarkov_item_cache(request: Request) -> TarkovItemCache:
+    """
+    Get tarkov item cache of the current worker.
+
+    :param request: current request.
+    :return: tarkov item cache.
+    """
+    return request.app.state.tarkov_item_cache
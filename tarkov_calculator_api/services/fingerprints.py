@@ -0,0 +1,68 @@
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+from starlette.requests import Request
+
+Row = Mapping[str, Any]
+
+
+class UpstreamFingerprints:
+    """
+    Prices of every item as last written from the upstream.
+
+    Refreshes compare fetched items with them and only write items
+    whose prices changed, so a stable catalogue costs no writes.
+    Fingerprints are only updated once items are written, so an item
+    that failed to be written is tried again by the next refresh.
+
+    They live in the memory of the worker, so after a restart, or when
+    another worker takes over refreshes, the first refresh writes
+    every item once more. The database still skips rows whose prices
+    didn't change.
+    """
+
+    def __init__(self) -> None:
+        self._prices: Dict[str, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._prices
+
+    def changed(self, rows: Sequence[Row]) -> List[Row]:
+        """
+        Filter rows whose prices differ from the last written ones.
+
+        :param rows: rows with name, price and base_price.
+        :return: rows of new items and items with new prices.
+        """
+        return [row for row in rows if self.is_changed(row)]
+
+    def is_changed(self, row: Row) -> bool:
+        """
+        Check whether prices of the row differ from the last written ones.
+
+        :param row: row with name, price and base_price.
+        :return: True if the item is new or its prices changed.
+        """
+        prices = (row["price"], row["base_price"])
+        return self._prices.get(row["name"]) != prices
+
+    def remember(self, rows: Sequence[Row]) -> None:
+        """
+        Remember prices of written rows.
+
+        :param rows: rows with name, price and base_price.
+        """
+        for row in rows:
+            self._prices[row["name"]] = (row["price"], row["base_price"])
+
+
+def get_upstream_fingerprints(request: Request) -> UpstreamFingerprints:
+    """
+    Get upstream fingerprints of the worker.
+
+    :param request: current request.
+    :return: upstream fingerprints.
+    """
+    return request.app.state.upstream_fingerprints
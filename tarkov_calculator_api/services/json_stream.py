@@ -0,0 +1,91 @@
+import codecs
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+# Whitespace and commas between array elements.
+_SEPARATORS = re.compile(r"[ \t\n\r,]*")
+# Characters that may follow a complete array element.
+_ELEMENT_ENDS = frozenset(" \t\n\r,]")
+
+
+class JSONArrayStream:
+    """
+    Incremental parser of a top-level JSON array.
+
+    Bytes are fed as they arrive and every element is returned
+    as soon as it's complete, so only the unfinished element is
+    kept in memory, no matter how long the array is.
+    Separators between elements are not validated.
+    """
+
+    def __init__(self, max_element_size: int = 1024 * 1024) -> None:
+        self.max_element_size = max_element_size
+        self.finished = False
+        self._started = False
+        self._buffer = ""
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Parse the next part of the array.
+
+        :param chunk: next bytes of the document.
+        :return: elements completed by the chunk.
+        :raises ValueError: if the document is not an array
+            or an element is too large.
+        """
+        if self.finished:
+            return []
+        self._buffer += self._text_decoder.decode(chunk)
+        if not self._started:
+            self._buffer = self._buffer.lstrip()
+            if not self._buffer:
+                return []
+            if self._buffer[0] != "[":
+                raise ValueError("JSON document is not an array")
+            self._buffer = self._buffer[1:]
+            self._started = True
+        elements = self._parse_elements()
+        if len(self._buffer) > self.max_element_size:
+            raise ValueError("JSON array element is too large")
+        return elements
+
+    def close(self) -> None:
+        """
+        Check that the whole array was parsed.
+
+        :raises ValueError: if the array is incomplete.
+        """
+        self.feed(self._text_decoder.decode(b"", final=True).encode())
+        if not self.finished:
+            raise ValueError("JSON array is incomplete")
+
+    def _parse_elements(self) -> List[Any]:
+        elements = []
+        position = 0
+        while not self.finished:
+            parsed = self._parse_element(position)
+            if parsed is None:
+                break
+            element, position = parsed
+            elements.append(element)
+        self._buffer = self._buffer[position:]
+        return elements
+
+    def _parse_element(self, position: int) -> Optional[Tuple[Any, int]]:
+        match = _SEPARATORS.match(self._buffer, position)
+        start = match.end() if match else position
+        if self._buffer.startswith("]", start):
+            self.finished = True
+            return None
+        try:
+            element, end = self._json_decoder.raw_decode(self._buffer, start)
+        except json.JSONDecodeError:
+            return None
+        # Numbers may continue in the next chunk, so elements
+        # are only complete once something that ends them follows.
+        if self._buffer[end : end + 1] not in _ELEMENT_ENDS:
+            return None
+        return element, end
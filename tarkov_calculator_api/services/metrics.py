@@ -0,0 +1,344 @@
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, Pool, QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Directory of metric files shared by gunicorn workers.
+# Multiprocess mode is on when it's set, it has to be
+# set before the first metric is created in any process.
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+# Route label of requests that didn't match any route.
+UNMATCHED_ROUTE = "unmatched"
+# Status the server error middleware answers failed requests with.
+HTTP_SERVER_ERROR = 500
+# Pool label of the primary database, pools of replicas are named.
+PRIMARY_POOL = "primary"
+# Key of the query start times in connection info.
+_QUERY_STARTS = "metrics_query_starts"
+
+# Mostly sub-millisecond operations, up to slow upstream calls.
+FAST_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+# Refreshes take from a fraction of a second to minutes.
+REFRESH_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time until response headers are sent, by route template.",
+    ["method", "route", "status"],
+    buckets=FAST_BUCKETS,
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Time spent executing database queries.",
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection.",
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Database connections in use, of all live workers.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Database connections opened above the pool size, of all live workers.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+UPSTREAM_LATENCY = Histogram(
+    "tarkov_market_request_duration_seconds",
+    "Time until response headers of tarkov market requests.",
+    ["endpoint"],
+    buckets=FAST_BUCKETS,
+)
+UPSTREAM_ERRORS = Counter(
+    "tarkov_market_errors_total",
+    "Failed tarkov market requests, by HTTP status or exception.",
+    ["endpoint", "reason"],
+)
+REFRESH_DURATION = Histogram(
+    "refresh_duration_seconds",
+    "Duration of market data refreshes.",
+    buckets=REFRESH_BUCKETS,
+)
+REFRESH_LAST_SUCCESS = Gauge(
+    "refresh_last_success_timestamp_seconds",
+    "Unix time the last successful refresh finished at.",
+    multiprocess_mode="max",
+)
+REFRESH_ITEMS = Counter(
+    "refresh_items_total",
+    "Items of refreshes, by whether their prices changed.",
+    ["result"],
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Cache lookups, hit ratio is hits over all lookups.",
+    ["cache", "result"],
+)
+TARKOV_ITEM_CACHE_HITS = CACHE_LOOKUPS.labels("tarkov_item", "hit")
+TARKOV_ITEM_CACHE_MISSES = CACHE_LOOKUPS.labels("tarkov_item", "miss")
+SHARED_CACHE_HITS = CACHE_LOOKUPS.labels("shared", "hit")
+SHARED_CACHE_MISSES = CACHE_LOOKUPS.labels("shared", "miss")
+SHARED_CACHE_ERRORS = CACHE_LOOKUPS.labels("shared", "error")
+
+Observe = Callable[[Scope, int, float], None]
+
+
+def multiprocess_dir() -> Optional[Path]:
+    """
+    Get the directory of metric files shared by workers.
+
+    :return: directory, or None if multiprocess mode is off.
+    """
+    directory = os.environ.get(MULTIPROCESS_DIR_ENV)
+    return Path(directory) if directory else None
+
+
+def prepare_multiprocess_dir() -> None:
+    """
+    Remove metric files of a previous run.
+
+    It must be called by the gunicorn master before workers start,
+    otherwise counters of dead processes are reported forever.
+    """
+    directory = multiprocess_dir()
+    if directory is None:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    for metric_file in directory.glob("*.db"):
+        metric_file.unlink()
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    """
+    Gunicorn hook cleaning up after a dead worker.
+
+    Live gauges of the worker are dropped, its counters
+    and histograms are kept.
+
+    :param server: gunicorn arbiter.
+    :param worker: worker that exited.
+    """
+    if multiprocess_dir() is not None:
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def render_metrics() -> bytes:
+    """
+    Render metrics in the Prometheus text format.
+
+    In multiprocess mode metrics of every worker are aggregated,
+    so it doesn't matter which worker is scraped.
+
+    :return: encoded metrics.
+    """
+    if multiprocess_dir() is None:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+@dataclass
+class PoolStats:
+    """Counters describing how long pool checkouts wait."""
+
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_total: float = 0
+    wait_max: float = 0
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Connection pool that measures checkouts and connections in use."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        pool_name = self.logging_name or PRIMARY_POOL
+        self._checked_out = DB_POOL_CHECKED_OUT.labels(pool_name)
+        self._overflow_connections = DB_POOL_OVERFLOW.labels(pool_name)
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self._observe_wait(time.perf_counter() - started_at)
+        self._observe_usage()
+        return connection
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        super()._do_return_conn(record)
+        self._observe_usage()
+
+    def _observe_wait(self, wait: float) -> None:
+        self.stats.checkouts += 1
+        self.stats.wait_total += wait
+        self.stats.wait_max = max(self.stats.wait_max, wait)
+        DB_POOL_CHECKOUT_WAIT.observe(wait)
+
+    def _observe_usage(self) -> None:
+        self._checked_out.set(self.checkedout())
+        self._overflow_connections.set(max(self.overflow(), 0))
+
+
+def pool_info(pool: Pool) -> Dict[str, Any]:
+    """
+    Statistics of a connection pool of this worker.
+
+    Every worker has a pool of its own, so up to
+    ``workers * (pool_size + max_overflow)`` connections
+    to the database can be opened.
+
+    :param pool: pool of the database engine.
+    :return: pool limits, connections in use and checkout waits.
+    """
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    info: Dict[str, Any] = {
+        "pool": type(pool).__name__,
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,  # noqa: WPS437
+        "timeout": pool.timeout(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        stats = pool.stats
+        info.update(asdict(stats))
+        info["wait_mean"] = stats.wait_total / stats.checkouts if stats.checkouts else 0
+    return info
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Measure time of every query executed by the engine.
+
+    :param engine: synchronous engine, ``AsyncEngine.sync_engine``
+        for async ones.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(connection: Any, *args: Any) -> None:
+    connection.info.setdefault(_QUERY_STARTS, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(connection: Any, *args: Any) -> None:
+    started_at = connection.info[_QUERY_STARTS].pop()
+    DB_QUERY_LATENCY.observe(time.perf_counter() - started_at)
+
+
+def _handle_error(context: Any) -> None:
+    starts = context.connection.info.get(_QUERY_STARTS) if context.connection else None
+    if starts:
+        starts.pop()
+
+
+class _ResponseTimer:
+    """Observes request latency once response headers are sent."""
+
+    def __init__(self, scope: Scope, send: Send, observe: "Observe") -> None:
+        self.scope = scope
+        self.started_at = time.perf_counter()
+        self.observed = False
+        self._send = send
+        self._observe = observe
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.finish(message["status"])
+        await self._send(message)
+
+    def finish(self, status: int) -> None:
+        if not self.observed:
+            self.observed = True
+            self._observe(self.scope, status, self.started_at)
+
+
+class MetricsMiddleware:
+    """
+    Measures latency of every HTTP request.
+
+    It's a plain ASGI middleware, so it adds no tasks or copies
+    of the request. Latency is measured until response headers
+    are sent, so long-lived streams are measured until they start.
+    Requests are labeled with the route template, not the path,
+    to keep the number of series bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._children: Dict[Tuple[str, str, int], Any] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handle a request.
+
+        Requests that fail before a response is started are counted
+        as server errors, which is what the client gets.
+
+        :param scope: ASGI scope.
+        :param receive: ASGI receive channel.
+        :param send: ASGI send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timer = _ResponseTimer(scope, send, self._observe)
+        try:  # noqa: WPS501
+            await self.app(scope, receive, timer.send)
+        finally:
+            timer.finish(HTTP_SERVER_ERROR)
+
+    def _observe(self, scope: Scope, status: int, started_at: float) -> None:
+        route = scope.get("route")
+        route_path = getattr(route, "path", UNMATCHED_ROUTE)
+        key = (scope["method"], route_path, status)
+        child = self._children.get(key)
+        if child is None:
+            child = REQUEST_LATENCY.labels(*key)
+            self._children[key] = child
+        child.observe(time.perf_counter() - started_at)
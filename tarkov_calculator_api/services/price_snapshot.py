@@ -0,0 +1,510 @@
+import asyncio
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import uuid
+from contextlib import contextmanager, suppress
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from numpy import typing as npt
+from starlette.requests import Request
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "prices.snapshot"
+LOCK_FILE = "prices.lock"
+MAGIC = b"TKPRICE1"
+# Magic, generation, items, size of names and time of the newest price.
+HEADER = struct.Struct("<8s32sQQd")
+# Fixed-width columns following the header, 8 bytes per item each.
+# Items are sorted by id, names are found through their sorted hashes.
+COLUMNS = (
+    ("ids", np.int64),
+    ("prices", np.int64),
+    ("base_prices", np.int64),
+    ("recorded_at", np.float64),
+    ("name_starts", np.uint64),
+    ("name_sizes", np.uint64),
+    ("sorted_hashes", np.uint64),
+    ("hash_order", np.uint64),
+)
+COLUMN_SIZE = 8
+# Columns a newer price replaces.
+VALUE_COLUMNS = ("prices", "base_prices", "recorded_at")
+ID_RANGE = np.iinfo(np.int64)
+
+Vector = npt.NDArray[Any]
+
+
+class PriceSnapshotError(Exception):
+    """Snapshot file is not a price snapshot or is truncated."""
+
+
+class SnapshotItem(NamedTuple):
+    """Tarkov item read from the snapshot."""
+
+    id: int
+    name: str
+    price: int
+    base_price: int
+
+
+class _Header(NamedTuple):
+    magic: bytes
+    generation: bytes
+    size: int
+    names_size: int
+    recorded_at: float
+
+
+class _Rows(NamedTuple):
+    """Columns of items, names are slices of encoded names joined together."""
+
+    ids: Vector
+    prices: Vector
+    base_prices: Vector
+    recorded_at: Vector
+    name_starts: Vector
+    name_sizes: Vector
+    name_hashes: Vector
+    names: bytes
+
+    @classmethod
+    def build(cls, items: Sequence[Any], recorded_at: Vector) -> "_Rows":
+        names = [item.name.encode("utf-8") for item in items]
+        sizes = np.array([len(name) for name in names], dtype=np.uint64)
+        return cls(
+            np.array([item.id for item in items], dtype=np.int64),
+            np.array([item.price for item in items], dtype=np.int64),
+            np.array([item.base_price for item in items], dtype=np.int64),
+            recorded_at,
+            np.cumsum(sizes) - sizes,
+            sizes,
+            np.array([_name_hash(name) for name in names], dtype=np.uint64),
+            b"".join(names),
+        )
+
+    def extend(self, other: "_Rows") -> "_Rows":
+        return _Rows(
+            np.concatenate([self.ids, other.ids]),
+            np.concatenate([self.prices, other.prices]),
+            np.concatenate([self.base_prices, other.base_prices]),
+            np.concatenate([self.recorded_at, other.recorded_at]),
+            np.concatenate([self.name_starts, other.name_starts + len(self.names)]),
+            np.concatenate([self.name_sizes, other.name_sizes]),
+            np.concatenate([self.name_hashes, other.name_hashes]),
+            self.names + other.names,
+        )
+
+    def without(self, positions: Vector) -> "_Rows":
+        kept = np.ones(len(self.ids), dtype=np.bool_)
+        kept[positions] = False
+        items = [self.item(position) for position in np.flatnonzero(kept)]
+        return _Rows.build(items, self.recorded_at[kept])
+
+    def item(self, position: int) -> SnapshotItem:
+        start = int(self.name_starts[position])
+        end = start + int(self.name_sizes[position])
+        return SnapshotItem(
+            id=int(self.ids[position]),
+            name=str(self.names[start:end], "utf-8"),
+            price=int(self.prices[position]),
+            base_price=int(self.base_prices[position]),
+        )
+
+
+class _Mapping:
+    """Columns of a snapshot file, viewed in place without copying."""
+
+    def __init__(self, path: Path) -> None:  # noqa: WPS210
+        with open(path, "rb") as snapshot_file:
+            stat = os.fstat(snapshot_file.fileno())
+            if stat.st_size < HEADER.size:
+                raise PriceSnapshotError(f"{path} is truncated")
+            self.inode = stat.st_ino
+            self.buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _Header(*HEADER.unpack_from(self.buffer))
+        names_offset = HEADER.size + header.size * COLUMN_SIZE * len(COLUMNS)
+        if header.magic != MAGIC:
+            raise PriceSnapshotError(f"{path} is not a price snapshot")
+        if len(self.buffer) != names_offset + header.names_size:
+            raise PriceSnapshotError(f"{path} is truncated")
+        self.generation = header.generation.rstrip(b"\0").decode()
+        self.recorded_at = header.recorded_at
+        self.columns = {
+            name: np.frombuffer(
+                self.buffer,
+                dtype,
+                header.size,
+                HEADER.size + index * header.size * COLUMN_SIZE,
+            )
+            for index, (name, dtype) in enumerate(COLUMNS)
+        }
+        self.names = memoryview(self.buffer)[names_offset:]
+
+    def __len__(self) -> int:
+        return len(self.columns["ids"])
+
+    def position(self, item_id: int) -> Optional[int]:
+        ids = self.columns["ids"]
+        if item_id < ID_RANGE.min or item_id > ID_RANGE.max:
+            return None
+        position = int(np.searchsorted(ids, item_id))
+        if position == len(ids) or ids[position] != item_id:
+            return None
+        return position
+
+    def find(self, name: str) -> Optional[SnapshotItem]:
+        sorted_hashes = self.columns["sorted_hashes"]
+        name_hash = _name_hash(name.encode("utf-8"))
+        position = int(np.searchsorted(sorted_hashes, name_hash))
+        while position < len(sorted_hashes) and sorted_hashes[position] == name_hash:
+            item = self.item(int(self.columns["hash_order"][position]))
+            if item.name == name:
+                return item
+            position += 1
+        return None
+
+    def item(self, position: int) -> SnapshotItem:
+        start = int(self.columns["name_starts"][position])
+        end = start + int(self.columns["name_sizes"][position])
+        return SnapshotItem(
+            id=int(self.columns["ids"][position]),
+            name=str(self.names[start:end], "utf-8"),
+            price=int(self.columns["prices"][position]),
+            base_price=int(self.columns["base_prices"][position]),
+        )
+
+    def name_hashes(self) -> Vector:
+        name_hashes = np.empty(len(self), dtype=np.uint64)
+        name_hashes[self.columns["hash_order"]] = self.columns["sorted_hashes"]
+        return name_hashes
+
+    def rows(self) -> _Rows:
+        return _Rows(
+            np.array(self.columns["ids"]),
+            np.array(self.columns["prices"]),
+            np.array(self.columns["base_prices"]),
+            np.array(self.columns["recorded_at"]),
+            np.array(self.columns["name_starts"]),
+            np.array(self.columns["name_sizes"]),
+            self.name_hashes(),
+            bytes(self.names),
+        )
+
+
+class PriceSnapshot:
+    """
+    Prices of every tarkov item in a file shared by workers of a host.
+
+    The file holds fixed-width columns sorted by item id and an index
+    of name hashes, and every worker maps it read-only, so items are
+    looked up in place and the host keeps a single copy of them.
+    Put in a tmpfs such as ``/dev/shm``, it never touches a disk.
+
+    Every worker merges price changes it's notified of into the file,
+    under a lock, the first one to do it writes a new file and swaps
+    it in with a rename, the others find nothing left to change.
+    Each price keeps the time it was recorded, and older prices
+    never replace newer ones, so workers that fall behind can't
+    bring outdated prices back.
+
+    Waiting for the lock and writing the file are done in a thread,
+    so the event loop keeps serving requests, and merges of a worker
+    run one at a time, in the order they were made.
+
+    Without a directory, or if the file can't be read or written,
+    the snapshot is empty and reads go to the database.
+    """
+
+    def __init__(self, directory: Optional[Path]) -> None:
+        self.directory = directory
+        self._mapping: Optional[_Mapping] = None
+        self._merging = asyncio.Lock()
+
+    def __len__(self) -> int:
+        if self._mapping is None:
+            return 0
+        return len(self._mapping)
+
+    @property
+    def available(self) -> bool:
+        """
+        Whether items are read from the snapshot.
+
+        :return: True if the snapshot file is mapped.
+        """
+        return self._mapping is not None
+
+    @property
+    def recorded_at(self) -> Optional[datetime]:
+        """
+        Time the newest price in the snapshot was recorded.
+
+        :return: time, or None if the snapshot is not mapped.
+        """
+        if self._mapping is None:
+            return None
+        return datetime.fromtimestamp(self._mapping.recorded_at, timezone.utc)
+
+    async def open(self) -> None:
+        """Map the snapshot written by other workers, if there is one."""
+        await self._merge(None, prune=False)
+
+    async def reload(self, tarkov_item_dao: TarkovItemDAO) -> None:
+        """
+        Bring every item of the database into the snapshot.
+
+        Items that are no longer in the database are dropped.
+
+        :param tarkov_item_dao: DAO for tarkov_item models.
+        """
+        items = await tarkov_item_dao.get_tarkov_item_stamped_rows()
+        recorded_at = [
+            item.recorded_at.timestamp() if item.recorded_at else 0 for item in items
+        ]
+        rows = _Rows.build(items, np.array(recorded_at))
+        await self._merge(rows, prune=True)
+
+    async def update(
+        self,
+        items: Sequence[Any],
+        recorded_at: datetime,
+        generation: Optional[str] = None,
+    ) -> None:
+        """
+        Merge changed prices into the snapshot.
+
+        :param items: changed tarkov items with id, name, price and base_price.
+        :param recorded_at: time the prices were recorded.
+        :param generation: generation of the prices, random if None.
+        """
+        stamps = np.full(len(items), recorded_at.timestamp())
+        rows = _Rows.build(items, stamps)
+        await self._merge(rows, prune=False, generation=generation)
+
+    def item(self, item_id: int) -> Optional[SnapshotItem]:
+        """
+        Get item by id.
+
+        :param item_id: id of the tarkov item.
+        :return: item, or None if it's not in the snapshot.
+        """
+        if self._mapping is None:
+            return None
+        position = self._mapping.position(item_id)
+        if position is None:
+            return None
+        return self._mapping.item(position)
+
+    def items(self, ids: Iterable[int], names: Iterable[str]) -> List[SnapshotItem]:
+        """
+        Get items by ids and names.
+
+        :param ids: ids of tarkov items.
+        :param names: names of tarkov items.
+        :return: items that are in the snapshot, an item may be there twice.
+        """
+        items = [self.item(item_id) for item_id in ids]
+        found = [item for item in items if item is not None]
+        return found + self.items_by_names(names)
+
+    def items_by_names(self, names: Iterable[str]) -> List[SnapshotItem]:
+        """
+        Get items by names.
+
+        :param names: names of tarkov items.
+        :return: items that are in the snapshot.
+        """
+        if self._mapping is None:
+            return []
+        items = [self._mapping.find(name) for name in names]
+        return [item for item in items if item is not None]
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Get snapshot statistics.
+
+        :return: dict with the path, item count and generation.
+        """
+        recorded_at = self.recorded_at
+        return {
+            "path": None if self.directory is None else str(self._path(SNAPSHOT_FILE)),
+            "available": self.available,
+            "items": len(self),
+            "generation": None if self._mapping is None else self._mapping.generation,
+            "recorded_at": None if recorded_at is None else recorded_at.isoformat(),
+        }
+
+    async def _merge(
+        self,
+        rows: Optional[_Rows],
+        prune: bool,
+        generation: Optional[str] = None,
+    ) -> None:
+        if self.directory is None:
+            return
+        async with self._merging:
+            await asyncio.to_thread(self._merge_locked, rows, prune, generation)
+
+    def _merge_locked(
+        self,
+        rows: Optional[_Rows],
+        prune: bool,
+        generation: Optional[str],
+    ) -> None:
+        try:
+            with self._locked():
+                self._remap()
+                merged = None if rows is None else _merged(self._mapping, rows, prune)
+                if merged is not None:
+                    self._write(merged, generation or uuid.uuid4().hex)
+                    self._remap()
+        except (OSError, PriceSnapshotError) as error:
+            logger.warning(f"Price snapshot is unavailable: {error!r}")
+            self._mapping = None
+
+    def _remap(self) -> None:
+        path = self._path(SNAPSHOT_FILE)
+        try:
+            inode = path.stat().st_ino
+        except FileNotFoundError:
+            self._mapping = None
+            return
+        if self._mapping is None or self._mapping.inode != inode:
+            self._mapping = _Mapping(path)
+
+    def _write(self, rows: _Rows, generation: str) -> None:
+        descriptor, temporary = tempfile.mkstemp(
+            dir=self.directory,
+            prefix=f".{SNAPSHOT_FILE}.",
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as snapshot_file:
+                snapshot_file.writelines(_encode(rows, generation))
+            os.replace(temporary, self._path(SNAPSHOT_FILE))
+        except OSError:
+            with suppress(OSError):
+                os.unlink(temporary)
+            raise
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self._path(LOCK_FILE).parent.mkdir(parents=True, exist_ok=True)
+        with open(self._path(LOCK_FILE), "ab") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _path(self, name: str) -> Path:
+        return Path(self.directory or ".") / name
+
+
+def get_price_snapshot(request: Request) -> PriceSnapshot:
+    """
+    Get price snapshot of the current worker.
+
+    :param request: current request.
+    :return: price snapshot.
+    """
+    return request.app.state.price_snapshot
+
+
+def _merged(  # noqa: WPS210
+    mapping: Optional[_Mapping],
+    rows: _Rows,
+    prune: bool,
+) -> Optional[_Rows]:
+    if mapping is None or not len(mapping):
+        return rows if mapping is None or len(rows.ids) else None
+    ids = mapping.columns["ids"]
+    found = np.searchsorted(ids, rows.ids)
+    positions = np.minimum(found, len(ids) - 1)
+    known = np.equal(ids[positions], rows.ids)
+    stamps = mapping.columns["recorded_at"][positions]
+    newer = np.logical_and(known, stamps > rows.recorded_at)
+    kept = np.logical_or(newer, _unchanged(mapping, rows, positions))
+    dropped = prune and np.count_nonzero(known) < len(ids)
+    if np.logical_and(known, kept).all() and not dropped:
+        return None
+    current = mapping.rows()
+    if prune:
+        _copy_values(rows, newer, current, positions[newer])
+        return rows
+    updated = np.logical_and(known, ~newer)
+    _copy_values(current, positions[updated], rows, updated)
+    # Names are packed together, so renamed items are added anew.
+    renamed = np.logical_and(
+        updated,
+        current.name_hashes[positions] != rows.name_hashes,
+    )
+    if renamed.any():
+        current = current.without(positions[renamed])
+    added = np.logical_or(~known, renamed)
+    if not added.any():
+        return current
+    items = [rows.item(position) for position in np.flatnonzero(added)]
+    return current.extend(_Rows.build(items, rows.recorded_at[added]))
+
+
+def _unchanged(
+    mapping: _Mapping,
+    rows: _Rows,
+    positions: Vector,
+) -> npt.NDArray[np.bool_]:
+    unchanged = np.ones(len(positions), dtype=np.bool_)
+    for column in VALUE_COLUMNS:
+        unchanged &= mapping.columns[column][positions] == getattr(rows, column)
+    unchanged &= mapping.name_hashes()[positions] == rows.name_hashes
+    return unchanged
+
+
+def _copy_values(
+    target: _Rows,
+    target_index: Vector,
+    source: _Rows,
+    index: Vector,
+) -> None:
+    for column in VALUE_COLUMNS:
+        getattr(target, column)[target_index] = getattr(source, column)[index]
+
+
+def _encode(rows: _Rows, generation: str) -> Iterator[bytes]:  # noqa: WPS210
+    order = np.argsort(rows.ids, kind="stable")
+    name_hashes = rows.name_hashes[order]
+    hash_order = np.argsort(name_hashes, kind="stable")
+    columns = (
+        rows.ids[order],
+        rows.prices[order],
+        rows.base_prices[order],
+        rows.recorded_at[order],
+        rows.name_starts[order],
+        rows.name_sizes[order],
+        name_hashes[hash_order],
+        hash_order,
+    )
+    yield HEADER.pack(
+        MAGIC,
+        generation.encode(),
+        len(order),
+        len(rows.names),
+        float(rows.recorded_at.max(initial=0)),
+    )
+    yield from (
+        column_values.astype(dtype).tobytes()
+        for (_, dtype), column_values in zip(COLUMNS, columns)
+    )
+    yield rows.names
+
+
+def _name_hash(name: bytes) -> np.uint64:
+    digest = hashlib.blake2b(name, digest_size=COLUMN_SIZE).digest()
+    return np.uint64(int.from_bytes(digest, "little"))
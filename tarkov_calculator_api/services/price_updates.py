@@ -0,0 +1,385 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import (  # noqa: WPS235
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
+
+import asyncpg
+import ujson
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from tarkov_calculator_api.calculator.flea import ItemPrices
+from tarkov_calculator_api.calculator.rates import ExchangeRates
+from tarkov_calculator_api.calculator.recipes import RecipeProfits
+from tarkov_calculator_api.services.cache import TarkovItemCache
+from tarkov_calculator_api.services.price_snapshot import PriceSnapshot
+from tarkov_calculator_api.services.search import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel price changes are announced on.
+CHANNEL = "tarkov_item_prices"
+# Postgres rejects NOTIFY payloads of 8000 bytes and more.
+MAX_PAYLOAD_SIZE = 7900
+
+
+class PriceChange(NamedTuple):
+    """New prices of a single tarkov item."""
+
+    id: int
+    name: str
+    price: int
+    base_price: int
+
+
+PriceEvent = Dict[str, Any]
+Warmup = Callable[[], Awaitable[None]]
+
+
+class Subscription:
+    """
+    Bounded queue of price events for a single client.
+
+    When the client doesn't keep up and the queue is full,
+    the subscription is closed instead of buffering more events,
+    so a slow consumer never holds more than ``max_size`` events.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.closed = False
+        self._queue: "asyncio.Queue[Optional[PriceEvent]]" = asyncio.Queue(max_size)
+
+    def push(self, event: PriceEvent) -> bool:
+        """
+        Queue event for the client.
+
+        :param event: event to send.
+        :return: False if the subscription was closed as too slow.
+        """
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.close()
+            return False
+        return True
+
+    def close(self) -> None:
+        """Drop pending events and wake up the reader."""
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def get(self) -> Optional[PriceEvent]:
+        """
+        Wait for the next event.
+
+        :return: event, or None once the subscription is closed.
+        """
+        if self.closed:
+            return None
+        return await self._queue.get()
+
+    def get_nowait(self) -> Optional[PriceEvent]:
+        """
+        Get the next event without waiting.
+
+        :return: event, or None if the subscription is closed.
+        """
+        return self._queue.get_nowait()
+
+
+class PriceUpdates:
+    """
+    Per-worker hub for price changes.
+
+    A worker that refreshed prices applies them locally and announces
+    them with Postgres NOTIFY, every other worker applies them once
+    the notification arrives. Applying changes invalidates the item cache,
+    updates exchange rates, the optional search index, recipe profits
+    and item prices and pushes an event to every subscriber.
+    Then the optional price snapshot is updated and the optional warmup
+    is run in the background, the latter to fill the cache again.
+    Whenever the listener (re)connects, the optional resync is run
+    in the background to catch up with changes announced while it was away.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        tarkov_item_cache: TarkovItemCache,
+        exchange_rates: ExchangeRates,
+        queue_size: int,
+        warmup: Optional[Warmup] = None,
+        search_index: Optional[SearchIndex] = None,
+        recipe_profits: Optional[RecipeProfits] = None,
+        item_prices: Optional[ItemPrices] = None,
+        price_snapshot: Optional[PriceSnapshot] = None,
+        resync: Optional[Warmup] = None,
+    ) -> None:
+        self.tarkov_item_cache = tarkov_item_cache
+        self.exchange_rates = exchange_rates
+        self.search_index = search_index
+        self.queue_size = queue_size
+        self.origin = uuid.uuid4().hex
+        self.listening = asyncio.Event()
+        self._price_snapshot = price_snapshot
+        self._warmup = warmup
+        self._resync = resync
+        self._indexes: List[Union[SearchIndex, RecipeProfits, ItemPrices]] = [
+            index
+            for index in (search_index, recipe_profits, item_prices)
+            if index is not None
+        ]
+        self._warmup_task: "Optional[asyncio.Task[None]]" = None
+        self._resync_task: "Optional[asyncio.Task[None]]" = None
+        self._snapshot_tasks: "Set[asyncio.Task[None]]" = set()
+        self._subscribers: Set[Subscription] = set()
+
+    @property
+    def subscribers(self) -> int:
+        """
+        Number of connected subscribers.
+
+        :return: subscriber count.
+        """
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        """
+        Start receiving price events.
+
+        :return: new subscription.
+        """
+        subscription = Subscription(self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Stop sending events to the subscription.
+
+        :param subscription: subscription to remove.
+        """
+        self._subscribers.discard(subscription)
+
+    def apply(
+        self,
+        changes: Sequence[PriceChange],
+        updated_at: datetime,
+        generation: Optional[str] = None,
+        warmup: bool = True,
+    ) -> None:
+        """
+        Apply price changes to this worker.
+
+        :param changes: changed items.
+        :param updated_at: time the prices were read.
+        :param generation: generation of shared cache entries after the changes.
+        :param warmup: whether to warm up the cache.
+        """
+        if not changes:
+            return
+        self.tarkov_item_cache.invalidate(generation)
+        self.exchange_rates.update(changes, updated_at)
+        for index in self._indexes:
+            index.update(changes)
+        if self._price_snapshot is not None:
+            self._start_snapshot_update(
+                self._price_snapshot,
+                changes,
+                updated_at,
+                generation,
+            )
+        self._push(
+            {
+                "updated_at": updated_at.isoformat(),
+                "items": [change._asdict() for change in changes],  # noqa: WPS437
+            },
+        )
+        if warmup:
+            self._start_warmup()
+
+    async def publish(
+        self,
+        session: AsyncSession,
+        changes: Sequence[PriceChange],
+        updated_at: datetime,
+    ) -> None:
+        """
+        Announce price changes to other workers and apply them here.
+
+        Large batches are split into several notifications,
+        they are all delivered when the session commits. Changes
+        are applied once they're committed, so nothing reads
+        the old prices into caches after they're invalidated.
+        Every publish starts a new generation of shared cache entries.
+
+        :param session: session to send notifications with.
+        :param changes: changed items.
+        :param updated_at: time the prices were read.
+        """
+        if not changes:
+            return
+        header = {
+            "origin": self.origin,
+            "updated_at": updated_at.isoformat(),
+            "generation": uuid.uuid4().hex,
+        }
+        for payload in _notification_payloads(header, changes):
+            await session.execute(select(func.pg_notify(CHANNEL, payload)))
+        await session.commit()
+        self.apply(changes, updated_at, header["generation"])
+        await self.tarkov_item_cache.share_generation()
+
+    def handle_notification(
+        self,
+        connection: Any,
+        pid: int,
+        channel: str,
+        payload: str,
+    ) -> None:
+        """
+        Apply price changes announced by another worker.
+
+        With a shared cache, the announcing worker warms it up for everyone.
+
+        :param connection: connection the notification came from.
+        :param pid: id of the notifying backend.
+        :param channel: notification channel.
+        :param payload: encoded changes.
+        """
+        message = ujson.loads(payload)
+        if message["origin"] == self.origin:
+            return
+        self.apply(
+            [PriceChange(*change) for change in message["items"]],
+            datetime.fromisoformat(message["updated_at"]),
+            generation=message.get("generation"),
+            warmup=self.tarkov_item_cache.shared is None,
+        )
+
+    async def listen(self, dsn: str, retry_delay: float) -> None:
+        """
+        Receive notifications from other workers until cancelled.
+
+        The listener holds its own connection, outside of
+        the SQLAlchemy pool, and reconnects if it's lost.
+
+        :param dsn: database to listen on.
+        :param retry_delay: seconds to wait before reconnecting.
+        """
+        while True:  # noqa: WPS457
+            try:
+                await self._listen_once(dsn)
+            except (
+                OSError,
+                asyncio.TimeoutError,
+                asyncpg.PostgresError,
+                asyncpg.InterfaceError,
+            ) as error:
+                logger.warning(f"Price notification listener failed: {error!r}")
+            self.listening.clear()
+            await asyncio.sleep(retry_delay)
+
+    def _push(self, event: PriceEvent) -> None:
+        for subscription in list(self._subscribers):
+            if not subscription.push(event):
+                logger.info("Dropped price subscriber that fell behind.")
+                self._subscribers.discard(subscription)
+
+    def _start_warmup(self) -> None:
+        if self._warmup is None:
+            return
+        # Pages built by an unfinished warmup are outdated already.
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+        self._warmup_task = asyncio.create_task(self._run_warmup(self._warmup))
+
+    def _start_snapshot_update(
+        self,
+        price_snapshot: PriceSnapshot,
+        changes: Sequence[PriceChange],
+        updated_at: datetime,
+        generation: Optional[str],
+    ) -> None:
+        task = asyncio.create_task(
+            price_snapshot.update(changes, updated_at, generation),
+        )
+        # The loop only keeps weak references to tasks.
+        self._snapshot_tasks.add(task)
+        task.add_done_callback(self._snapshot_tasks.discard)
+
+    async def _run_warmup(self, warmup: Warmup) -> None:
+        try:
+            await warmup()
+        except (SQLAlchemyError, OSError) as error:
+            logger.warning(f"Could not warm up the cache: {error!r}")
+
+    async def _listen_once(self, dsn: str) -> None:
+        connection = await asyncpg.connect(dsn)
+        terminated = asyncio.Event()
+        connection.add_termination_listener(lambda _: terminated.set())
+        try:  # noqa: WPS501
+            await connection.add_listener(CHANNEL, self.handle_notification)
+            # Changes announced while the listener was away are lost,
+            # so anything cached before that is suspect.
+            self.tarkov_item_cache.invalidate()
+            await self.tarkov_item_cache.sync_generation()
+            if self._resync is not None:
+                self._resync_task = asyncio.create_task(self._run_warmup(self._resync))
+            self.listening.set()
+            await terminated.wait()
+        finally:
+            await connection.close()
+
+
+def _notification_payloads(
+    header: Dict[str, str],
+    changes: Sequence[PriceChange],
+) -> Iterator[str]:
+    header_size = len(_encode_notification(header, []))
+    chunk: List[PriceChange] = []
+    size = header_size
+    for change in changes:
+        change_size = len(ujson.dumps(change)) + 1
+        if chunk and size + change_size > MAX_PAYLOAD_SIZE:
+            yield _encode_notification(header, chunk)
+            chunk = []
+            size = header_size
+        chunk.append(change)
+        size += change_size
+    yield _encode_notification(header, chunk)
+
+
+def _encode_notification(
+    header: Dict[str, str],
+    changes: Sequence[PriceChange],
+) -> str:
+    return ujson.dumps({**header, "items": changes})
+
+
+def get_price_updates(request: Request) -> PriceUpdates:
+    """
+    Get price updates hub of the current worker.
+
+    :param request: current request.
+    :return: price updates hub.
+    """
+    return request.app.state.price_updates
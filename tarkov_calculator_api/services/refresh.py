@@ -0,0 +1,441 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.db.dao.tarkov_item_price_dao import TarkovItemPriceDAO
+from tarkov_calculator_api.services.fingerprints import UpstreamFingerprints
+from tarkov_calculator_api.services.metrics import (
+    REFRESH_DURATION,
+    REFRESH_ITEMS,
+    REFRESH_LAST_SUCCESS,
+)
+from tarkov_calculator_api.services.price_updates import PriceChange, PriceUpdates
+from tarkov_calculator_api.services.tarkov_market import (
+    NotModifiedError,
+    TarkovMarketClient,
+)
+from tarkov_calculator_api.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Tarkov market search queries of the tracked items.
+TRACKED_ITEMS = ("euro", "dollar")
+# Length of the tarkov_items.name column.
+MAX_NAME_LENGTH = 200
+
+
+@dataclass
+class RefreshReport:
+    """
+    Counts of items of a refresh.
+
+    Attributes:
+        changed (int): Items whose prices were written.
+        unchanged (int): Items whose prices were the same as before.
+        failed (int): Items that couldn't be fetched or were invalid.
+    """
+
+    changed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+
+    def __add__(self, other: "RefreshReport") -> "RefreshReport":
+        return RefreshReport(
+            changed=self.changed + other.changed,
+            unchanged=self.unchanged + other.unchanged,
+            failed=self.failed + other.failed,
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.changed} changed, {self.unchanged} unchanged, "
+            f"{self.failed} failed"
+        )
+
+
+async def fetch_tracked_items(
+    tarkov_market_client: TarkovMarketClient,
+) -> List[Dict[str, Any]]:
+    """
+    Fetches quotes of all tracked items concurrently.
+
+    Args:
+        tarkov_market_client (TarkovMarketClient): The client for the Tarkov Market API.
+
+    Returns:
+        List of items ready to be upserted, items that failed to fetch
+        or are invalid are skipped.
+
+    # noqa: DAR201
+    """
+    quotes = await asyncio.gather(
+        *(tarkov_market_client.get_item(name) for name in TRACKED_ITEMS),
+    )
+    rows = [
+        tracked_row(name, quote)
+        for name, quote in zip(TRACKED_ITEMS, quotes)
+        if quote is not None
+    ]
+    return [row for row in rows if row is not None]
+
+
+async def write_changes(
+    tarkov_item_dao: TarkovItemDAO,
+    tarkov_item_price_dao: TarkovItemPriceDAO,
+    rows: Sequence[Mapping[str, Any]],
+    recorded_at: datetime,
+) -> List[PriceChange]:
+    """
+    Writes rows and appends the changed prices to the price history.
+
+    Rows whose prices are the same in the database are left untouched
+    and get no history sample, so history holds a sample whenever
+    the price of an item changes and is read as a step function.
+    Prices and their samples are committed in a single transaction,
+    so neither is written without the other.
+
+    Args:
+        tarkov_item_dao (TarkovItemDAO): The data access object for Tarkov items.
+        tarkov_item_price_dao (TarkovItemPriceDAO): The data access object for price history.
+        rows (Sequence[Mapping]): The rows with name, price and base_price.
+        recorded_at (datetime): The time of the history samples.
+
+    Returns:
+        Changed prices.
+
+    # noqa: DAR201
+    """
+    changes = [PriceChange(*row) for row in await tarkov_item_dao.bulk_upsert(rows)]
+    await tarkov_item_price_dao.record_prices(
+        [change.name for change in changes],
+        recorded_at,
+    )
+    await tarkov_item_dao.session.commit()
+    return changes
+
+
+async def refresh_prices(  # noqa: WPS210
+    tarkov_item_dao: TarkovItemDAO,
+    tarkov_item_price_dao: TarkovItemPriceDAO,
+    tarkov_market_client: TarkovMarketClient,
+    price_updates: PriceUpdates,
+    fingerprints: Optional[UpstreamFingerprints] = None,
+) -> RefreshReport:
+    """
+    Refreshes the euro and dollar prices.
+
+    All quotes are requested concurrently, so a refresh
+    takes roughly one upstream round trip. Items whose prices
+    didn't change since they were last written are skipped, the others
+    are written to the database in a single upsert and their
+    new prices are appended to the price history. Changed prices are
+    published to every worker and price stream subscriber.
+
+    Args:
+        tarkov_item_dao (TarkovItemDAO): The data access object for Tarkov items.
+        tarkov_item_price_dao (TarkovItemPriceDAO): The data access object for price history.
+        tarkov_market_client (TarkovMarketClient): The client for the Tarkov Market API.
+        price_updates (PriceUpdates): The hub to publish changed prices to.
+        fingerprints (UpstreamFingerprints, optional): The prices last written.
+
+    Returns:
+        Counts of changed, unchanged and failed items.
+
+    # noqa: DAR201
+    """
+    logger.info("Starting to refresh euro and dollar prices.")
+    started_at = time.perf_counter()
+    fetched = await fetch_tracked_items(tarkov_market_client)
+    rows = fetched if fingerprints is None else fingerprints.changed(fetched)
+    changes: List[PriceChange] = []
+    recorded_at = datetime.now(timezone.utc)
+    if rows:
+        await tarkov_item_price_dao.create_partitions(recorded_at)
+        changes = await write_changes(
+            tarkov_item_dao,
+            tarkov_item_price_dao,
+            rows,
+            recorded_at,
+        )
+    if fingerprints is not None:
+        fingerprints.remember(rows)
+    if price_updates.exchange_rates.table is None:
+        await price_updates.exchange_rates.reload(tarkov_item_dao)
+    await price_updates.publish(tarkov_item_dao.session, changes, recorded_at)
+    report = RefreshReport(
+        changed=len(changes),
+        unchanged=len(fetched) - len(changes),
+        failed=len(TRACKED_ITEMS) - len(fetched),
+    )
+    elapsed = time.perf_counter() - started_at
+    logger.info(f"Refreshed euro and dollar prices in {elapsed:.3f}s, {report}.")
+    return report
+
+
+def catalogue_row(item: Any) -> Optional[Dict[str, Any]]:
+    """
+    Validate a catalogue item and convert it to a row to upsert.
+
+    Args:
+        item (Any): The raw item from the Tarkov Market API.
+
+    Returns:
+        Row with name, price and base_price, or None if the item is invalid.
+
+    # noqa: DAR201
+    """
+    if not isinstance(item, dict):
+        return None
+    name = item.get("name")
+    if not isinstance(name, str) or not name or len(name) > MAX_NAME_LENGTH:
+        return None
+    prices = (item.get("price"), item.get("basePrice"))
+    if not all(type(price) is int for price in prices):  # noqa: WPS516
+        return None
+    return {"name": name, "price": prices[0], "base_price": prices[1]}
+
+
+def tracked_row(name: str, quote: Any) -> Optional[Dict[str, Any]]:
+    """
+    Validate a quote of a tracked item and convert it to a row to upsert.
+
+    Quotes are validated like catalogue items, but keep the name
+    the item is tracked by. Invalid quotes are logged.
+
+    Args:
+        name (str): The name the item is tracked by.
+        quote (Any): The raw item from the Tarkov Market API.
+
+    Returns:
+        Row with name, price and base_price, or None if the quote is invalid.
+
+    # noqa: DAR201
+    """
+    row = catalogue_row({**quote, "name": name}) if isinstance(quote, dict) else None
+    if row is None:
+        logger.error(f"Invalid quote of {name!r}: {quote!r}")
+    return row
+
+
+class CatalogueWriter:
+    """
+    Writes catalogue items to the database in chunks of a bounded size.
+
+    Items whose prices didn't change since they were last written
+    are skipped. Every chunk is upserted, changed prices are appended
+    to the price history and published, so nothing but the current
+    chunk is kept in memory.
+
+    Attributes:
+        report (RefreshReport): Counts of items added so far.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        tarkov_item_dao: TarkovItemDAO,
+        tarkov_item_price_dao: TarkovItemPriceDAO,
+        price_updates: PriceUpdates,
+        chunk_size: int,
+        fingerprints: Optional[UpstreamFingerprints] = None,
+    ) -> None:
+        self.tarkov_item_dao = tarkov_item_dao
+        self.tarkov_item_price_dao = tarkov_item_price_dao
+        self.price_updates = price_updates
+        self.chunk_size = chunk_size
+        self._fingerprints = fingerprints
+        self.recorded_at = datetime.now(timezone.utc)
+        self.report = RefreshReport()
+        self._rows: List[Dict[str, Any]] = []
+
+    async def add(self, row: Dict[str, Any]) -> None:
+        """
+        Add a row, writing the chunk once it's full.
+
+        Args:
+            row (dict): The row with name, price and base_price.
+        """
+        if self._fingerprints is not None and not self._fingerprints.is_changed(row):
+            self.report.unchanged += 1
+            return
+        self._rows.append(row)
+        if len(self._rows) >= self.chunk_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write rows of the current chunk."""
+        if not self._rows:
+            return
+        rows = self._rows
+        self._rows = []
+        changes = await write_changes(
+            self.tarkov_item_dao,
+            self.tarkov_item_price_dao,
+            rows,
+            self.recorded_at,
+        )
+        if self._fingerprints is not None:
+            self._fingerprints.remember(rows)
+        await self.price_updates.publish(
+            self.tarkov_item_dao.session,
+            changes,
+            self.recorded_at,
+        )
+        self.report.changed += len(changes)
+        self.report.unchanged += len(rows) - len(changes)
+
+
+async def ingest_catalogue(  # noqa: WPS211
+    tarkov_item_dao: TarkovItemDAO,
+    tarkov_item_price_dao: TarkovItemPriceDAO,
+    tarkov_market_client: TarkovMarketClient,
+    price_updates: PriceUpdates,
+    fingerprints: Optional[UpstreamFingerprints] = None,
+) -> RefreshReport:
+    """
+    Ingests the whole Tarkov Market item catalogue.
+
+    The catalogue is parsed while it's downloaded, and valid items
+    are written in chunks of ``catalogue_chunk_size``, so memory use
+    stays flat however large the catalogue is. Invalid items are skipped
+    and counted as failed. If the download fails, chunks written so far
+    are kept. If the upstream answers that the catalogue didn't change,
+    nothing is written.
+
+    Args:
+        tarkov_item_dao (TarkovItemDAO): The data access object for Tarkov items.
+        tarkov_item_price_dao (TarkovItemPriceDAO): The data access object for price history.
+        tarkov_market_client (TarkovMarketClient): The client for the Tarkov Market API.
+        price_updates (PriceUpdates): The hub to publish changed prices to.
+        fingerprints (UpstreamFingerprints, optional): The prices last written.
+
+    Returns:
+        Counts of changed, unchanged and failed items.
+
+    # noqa: DAR201
+    """
+    logger.info("Starting to ingest the item catalogue.")
+    started_at = time.perf_counter()
+    writer = CatalogueWriter(
+        tarkov_item_dao,
+        tarkov_item_price_dao,
+        price_updates,
+        chunk_size=settings.catalogue_chunk_size,
+        fingerprints=fingerprints,
+    )
+    await tarkov_item_price_dao.create_partitions(writer.recorded_at)
+    try:
+        async for item in tarkov_market_client.iter_all_items():
+            row = catalogue_row(item)
+            if row is None:
+                writer.report.failed += 1
+            else:
+                await writer.add(row)
+    except NotModifiedError:
+        logger.info("The item catalogue didn't change.")
+        writer.report.unchanged = _catalogue_size(fingerprints)
+    except (httpx.HTTPError, ValueError) as error:
+        logger.error(f"Error while downloading the item catalogue: {error!r}")
+    await writer.flush()
+    _log_throughput(writer.report, time.perf_counter() - started_at)
+    return writer.report
+
+
+async def refresh_market_data(
+    tarkov_item_dao: TarkovItemDAO,
+    tarkov_item_price_dao: TarkovItemPriceDAO,
+    tarkov_market_client: TarkovMarketClient,
+    price_updates: PriceUpdates,
+    fingerprints: Optional[UpstreamFingerprints] = None,
+) -> RefreshReport:
+    """
+    Runs every enabled refresh.
+
+    The whole catalogue is only ingested if ``refresh_full_catalogue``
+    is enabled. Tracked items are refreshed either way,
+    since exchange rates rely on them. Duration, time of the last
+    successful refresh and counts of items are reported as metrics.
+    A refresh only counts as successful if it got at least one price.
+
+    Args:
+        tarkov_item_dao (TarkovItemDAO): The data access object for Tarkov items.
+        tarkov_item_price_dao (TarkovItemPriceDAO): The data access object for price history.
+        tarkov_market_client (TarkovMarketClient): The client for the Tarkov Market API.
+        price_updates (PriceUpdates): The hub to publish changed prices to.
+        fingerprints (UpstreamFingerprints, optional): The prices last written.
+
+    Returns:
+        Counts of changed, unchanged and failed items of all refreshes.
+
+    # noqa: DAR201
+    """
+    report = RefreshReport()
+    with REFRESH_DURATION.time():
+        if settings.refresh_full_catalogue:
+            report += await ingest_catalogue(
+                tarkov_item_dao,
+                tarkov_item_price_dao,
+                tarkov_market_client,
+                price_updates,
+                fingerprints,
+            )
+        report += await refresh_prices(
+            tarkov_item_dao,
+            tarkov_item_price_dao,
+            tarkov_market_client,
+            price_updates,
+            fingerprints,
+        )
+    if report.changed + report.unchanged:
+        REFRESH_LAST_SUCCESS.set_to_current_time()
+    REFRESH_ITEMS.labels("changed").inc(report.changed)
+    REFRESH_ITEMS.labels("unchanged").inc(report.unchanged)
+    REFRESH_ITEMS.labels("failed").inc(report.failed)
+    return report
+
+
+async def run_refresh(
+    session_factory: "async_sessionmaker[AsyncSession]",
+    tarkov_market_client: TarkovMarketClient,
+    price_updates: PriceUpdates,
+    fingerprints: Optional[UpstreamFingerprints] = None,
+) -> None:
+    """
+    Refreshes prices outside of a request, in a session of its own.
+
+    Args:
+        session_factory (async_sessionmaker): The factory of database sessions.
+        tarkov_market_client (TarkovMarketClient): The client for the Tarkov Market API.
+        price_updates (PriceUpdates): The hub to publish changed prices to.
+        fingerprints (UpstreamFingerprints, optional): The prices last written.
+    """
+    async with session_factory() as session:
+        await refresh_market_data(
+            TarkovItemDAO(session),
+            TarkovItemPriceDAO(session),
+            tarkov_market_client,
+            price_updates,
+            fingerprints,
+        )
+
+
+def _catalogue_size(fingerprints: Optional[UpstreamFingerprints]) -> int:
+    if fingerprints is None:
+        return 0
+    # Tracked items are counted by refresh_prices of the same refresh.
+    tracked = sum(name in fingerprints for name in TRACKED_ITEMS)
+    return len(fingerprints) - tracked
+
+
+def _log_throughput(report: RefreshReport, elapsed: float) -> None:
+    ingested = report.changed + report.unchanged
+    rate = ingested / elapsed if elapsed > 0 else 0
+    message = f"Ingested {ingested} catalogue items in {elapsed:.3f}s"
+    message = f"{message}, {rate:.0f} items/s"
+    logger.info(f"{message}, {report}.")
@@ -1,14 +1,123 @@
+import asyncio
+import logging
+import random
 import time
+from typing import Awaitable, Callable
 
+import asyncpg
 import requests
 
 from tarkov_calculator_api.settings import settings
 
+logger = logging.getLogger(__name__)
+
+# Key of the Postgres advisory lock held by the scheduler leader.
+LEADER_LOCK_ID = 7318245001
+
+
+def seconds_until_next_run(interval: float, jitter: float) -> float:
+    """
+    Seconds to sleep until the next refresh.
+
+    Refreshes happen at multiples of the interval since the epoch,
+    so they don't drift, plus a random delay so they don't hit
+    the upstream at exactly the same moment every time.
+
+    Args:
+        interval (float): Seconds between refreshes.
+        jitter (float): Upper bound of the random delay.
+
+    Returns:
+        Seconds to sleep.
+
+    # noqa: DAR201
+    """
+    return interval - time.time() % interval + random.uniform(0, jitter)  # noqa: S311
+
+
+class RefreshScheduler:
+    """
+    Scheduler of price refreshes running inside the API workers.
+
+    Every worker runs one, but only the one holding a Postgres advisory lock
+    refreshes, the others keep trying to take the lock. The lock is held
+    on a dedicated connection, so when the leader dies its connection
+    is closed, the lock is released and another worker takes over.
+
+    Attributes:
+        is_leader (bool): Whether this scheduler currently refreshes prices.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        dsn: str,
+        refresh: Callable[[], Awaitable[None]],
+        interval: float,
+        jitter: float,
+        election_interval: float,
+        lock_id: int = LEADER_LOCK_ID,
+    ) -> None:
+        self._dsn = dsn
+        self._refresh = refresh
+        self.interval = interval
+        self.jitter = jitter
+        self.election_interval = election_interval
+        self.lock_id = lock_id
+        self.is_leader = False
+
+    async def run(self) -> None:
+        """
+        Takes part in the leader election and refreshes prices while leading.
+
+        Runs until cancelled. If the connection holding the lock fails,
+        the scheduler steps down and joins the election again.
+        """
+        while True:  # noqa: WPS457
+            try:
+                await self._run_once()
+            except (OSError, asyncpg.PostgresError) as error:
+                logger.warning(f"Refresh scheduler lost its connection: {error!r}")
+            await asyncio.sleep(self.election_interval)
+
+    async def _run_once(self) -> None:
+        connection = await asyncpg.connect(self._dsn)
+        try:  # noqa: WPS501
+            while not await self._try_lock(connection):
+                await asyncio.sleep(self.election_interval)
+            logger.info("Refresh scheduler became the leader.")
+            self.is_leader = True
+            while True:  # noqa: WPS457
+                await asyncio.sleep(seconds_until_next_run(self.interval, self.jitter))
+                # Make sure the lock wasn't lost with the connection while sleeping.
+                await connection.fetchval("SELECT 1")
+                await self._refresh_safely()
+        finally:
+            self.is_leader = False
+            await connection.close()
+
+    async def _try_lock(self, connection: asyncpg.Connection) -> bool:
+        return await connection.fetchval(
+            "SELECT pg_try_advisory_lock($1)",
+            self.lock_id,
+        )
+
+    async def _refresh_safely(self) -> None:
+        # Any failure is only logged, so prices keep being refreshed.
+        # Cancellation isn't an Exception, so it still stops the scheduler.
+        try:
+            await self._refresh()
+        except Exception:
+            logger.exception("Scheduled refresh failed.")
+
 
 class TarkovItemScheduler:
     """
     A class that represents a scheduler for refreshing Tarkov item data.
 
+    It runs as a separate process and triggers refreshes over HTTP.
+    API workers already refresh prices with ``RefreshScheduler``,
+    so this is only needed when ``scheduler_enabled`` is turned off.
+
     Attributes:
         url (str): The URL of the Tarkov item data API.
 
@@ -23,14 +132,15 @@ class TarkovItemScheduler:
         """
         Starts the scheduler and refreshes the Tarkov item data at regular intervals.
 
-        The scheduler sends a POST request to the Tarkov item data API every 10 minutes
-        to refresh the data. If an error occurs during the request, the error message
-        is printed to the console.
+        The scheduler sends a POST request to the Tarkov item data API every
+        `refresh_interval` seconds, at multiples of the interval since the epoch,
+        so API workers know when the next refresh happens. If an error occurs during
+        the request, the error message is printed to the console.
 
         Returns:
             None
         """
-        sleep_time = 600
+        interval = settings.refresh_interval
         while True:
             try:
                 url = f"{self.url}api/refresh/"
@@ -39,4 +149,4 @@ class TarkovItemScheduler:
             except requests.exceptions.RequestException as error:
                 print(f"An error occurred while making the request: {error}")
             # Handle the response here
-            time.sleep(sleep_time)
+            time.sleep(interval - time.time() % interval)
@@ -0,0 +1,147 @@
+import bisect
+import heapq
+import itertools
+import re
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from starlette.requests import Request
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+
+# Starts of words in folded names, every one of them is indexed.
+_WORD_STARTS = re.compile(r"(?<![^\W_])[^\W_]")
+
+# Key, word position and id of an indexed word.
+SearchKey = Tuple[str, int, int]
+SearchResults = List[Any]
+# Matches at the start of names first, then shorter names.
+SearchRank = Tuple[bool, int, str]
+
+
+def fold(text: str) -> str:
+    """
+    Normalize text for case-insensitive matching.
+
+    :param text: text to normalize.
+    :return: folded text.
+    """
+    return text.casefold()
+
+
+class SearchIndex:
+    """
+    Per-worker prefix index of tarkov item names for autocomplete.
+
+    Every word of every name is kept in a sorted list together with
+    the rest of the name, so looking up a prefix is a binary search
+    followed by a scan of the matching keys only. Matches at the start
+    of the name rank first, then shorter names.
+
+    Results of recent queries are cached, since autocomplete asks for
+    the same short prefixes over and over. Price changes replace items
+    in place, and keys are only rebuilt when names change.
+    """
+
+    def __init__(self, max_cached_queries: int = 1024) -> None:
+        self.max_cached_queries = max_cached_queries
+        self._items: Dict[int, Any] = {}
+        self._keys: List[SearchKey] = []
+        self._results: "OrderedDict[Tuple[str, int], List[int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def update(self, items: Iterable[Any]) -> None:
+        """
+        Add changed items to the index.
+
+        :param items: tarkov items with id, name, price and base_price.
+        """
+        renamed = False
+        for item in items:
+            previous = self._items.get(item.id)
+            renamed = renamed or previous is None or previous.name != item.name
+            self._items[item.id] = item
+        if renamed:
+            self._rebuild()
+
+    def replace(self, items: Iterable[Any]) -> None:
+        """
+        Index exactly the given items, dropping everything else.
+
+        :param items: tarkov items with id, name, price and base_price.
+        """
+        self._items = {item.id: item for item in items}
+        self._rebuild()
+
+    async def reload(self, tarkov_item_dao: TarkovItemDAO) -> None:
+        """
+        Rebuild the index from the database.
+
+        :param tarkov_item_dao: DAO for tarkov_item models.
+        """
+        self.replace(await tarkov_item_dao.get_tarkov_item_rows())
+
+    def search(self, query: str, limit: int) -> SearchResults:
+        """
+        Find items with a word starting with the query.
+
+        :param query: prefix to look for.
+        :param limit: most items to return.
+        :return: best ranked items.
+        """
+        prefix = fold(query.strip())
+        if not prefix:
+            return []
+        cache_key = (prefix, limit)
+        item_ids = self._results.get(cache_key)
+        if item_ids is None:
+            item_ids = self._rank(prefix, limit)
+            self._results[cache_key] = item_ids
+            if len(self._results) > self.max_cached_queries:
+                self._results.popitem(last=False)
+        else:
+            self._results.move_to_end(cache_key)
+        return [self._items[item_id] for item_id in item_ids]
+
+    def _rank(self, prefix: str, limit: int) -> List[int]:  # noqa: WPS210
+        best: Dict[int, SearchRank] = {}
+        for position, item_id in self._matches(prefix):
+            rank = self._item_rank(position, item_id)
+            best[item_id] = min(rank, best.get(item_id, rank))
+        ranked = heapq.nsmallest(limit, best.items(), key=itemgetter(1))
+        return [match_id for match_id, _ in ranked]
+
+    def _matches(self, prefix: str) -> Iterator[Tuple[int, int]]:
+        start = bisect.bisect_left(self._keys, (prefix,))
+        for key, position, item_id in itertools.islice(self._keys, start, None):
+            if not key.startswith(prefix):
+                return
+            yield position, item_id
+
+    def _item_rank(self, position: int, item_id: int) -> SearchRank:
+        name = self._items[item_id].name
+        return position > 0, len(name), name
+
+    def _rebuild(self) -> None:
+        keys = []
+        for item in self._items.values():
+            name = fold(item.name)
+            for word in _WORD_STARTS.finditer(name):
+                start = word.start()
+                keys.append((name[start:], start, item.id))
+        keys.sort()
+        self._keys = keys
+        self._results.clear()
+
+
+def get_search_index(request: Request) -> SearchIndex:
+    """
+    Get search index of the current worker.
+
+    :param request: current request.
+    :return: search index.
+    """
+    return request.app.state.search_index
@@ -0,0 +1,173 @@
+import abc
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+# Entries the in-process stand-in keeps before evicting the oldest.
+MEMORY_MAX_ENTRIES = 10000
+
+
+class SharedCacheError(Exception):
+    """Shared cache could not be reached or answered with an error."""
+
+
+class SharedCache(abc.ABC):
+    """
+    Cache shared by workers of every node.
+
+    Values are bytes, so anything stored has to be encoded by
+    the caller. Keys are prefixed, so several deployments can share
+    a server.
+    """
+
+    name = "shared"
+
+    def __init__(self, prefix: str) -> None:
+        self.prefix = prefix
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """
+        Get value of the key.
+
+        :param key: key without the prefix.
+        """
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        """
+        Store value of the key.
+
+        :param key: key without the prefix.
+        :param value: encoded value.
+        :param ttl: seconds the value is kept for, forever if None.
+        """
+
+    async def close(self) -> None:  # noqa: B027
+        """Release connections to the cache, if it holds any."""
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+
+class RedisSharedCache(SharedCache):
+    """Shared cache on Redis, or any server speaking its protocol."""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str, timeout: float) -> None:
+        super().__init__(prefix)
+        self._client = Redis.from_url(
+            url,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+        )
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """
+        Get value of the key.
+
+        :param key: key without the prefix.
+        :return: value, or None if it's missing.
+        :raises SharedCacheError: if the server failed to answer.
+        """
+        try:
+            return await self._client.get(self._key(key))
+        except (RedisError, OSError) as error:
+            raise SharedCacheError(repr(error)) from error
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        """
+        Store value of the key.
+
+        :param key: key without the prefix.
+        :param value: encoded value.
+        :param ttl: seconds the value is kept for, forever if None.
+        :raises SharedCacheError: if the server failed to answer.
+        """
+        expires_in = None if ttl is None else int(ttl * 1000)
+        try:
+            await self._client.set(self._key(key), value, px=expires_in)
+        except (RedisError, OSError) as error:
+            raise SharedCacheError(repr(error)) from error
+
+    async def close(self) -> None:
+        """Close connections to the server."""
+        await self._client.aclose()
+
+
+class MemorySharedCache(SharedCache):
+    """
+    Stand-in for a shared cache within a single process.
+
+    It's only shared by caches of the same process, so it's meant
+    for tests and development.
+    """
+
+    name = "memory"
+
+    def __init__(
+        self,
+        prefix: str = "",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(prefix)
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """
+        Get value of the key.
+
+        :param key: key without the prefix.
+        :return: value, or None if it's missing or expired.
+        """
+        entry = self._entries.get(self._key(key))
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[self._key(key)]  # noqa: WPS420
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        """
+        Store value of the key.
+
+        :param key: key without the prefix.
+        :param value: encoded value.
+        :param ttl: seconds the value is kept for, forever if None.
+        """
+        expires_at = float("inf") if ttl is None else self._clock() + ttl
+        self._entries[self._key(key)] = (expires_at, value)
+        self._entries.move_to_end(self._key(key))
+        while len(self._entries) > MEMORY_MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+
+def create_shared_cache(
+    url: str,
+    prefix: str,
+    timeout: float,
+) -> Optional[SharedCache]:
+    """
+    Create shared cache for the URL.
+
+    :param url: ``redis://``, ``rediss://`` or ``unix://`` URL of a server,
+        ``memory://`` for the in-process stand-in, empty for no shared cache.
+    :param prefix: prefix of keys.
+    :param timeout: seconds requests may take.
+    :return: shared cache, or None if there's no URL.
+    """
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return MemorySharedCache(prefix)
+    return RedisSharedCache(url, prefix, timeout)
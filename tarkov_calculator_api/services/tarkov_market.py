@@ -0,0 +1,209 @@
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+from starlette.requests import Request
+
+from tarkov_calculator_api.services.json_stream import JSONArrayStream
+from tarkov_calculator_api.services.metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+from tarkov_calculator_api.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Bytes of the catalogue response parsed at once.
+CATALOGUE_READ_SIZE = 65536
+# Key of validators of the catalogue response.
+CATALOGUE_KEY = "/items/all"
+
+# Conditional request headers and the value of the last response.
+Validators = Tuple[Dict[str, str], Any]
+
+
+class NotModifiedError(Exception):
+    """The upstream answered that the resource didn't change."""
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Transport measuring latency and errors of tarkov market requests.
+
+    Requests are labeled with the path, the client only calls a few.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """
+        Send the request with the wrapped transport.
+
+        :param request: request to send.
+        :return: response, its body may still be streaming.
+        :raises httpx.HTTPError: if the request failed.
+        """
+        endpoint = request.url.path
+        started_at = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except httpx.HTTPError as error:
+            UPSTREAM_ERRORS.labels(endpoint, type(error).__name__).inc()
+            raise
+        UPSTREAM_LATENCY.labels(endpoint).observe(time.perf_counter() - started_at)
+        if response.status_code >= httpx.codes.BAD_REQUEST:
+            UPSTREAM_ERRORS.labels(endpoint, str(response.status_code)).inc()
+        return response
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self.transport.aclose()
+
+
+class TarkovMarketClient:
+    """
+    Async client for the tarkov-market.app API.
+
+    It wraps a single pooled ``httpx.AsyncClient`` which is meant
+    to live as long as the application, so connections to the upstream
+    are kept alive and reused between refreshes.
+
+    If the upstream tags responses with ETag or Last-Modified,
+    the next requests for the same resource are conditional,
+    and unchanged resources are answered without a body.
+    """
+
+    def __init__(self, http_client: httpx.AsyncClient) -> None:
+        self.http_client = http_client
+        self._validators: Dict[str, Validators] = {}
+
+    async def get_item(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the first item matching the query.
+
+        Errors are logged and reported as missing data,
+        so one failed item doesn't break the whole refresh.
+        If the item didn't change since the last request,
+        the last item data is returned.
+
+        :param query: item search query, e.g. "euro".
+        :return: item data or None if it could not be fetched.
+        """
+        key = f"/item?q={query}"
+        try:
+            response = await self.http_client.get(
+                "/item",
+                params={"q": query},
+                headers=self._conditions(key),
+            )
+        except httpx.HTTPError as error:
+            logger.error(f"Error while fetching {query!r}: {error!r}")
+            return None
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            return self._validators[key][1]
+        if response.status_code != httpx.codes.OK:
+            logger.error(
+                f"Error with {response.url} {response.status_code} {response.text}",
+            )
+            return None
+        item = _first_item(query, response)
+        if item is not None:
+            self._remember(key, response, item)
+        return item
+
+    async def iter_all_items(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over the whole item catalogue.
+
+        The response is parsed while it's downloaded,
+        so memory use doesn't depend on the size of the catalogue.
+        HTTP errors are raised as ``httpx.HTTPError``, malformed
+        responses as ``ValueError``. If the catalogue didn't change
+        since it was last read to the end, ``NotModifiedError`` is raised.
+
+        :yield: raw item data.
+        :raises NotModifiedError: if the catalogue didn't change.
+        """
+        stream = JSONArrayStream()
+        async with self.http_client.stream(
+            "GET",
+            CATALOGUE_KEY,
+            headers=self._conditions(CATALOGUE_KEY),
+        ) as response:
+            if response.status_code == httpx.codes.NOT_MODIFIED:
+                raise NotModifiedError(CATALOGUE_KEY)
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(CATALOGUE_READ_SIZE):
+                for item in stream.feed(chunk):
+                    yield item
+            stream.close()
+            self._remember(CATALOGUE_KEY, response, None)
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        await self.http_client.aclose()
+
+    def _conditions(self, key: str) -> Dict[str, str]:
+        validators = self._validators.get(key)
+        return validators[0] if validators else {}
+
+    def _remember(self, key: str, response: httpx.Response, value: Any) -> None:
+        conditions = {}
+        etag = response.headers.get("etag")
+        if etag:
+            conditions["if-none-match"] = etag
+        last_modified = response.headers.get("last-modified")
+        if last_modified:
+            conditions["if-modified-since"] = last_modified
+        if conditions:
+            self._validators[key] = (conditions, value)
+
+
+def create_tarkov_market_client(
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> TarkovMarketClient:
+    """
+    Create tarkov market client configured from settings.
+
+    :param transport: custom transport, used in tests.
+    :return: new client.
+    """
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=settings.tarkov_market_max_connections,
+                max_keepalive_connections=settings.tarkov_market_max_keepalive_connections,
+                keepalive_expiry=settings.tarkov_market_keepalive_expiry,
+            ),
+        )
+    http_client = httpx.AsyncClient(
+        base_url=settings.tarkov_market_url,
+        headers={"x-api-key": settings.tarkov_market_api_key},
+        timeout=httpx.Timeout(
+            settings.tarkov_market_timeout,
+            connect=settings.tarkov_market_connect_timeout,
+        ),
+        transport=InstrumentedTransport(transport),
+    )
+    return TarkovMarketClient(http_client)
+
+
+def get_tarkov_market_client(request: Request) -> TarkovMarketClient:
+    """
+    Get tarkov market client shared by the application.
+
+    :param request: current request.
+    :return: tarkov market client.
+    """
+    return request.app.state.tarkov_market_client
+
+
+def _first_item(query: str, response: httpx.Response) -> Optional[Dict[str, Any]]:
+    try:
+        items = response.json()
+    except ValueError as error:
+        logger.error(f"Invalid response for {query!r}: {error!r}")
+        return None
+    if not isinstance(items, list) or not items:
+        logger.error(f"No items found for {query!r}")
+        return None
+    return items[0]
@@ -0,0 +1,161 @@
+import asyncio
+import uuid
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.db.dao.tarkov_item_price_dao import TarkovItemPriceDAO
+from tarkov_calculator_api.db.models.tarkov_item_model import TarkovItem
+from tarkov_calculator_api.services.bulk_load import (
+    create_price_updates,
+    load_items,
+    load_prices,
+    read_items,
+)
+from tarkov_calculator_api.services.price_updates import PriceUpdates
+from tarkov_calculator_api.settings import settings
+
+
+@pytest.mark.anyio
+async def test_load_tarkov_items(dbsession: AsyncSession) -> None:
+    """Tests that items are inserted, updated and deduplicated by name."""
+    dao = TarkovItemDAO(dbsession)
+    names = [uuid.uuid4().hex for _ in range(3)]
+    existing = {"name": names[0], "price": 1, "base_price": 1}
+    await dao.bulk_upsert([existing])
+
+    loaded = await dao.load_tarkov_items(
+        [
+            (names[0], 10, 5),
+            (names[1], 20, 10),
+            (names[2], 1, 1),
+            (names[2], 30, 15),
+        ],
+    )
+
+    assert len(loaded) == 3
+    items = {item.name: item for item in await dao.get_tarkov_items_by_names(names)}
+    assert [items[name].price for name in names] == [10, 20, 30]
+    assert [items[name].base_price for name in names] == [5, 10, 15]
+    assert not await dao.load_tarkov_items([(names[0], 10, 5)])
+
+
+@pytest.mark.anyio
+async def test_load_prices(
+    dbsession: AsyncSession,
+    price_updates: PriceUpdates,
+    tmp_path: Path,
+) -> None:
+    """Tests loading price history from a file across partitions."""
+    name = uuid.uuid4().hex
+    await TarkovItemDAO(dbsession).bulk_upsert(
+        [{"name": name, "price": 1, "base_price": 1}],
+    )
+    start = datetime(2019, 1, 31, 23, 30)
+    lines = ["name,recorded_at,price,base_price"]
+    for sample in range(4):
+        recorded_at = start + timedelta(minutes=20 * sample)
+        price = str(100 + sample)
+        lines.append(",".join([name, recorded_at.isoformat(), price, "50"]))
+    unknown = uuid.uuid4().hex
+    lines.append(",".join([unknown, start.isoformat(), "1", "1"]))
+    history = tmp_path / "history.csv"
+    history.write_text("\n".join(lines))
+
+    assert await load_prices(dbsession, history, price_updates) == 4
+    assert not await load_prices(dbsession, history, price_updates)
+
+    item = (await TarkovItemDAO(dbsession).filter(name=name))[0]
+    buckets = await TarkovItemPriceDAO(dbsession).get_price_history(
+        item.id,
+        start.replace(tzinfo=timezone.utc),
+        start.replace(tzinfo=timezone.utc) + timedelta(hours=2),
+        buckets=1,
+    )
+    assert buckets[0].samples == 4
+    assert buckets[0].price_max == 103
+
+
+@pytest.mark.anyio
+async def test_load_items_file(
+    dbsession: AsyncSession,
+    price_updates: PriceUpdates,
+    tmp_path: Path,
+) -> None:
+    """Tests loading items from a file."""
+    name = uuid.uuid4().hex
+    items = tmp_path / "items.csv"
+    items.write_text(f"name,price,base_price\n{name},10,5\n")
+    cache_version = price_updates.tarkov_item_cache.version
+
+    assert await load_items(dbsession, items, price_updates) == 1
+    item = (await TarkovItemDAO(dbsession).filter(name=name))[0]
+    assert item.price == 10
+    assert price_updates.tarkov_item_cache.version == cache_version + 1
+
+
+@pytest.mark.anyio
+async def test_load_items_published(  # noqa: WPS210
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    _engine: AsyncEngine,
+    price_updates: PriceUpdates,
+    tmp_path: Path,
+) -> None:
+    """Tests that a running app serves loaded prices instead of cached ones."""
+    name = uuid.uuid4().hex
+    items = tmp_path / "items.csv"
+    subscription = price_updates.subscribe()
+    listen_task = asyncio.create_task(
+        price_updates.listen(str(settings.db_url.with_scheme("postgresql")), 0.1),
+    )
+    try:
+        await asyncio.wait_for(price_updates.listening.wait(), timeout=5)
+        prices = []
+        for price in (10, 20):
+            items.write_text(f"name,price,base_price\n{name},{price},5\n")
+            async with AsyncSession(_engine) as session:
+                await load_items(session, items, create_price_updates())
+                item_id = (await TarkovItemDAO(session).filter(name=name))[0].id
+            await asyncio.wait_for(subscription.get(), timeout=5)
+            url = fastapi_app.url_path_for(
+                "get_tarkov_item_model_by_id",
+                tarkov_item_id=item_id,
+            )
+            prices.append((await client.get(url)).json()["price"])
+    finally:
+        listen_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await listen_task
+        await _delete_item(_engine, name)
+
+    assert prices == [10, 20]
+
+
+@pytest.mark.parametrize(
+    "content, message",
+    [
+        ("name,price\nx,1\n", "missing columns base_price"),
+        ("name,price,base_price\nx,1,1\ny,one,1\n", ":3:"),
+    ],
+)
+def test_read_items_errors(tmp_path: Path, content: str, message: str) -> None:
+    """Tests that invalid files are reported with the offending line."""
+    items = tmp_path / "items.csv"
+    items.write_text(content)
+    with pytest.raises(ValueError, match=message):
+        list(read_items(items))
+
+
+async def _delete_item(engine: AsyncEngine, name: str) -> None:
+    # Loads are committed, other tests must not see them.
+    async with AsyncSession(engine) as session:
+        await session.execute(delete(TarkovItem).where(TarkovItem.name == name))
+        await session.commit()
@@ -0,0 +1,54 @@
+from tarkov_calculator_api.services.cache import TarkovItemCache
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self) -> None:
+        self.now: float = 0
+
+    def __call__(self) -> float:
+        """
+        Current time.
+
+        :return: time set by the test.
+        """
+        return self.now
+
+
+def test_lru_eviction() -> None:
+    """Least recently used entries are evicted first."""
+    cache = TarkovItemCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats.evictions == 1
+
+
+def test_ttl_expiration() -> None:
+    """Entries expire after ttl seconds."""
+    clock = FakeClock()
+    cache = TarkovItemCache(max_size=10, ttl=60, clock=clock)
+    cache.set("a", 1)
+    clock.now = 59
+    assert cache.get("a") == 1
+    clock.now = 60
+    assert cache.get("a") is None
+    assert cache.stats.expirations == 1
+
+
+def test_invalidate_drops_stale_writes() -> None:
+    """Values loaded before an invalidation are never cached."""
+    cache = TarkovItemCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    version = cache.version
+    cache.invalidate()
+
+    assert cache.get("a") is None
+    cache.set("a", 1, version=version)
+    assert cache.get("a") is None
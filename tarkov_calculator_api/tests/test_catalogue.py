@@ -0,0 +1,182 @@
+import asyncio
+import uuid
+from typing import Any, AsyncIterator, List
+
+import pytest
+import ujson
+from httpx import MockTransport, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.db.dao.tarkov_item_price_dao import TarkovItemPriceDAO
+from tarkov_calculator_api.services.fingerprints import UpstreamFingerprints
+from tarkov_calculator_api.services.json_stream import JSONArrayStream
+from tarkov_calculator_api.services.price_updates import PriceUpdates
+from tarkov_calculator_api.services.refresh import ingest_catalogue
+from tarkov_calculator_api.services.tarkov_market import create_tarkov_market_client
+from tarkov_calculator_api.settings import settings
+
+
+def _parse(document: bytes, chunk_size: int) -> List[Any]:
+    stream = JSONArrayStream(max_element_size=64)
+    elements = []
+    for start in range(0, len(document), chunk_size):
+        elements.extend(stream.feed(document[start : start + chunk_size]))
+    stream.close()
+    return elements
+
+
+async def _stream(document: bytes, chunk_size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(document), chunk_size):
+        yield document[start : start + chunk_size]
+
+
+def test_json_array_stream() -> None:
+    """Tests that elements are parsed however the document is split."""
+    elements = [{"name": "Евро", "price": [1, 2]}, 12, "x", None, 1.5]
+    document = ujson.dumps(elements, ensure_ascii=False).encode()
+    for chunk_size in (1, 2, 3, 7, len(document)):
+        assert _parse(document, chunk_size) == elements
+
+
+@pytest.mark.parametrize(
+    "document",
+    [b'{"name": "euro"}', b"[1, 2", ujson.dumps(["x" * 100]).encode()],
+)
+def test_json_array_stream_errors(document: bytes) -> None:
+    """Tests that non-arrays, truncated arrays and huge elements are rejected."""
+    with pytest.raises(ValueError):
+        _parse(document, 4)
+
+
+@pytest.mark.anyio
+async def test_ingest_catalogue(
+    dbsession: AsyncSession,
+    price_updates: PriceUpdates,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests that the catalogue is written in chunks and invalid items skipped."""
+    names = [uuid.uuid4().hex for _ in range(7)]
+    catalogue = [
+        {"name": name, "price": index, "basePrice": index * 2}
+        for index, name in enumerate(names)
+    ]
+    catalogue.append({"name": "x" * 300, "price": 1, "basePrice": 1})
+    catalogue.append({"name": uuid.uuid4().hex, "price": None, "basePrice": 1})
+    catalogue.append({"name": uuid.uuid4().hex, "price": True, "basePrice": 1})
+
+    document = ujson.dumps(catalogue).encode()
+
+    def handler(request: Request) -> Response:  # noqa: WPS430
+        assert request.url.path.endswith("/items/all")
+        return Response(200, content=_stream(document, 10))
+
+    monkeypatch.setattr(settings, "catalogue_chunk_size", 3)
+    subscription = price_updates.subscribe()
+    market_client = create_tarkov_market_client(transport=MockTransport(handler))
+    dao = TarkovItemDAO(dbsession)
+    try:
+        report = await ingest_catalogue(
+            dao,
+            TarkovItemPriceDAO(dbsession),
+            market_client,
+            price_updates,
+        )
+    finally:
+        await market_client.close()
+
+    assert report.changed == 7
+    assert report.failed == 3
+    items = await dao.get_tarkov_items_by_names(names)
+    base_prices = sorted(item.base_price for item in items)
+    assert base_prices == list(range(0, 14, 2))
+    chunk_sizes = []
+    for _ in range(3):
+        event = subscription.get_nowait()
+        assert event is not None
+        chunk_sizes.append(len(event["items"]))
+    assert chunk_sizes == [3, 3, 1]
+    with pytest.raises(asyncio.QueueEmpty):
+        subscription.get_nowait()
+
+
+@pytest.mark.anyio
+async def test_ingest_catalogue_failure(
+    dbsession: AsyncSession,
+    price_updates: PriceUpdates,
+) -> None:
+    """Tests that a failed download doesn't break the refresh."""
+    market_client = create_tarkov_market_client(
+        transport=MockTransport(lambda request: Response(500)),
+    )
+    try:
+        report = await ingest_catalogue(
+            TarkovItemDAO(dbsession),
+            TarkovItemPriceDAO(dbsession),
+            market_client,
+            price_updates,
+        )
+    finally:
+        await market_client.close()
+
+    assert not report.changed
+
+
+@pytest.mark.anyio
+async def test_ingest_changed_items_only(  # noqa: WPS210
+    dbsession: AsyncSession,
+    price_updates: PriceUpdates,
+    upstream_fingerprints: UpstreamFingerprints,
+) -> None:
+    """Tests that unchanged catalogues and items aren't written again."""
+    names = [uuid.uuid4().hex for _ in range(3)]
+    catalogue = [{"name": name, "price": 1, "basePrice": 1} for name in names]
+    versions: List[str] = []
+
+    def handler(request: Request) -> Response:  # noqa: WPS430
+        etag = '"{0}"'.format(len(versions))
+        if request.headers.get("if-none-match") == etag:
+            return Response(304)
+        versions.append(etag)
+        return Response(200, json=catalogue, headers={"etag": etag})
+
+    # Tracked items are counted by their own refresh, not the catalogue.
+    upstream_fingerprints.remember([{"name": "euro", "price": 1, "base_price": 1}])
+    subscription = price_updates.subscribe()
+    market_client = create_tarkov_market_client(transport=MockTransport(handler))
+    dao = TarkovItemDAO(dbsession)
+    price_dao = TarkovItemPriceDAO(dbsession)
+    reports = []
+    try:
+        for _ in range(2):
+            reports.append(
+                await ingest_catalogue(
+                    dao,
+                    price_dao,
+                    market_client,
+                    price_updates,
+                    upstream_fingerprints,
+                ),
+            )
+        catalogue[0] = {"name": names[0], "price": 2, "basePrice": 1}
+        versions.append("changed")
+        reports.append(
+            await ingest_catalogue(
+                dao,
+                price_dao,
+                market_client,
+                price_updates,
+                upstream_fingerprints,
+            ),
+        )
+    finally:
+        await market_client.close()
+
+    counts = [(report.changed, report.unchanged) for report in reports]
+    assert counts == [(3, 0), (0, 3), (1, 2)]
+    assert len(subscription.get_nowait()["items"]) == 3  # type: ignore[index]
+    event = subscription.get_nowait()
+    assert event is not None
+    assert [item["name"] for item in event["items"]] == [names[0]]
+    with pytest.raises(asyncio.QueueEmpty):
+        subscription.get_nowait()
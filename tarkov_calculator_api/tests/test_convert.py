@@ -0,0 +1,120 @@
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tarkov_calculator_api.calculator.rates import (
+    Currency,
+    ExchangeRates,
+    RateSide,
+    RateTable,
+)
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.db.models.tarkov_item_model import TarkovItem
+from tarkov_calculator_api.web.api.convert.views import MAX_BATCH_SIZE
+
+
+def test_rate_table() -> None:
+    """Tests rates between every pair of currencies."""
+    table = RateTable.from_items(
+        [
+            TarkovItem(name="euro", price=150, base_price=120),
+            TarkovItem(name="dollar", price=125, base_price=0),
+        ],
+        datetime.now(timezone.utc),
+    )
+
+    assert table.rate(Currency.ROUBLE, Currency.ROUBLE) == 1
+    assert table.rate(Currency.EURO, Currency.ROUBLE) == 150
+    euro_rate = table.rate(Currency.ROUBLE, Currency.EURO)
+    assert euro_rate == pytest.approx(1 / 150)
+    assert table.rate(Currency.EURO, Currency.DOLLAR) == pytest.approx(1.2)
+    assert table.rate(Currency.EURO, Currency.ROUBLE, RateSide.SELL) == 120
+    assert table.rate(Currency.DOLLAR, Currency.ROUBLE, RateSide.SELL) is None
+
+
+@pytest.mark.anyio
+async def test_convert(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    exchange_rates: ExchangeRates,
+) -> None:
+    """Tests converting single and many amounts."""
+    url = fastapi_app.url_path_for("convert")
+    params: Dict[str, Any] = {"amount": 2, "source": "euro", "target": "rouble"}
+
+    response = await client.get(url, params=params)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    await _load_rates(dbsession, exchange_rates)
+
+    response = await client.get(url, params=params)
+    assert response.status_code == status.HTTP_200_OK
+    conversion = response.json()["conversions"][0]
+    assert conversion["result"] == 300
+    assert conversion["rate"] == 150
+
+    response = await client.post(
+        fastapi_app.url_path_for("convert_batch"),
+        json=[
+            {"amount": 240, "source": "rouble", "target": "euro", "side": "sell"},
+            {"amount": 5, "source": "dollar", "target": "euro"},
+        ],
+    )
+    assert response.status_code == status.HTTP_200_OK
+    results = [item["result"] for item in response.json()["conversions"]]
+    assert results[0] == pytest.approx(2)
+    assert results[1] == pytest.approx(125 * 5 / 150)
+
+    response = await client.post(
+        fastapi_app.url_path_for("convert_batch"),
+        json=[
+            {"amount": amount, "source": "euro", "target": "rouble"}
+            for amount in range(MAX_BATCH_SIZE + 1)
+        ],
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    params["amount"] = 1e308
+    response = await client.get(url, params=params)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("amount", ["nan", "inf", "-inf"])
+async def test_convert_non_finite(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    exchange_rates: ExchangeRates,
+    amount: str,
+) -> None:
+    """Tests that amounts JSON can't carry are rejected."""
+    await _load_rates(dbsession, exchange_rates)
+    response = await client.get(
+        fastapi_app.url_path_for("convert"),
+        params={"amount": amount, "source": "euro", "target": "rouble"},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    response = await client.post(
+        fastapi_app.url_path_for("convert_batch"),
+        json=[{"amount": float(amount), "source": "euro", "target": "rouble"}],
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+async def _load_rates(dbsession: AsyncSession, exchange_rates: ExchangeRates) -> None:
+    dao = TarkovItemDAO(dbsession)
+    await dao.bulk_upsert(
+        [
+            {"name": "euro", "price": 150, "base_price": 120},
+            {"name": "dollar", "price": 125, "base_price": 100},
+        ],
+    )
+    await exchange_rates.reload(dao)
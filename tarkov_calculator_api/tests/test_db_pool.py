@@ -0,0 +1,64 @@
+from typing import AsyncGenerator
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from starlette import status
+
+from tarkov_calculator_api.db.dependencies import get_db_engine
+from tarkov_calculator_api.services.metrics import InstrumentedQueuePool
+from tarkov_calculator_api.settings import settings
+
+
+@pytest.fixture
+async def pooled_engine(
+    _engine: AsyncEngine,
+) -> AsyncGenerator[AsyncEngine, None]:
+    """
+    Engine with a small instrumented pool, like the one of workers.
+
+    :param _engine: engine that created the test database.
+    :yield: engine.
+    """
+    engine = create_async_engine(
+        str(settings.db_url),
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        connect_args={"prepared_statement_cache_size": 0, "statement_cache_size": 0},
+    )
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_db_pool_stats(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    pooled_engine: AsyncEngine,
+) -> None:
+    """Tests that connections in use and overflow of the pool are reported."""
+    fastapi_app.dependency_overrides[get_db_engine] = lambda: pooled_engine
+    url = fastapi_app.url_path_for("db_pool_stats")
+
+    async with pooled_engine.connect():
+        async with pooled_engine.connect():
+            response = await client.get(url)
+    stats = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert stats["pool"] == "InstrumentedQueuePool"
+    assert stats["pool_size"] == 1
+    assert stats["max_overflow"] == 1
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["checkouts"] == 2
+
+    stats = (await client.get(url)).json()
+
+    assert stats["checked_out"] == 0
+    assert stats["checked_in"] == 1
+    assert stats["overflow"] == 0
@@ -0,0 +1,147 @@
+import math
+import uuid
+from typing import Any, Tuple
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tarkov_calculator_api.calculator.flea import (
+    FleaTaxes,
+    ItemPrices,
+    UnknownItemsError,
+    best_price_ratio,
+    flea_fees,
+    get_item_prices,
+    parse_lines,
+)
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.services.price_updates import PriceChange
+
+
+def _fee(base_price: float, price: float, quantity: int, taxes: FleaTaxes) -> float:
+    item_power = math.log10(base_price / price)
+    price_power = math.log10(price / base_price)
+    if price < base_price:
+        item_power **= 1.08
+    else:
+        price_power **= 1.08
+    item_tax = base_price * taxes.inputs * 4**item_power
+    price_tax = price * taxes.requirements * 4**price_power
+    fee = (item_tax + price_tax) * quantity * (1 - taxes.reduction)
+    return math.ceil(fee)
+
+
+def _profit(base_price: float, price: float, taxes: FleaTaxes) -> float:
+    return price - _fee(base_price, price, 1, taxes)
+
+
+def test_flea_fees() -> None:
+    """Tests fees against the formula, one listing at a time."""
+    taxes = FleaTaxes(inputs=0.05, requirements=0.1, reduction=0.3)
+    base_prices = np.array([10000, 10000, 25000, 7])
+    prices = np.array([20000, 4000, 25000, 1000000])
+    quantities = np.array([1, 3, 2, 1])
+
+    fees = flea_fees(base_prices, prices, quantities, taxes)
+
+    expected = [
+        _fee(*line, taxes)  # type: ignore
+        for line in zip(base_prices, prices, quantities)
+    ]
+    assert fees.tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "taxes",
+    [FleaTaxes(), FleaTaxes(inputs=0.05, requirements=0.1, reduction=0.3)],
+)
+def test_best_price_ratio(taxes: FleaTaxes) -> None:
+    """Tests that listing at the best price pays more than around it."""
+    base_price = 1000000
+    best_price = base_price * best_price_ratio(taxes)
+    best_profit = _profit(base_price, best_price, taxes)
+
+    for scale in (0.5, 0.9, 0.99, 1.01, 1.1, 2):
+        assert _profit(base_price, best_price * scale, taxes) < best_profit
+
+
+def test_item_prices() -> None:
+    """Tests best prices, updates and unknown items."""
+    item_prices = ItemPrices()
+    item_prices.replace(
+        [PriceChange(1, "salewa", 40000, 10000), PriceChange(2, "bolts", 0, 5000)],
+    )
+    lines = parse_lines([["salewa", 30000, 2], ["bolts", 20000, 1]])
+    ratio = best_price_ratio(FleaTaxes())
+
+    fees = item_prices.flea_fees(lines, FleaTaxes())
+
+    assert fees.base_prices.tolist() == [10000, 5000]
+    assert fees.profits[0] == 60000 - fees.fees[0]
+    assert fees.best_prices.tolist() == [40000, math.floor(5000 * ratio)]
+
+    item_prices.update(
+        [PriceChange(1, "salewa", 50000, 10000), PriceChange(3, "gpu", 1, 1)],
+    )
+
+    assert len(item_prices) == 3
+    assert item_prices.flea_fees(lines, FleaTaxes()).best_prices[0] == 50000
+    unknown_lines = parse_lines([["lamp", 1, 1], ["gpu", 1, 1]])
+    with pytest.raises(UnknownItemsError, match="lamp"):
+        item_prices.flea_fees(unknown_lines, FleaTaxes())
+
+
+INVALID_LINES: Tuple[Any, ...] = (
+    {},
+    [["salewa", 1]],
+    [[1, 1, 1]],
+    [["salewa", 0, 1]],
+    [["salewa", 1, 1.5]],
+)
+
+
+@pytest.mark.parametrize("lines", INVALID_LINES)
+def test_parse_invalid_lines(lines: object) -> None:
+    """Tests that malformed listings are rejected."""
+    with pytest.raises(ValueError, match="must|Expected"):
+        parse_lines(lines)
+
+
+@pytest.mark.anyio
+async def test_flea_fee_endpoint(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests calculating fees with base prices from the database."""
+    name = uuid.uuid4().hex
+    await TarkovItemDAO(dbsession).bulk_upsert(
+        [{"name": name, "price": 40000, "base_price": 10000}],
+    )
+    item_prices = ItemPrices()
+    await item_prices.reload(TarkovItemDAO(dbsession))
+    fastapi_app.dependency_overrides[get_item_prices] = lambda: item_prices
+    url = fastapi_app.url_path_for("calculate_flea_fees")
+
+    response = await client.post(
+        url,
+        params={"fee_reduction": 0.3},
+        json=[[name, 30000, 2], [name, 10000, 1]],
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    fees = response.json()
+    taxes = FleaTaxes(reduction=0.3)
+    assert fees["base_prices"] == [10000, 10000]
+    first_fee = _fee(10000, 30000, 2, taxes)
+    assert fees["fees"] == [first_fee, _fee(10000, 10000, 1, taxes)]
+    assert fees["best_prices"] == [40000, 40000]
+    unknown_line = ["{0} unknown".format(name), 1, 1]
+    unknown = await client.post(url, json=[unknown_line])
+    assert unknown.status_code == status.HTTP_404_NOT_FOUND
+    malformed = await client.post(url, json=[[name, -1, 1]])
+    assert malformed.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
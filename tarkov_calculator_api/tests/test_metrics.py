@@ -0,0 +1,129 @@
+import os
+import subprocess  # noqa: S404
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, MockTransport, Response
+from prometheus_client import REGISTRY
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.db.dao.tarkov_item_price_dao import TarkovItemPriceDAO
+from tarkov_calculator_api.services.metrics import (
+    MULTIPROCESS_DIR_ENV,
+    REFRESH_LAST_SUCCESS,
+)
+from tarkov_calculator_api.services.price_updates import PriceUpdates
+from tarkov_calculator_api.services.refresh import refresh_market_data
+from tarkov_calculator_api.services.tarkov_market import (
+    TarkovMarketClient,
+    create_tarkov_market_client,
+)
+
+WORKER_SCRIPT = (
+    "from tarkov_calculator_api.services.metrics import TARKOV_ITEM_CACHE_HITS;"
+    "TARKOV_ITEM_CACHE_HITS.inc(2)"
+)
+SCRAPE_SCRIPT = (
+    "import sys;"
+    "from tarkov_calculator_api.services.metrics import render_metrics;"
+    "sys.stdout.buffer.write(render_metrics())"
+)
+
+
+def _sample(name: str, labels: Dict[str, str]) -> float:
+    sample: Optional[float] = REGISTRY.get_sample_value(name, labels)
+    return sample or 0
+
+
+@pytest.mark.anyio
+async def test_request_metrics(fastapi_app: FastAPI, client: AsyncClient) -> None:
+    """Tests that requests are measured by route template."""
+    labels = {
+        "method": "GET",
+        "route": "/api/tarkov_item/{tarkov_item_id}",
+        "status": "404",
+    }
+    count_before = _sample("http_request_duration_seconds_count", labels)
+
+    await client.get(
+        fastapi_app.url_path_for("get_tarkov_item_model_by_id", tarkov_item_id=0),
+    )
+    response = await client.get(fastapi_app.url_path_for("metrics"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert _sample("http_request_duration_seconds_count", labels) == count_before + 1
+    assert "cache_lookups_total" in response.text
+
+
+@pytest.mark.anyio
+async def test_upstream_metrics() -> None:
+    """Tests that failed tarkov market requests are counted."""
+    labels = {"endpoint": "/api/v1/item", "reason": "503"}
+    errors_before = _sample("tarkov_market_errors_total", labels)
+    market_client = create_tarkov_market_client(
+        transport=MockTransport(lambda request: Response(503)),
+    )
+    try:
+        assert await market_client.get_item("euro") is None
+    finally:
+        await market_client.close()
+
+    assert _sample("tarkov_market_errors_total", labels) == errors_before + 1
+    latency_labels = {"endpoint": "/api/v1/item"}
+    assert _sample("tarkov_market_request_duration_seconds_count", latency_labels)
+
+
+@pytest.mark.anyio
+async def test_failed_refresh_metrics(
+    dbsession: AsyncSession,
+    price_updates: PriceUpdates,
+    tarkov_market_client: TarkovMarketClient,
+    tarkov_market_items: Dict[str, Dict[str, Any]],
+) -> None:
+    """Tests that refreshes without any price aren't successful."""
+    REFRESH_LAST_SUCCESS.set(0)
+    failed_before = _sample("refresh_items_total", {"result": "failed"})
+
+    await refresh_market_data(
+        TarkovItemDAO(dbsession),
+        TarkovItemPriceDAO(dbsession),
+        tarkov_market_client,
+        price_updates,
+    )
+    assert not _sample("refresh_last_success_timestamp_seconds", {})
+    assert _sample("refresh_items_total", {"result": "failed"}) == failed_before + 2
+
+    tarkov_market_items["euro"] = {"price": 150, "basePrice": 120}
+    await refresh_market_data(
+        TarkovItemDAO(dbsession),
+        TarkovItemPriceDAO(dbsession),
+        tarkov_market_client,
+        price_updates,
+    )
+    assert _sample("refresh_last_success_timestamp_seconds", {})
+
+
+def test_multiprocess_metrics(tmp_path: Path) -> None:
+    """Tests that metrics of several workers are added up."""
+    environment = {**os.environ, MULTIPROCESS_DIR_ENV: str(tmp_path)}
+    for _ in range(2):
+        subprocess.run(  # noqa: S603
+            [sys.executable, "-c", WORKER_SCRIPT],
+            env=environment,
+            check=True,
+        )
+    scraped = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", SCRAPE_SCRIPT],
+        env=environment,
+        check=True,
+        capture_output=True,
+    )
+
+    metrics = scraped.stdout.decode()
+    assert 'cache_lookups_total{cache="tarkov_item",result="hit"} 4.0' in metrics
@@ -0,0 +1,127 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.db.dao.tarkov_item_price_dao import TarkovItemPriceDAO
+
+
+@pytest.mark.anyio
+async def test_price_history(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests recording price history and reading it downsampled."""
+    dao = TarkovItemDAO(dbsession)
+    price_dao = TarkovItemPriceDAO(dbsession)
+    name = uuid.uuid4().hex
+    start = datetime(2024, 3, 31, 23, tzinfo=timezone.utc)
+    await price_dao.create_partitions(start)
+
+    # Six samples, ten minutes apart, crossing a partition boundary.
+    for sample in range(6):
+        await dao.bulk_upsert(
+            [{"name": name, "price": 100 + sample, "base_price": 50}],
+        )
+        await price_dao.record_prices(
+            [name],
+            start + timedelta(minutes=10 * sample),
+        )
+    item = (await dao.filter(name=name))[0]
+
+    url = fastapi_app.url_path_for(
+        "get_tarkov_item_price_history",
+        tarkov_item_id=item.id,
+    )
+    response = await client.get(
+        url,
+        params={
+            "start": start.isoformat(),
+            "end": (start + timedelta(hours=1)).isoformat(),
+            "buckets": 2,
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    buckets = response.json()
+
+    assert len(buckets) == 2
+    assert buckets[0]["samples"] == 3
+    assert buckets[0]["price_min"] == 100
+    assert buckets[0]["price_max"] == 102
+    assert buckets[0]["price"] == 101
+    assert buckets[1]["price"] == 104
+    assert buckets[1]["base_price"] == 50
+    second_bucket = datetime.fromisoformat(buckets[1]["timestamp"])
+    assert second_bucket == start + timedelta(minutes=30)
+
+
+@pytest.mark.anyio
+async def test_price_history_carried_forward(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests that prices hold until they change and are averaged over time."""
+    dao = TarkovItemDAO(dbsession)
+    price_dao = TarkovItemPriceDAO(dbsession)
+    name = uuid.uuid4().hex
+    start = datetime(2024, 5, 10, 12, tzinfo=timezone.utc)
+    await price_dao.create_partitions(start)
+
+    # Quiet for a day before the period, then one change late in it.
+    changes = (
+        (start - timedelta(days=1), 100),
+        (start + timedelta(minutes=45), 200),
+    )
+    for recorded_at, price in changes:
+        await dao.bulk_upsert([{"name": name, "price": price, "base_price": 50}])
+        await price_dao.record_prices([name], recorded_at)
+    item = (await dao.filter(name=name))[0]
+
+    url = fastapi_app.url_path_for(
+        "get_tarkov_item_price_history",
+        tarkov_item_id=item.id,
+    )
+    response = await client.get(
+        url,
+        params={
+            "start": start.isoformat(),
+            "end": (start + timedelta(hours=1)).isoformat(),
+            "buckets": 2,
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    buckets = response.json()
+
+    assert len(buckets) == 2
+    assert buckets[0]["samples"] == 0
+    assert buckets[0]["price"] == 100
+    assert buckets[1]["samples"] == 1
+    assert buckets[1]["price_min"] == 100
+    assert buckets[1]["price_max"] == 200
+    assert buckets[1]["price"] == 150
+    assert buckets[1]["base_price"] == 50
+
+
+@pytest.mark.anyio
+async def test_price_history_empty_period(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """Tests that periods ending before they start are rejected."""
+    url = fastapi_app.url_path_for(
+        "get_tarkov_item_price_history",
+        tarkov_item_id=1,
+    )
+    now = datetime.now(timezone.utc)
+    response = await client.get(
+        url,
+        params={"start": now.isoformat(), "end": now.isoformat()},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,175 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tarkov_calculator_api.calculator.rates import ExchangeRates
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.services.cache import TarkovItemCache
+from tarkov_calculator_api.services.price_snapshot import (
+    SNAPSHOT_FILE,
+    PriceSnapshot,
+    SnapshotItem,
+    get_price_snapshot,
+)
+from tarkov_calculator_api.services.price_updates import PriceChange, PriceUpdates
+
+RECORDED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+EURO = SnapshotItem(id=2, name="euro", price=150, base_price=120)
+DOLLAR = SnapshotItem(id=1, name="dollar", price=130, base_price=100)
+POUND = SnapshotItem(id=3, name="pound", price=170, base_price=140)
+EURO_LATER = SnapshotItem(id=2, name="euro", price=160, base_price=120)
+EURO_OUTDATED = SnapshotItem(id=2, name="euro", price=155, base_price=120)
+EURO_RENAMED = SnapshotItem(id=2, name="euro note", price=150, base_price=120)
+# Id far beyond the ones the database hands out.
+SNAPSHOT_ONLY_ID = 10**9
+
+
+@pytest.mark.anyio
+async def test_price_snapshot(tmp_path: Path) -> None:
+    """Tests looking items up in a snapshot."""
+    snapshot = PriceSnapshot(tmp_path)
+    await snapshot.update([EURO, DOLLAR], RECORDED_AT, generation="first")
+
+    assert snapshot.item(EURO.id) == EURO
+    assert snapshot.item(3) is None
+    assert snapshot.item(-(2**70)) is None
+    assert snapshot.items_by_names(["dollar", "pound", "euro"]) == [DOLLAR, EURO]
+    assert snapshot.items([EURO.id], ["dollar"]) == [EURO, DOLLAR]
+    assert snapshot.info()["generation"] == "first"
+    assert snapshot.recorded_at == RECORDED_AT
+
+
+@pytest.mark.anyio
+async def test_price_snapshot_workers(tmp_path: Path) -> None:
+    """Tests that workers of a host share a single snapshot."""
+    first, second = PriceSnapshot(tmp_path), PriceSnapshot(tmp_path)
+    await first.update([EURO, DOLLAR], RECORDED_AT)
+    inode = (tmp_path / SNAPSHOT_FILE).stat().st_ino
+
+    await second.update([EURO], RECORDED_AT)
+
+    assert (tmp_path / SNAPSHOT_FILE).stat().st_ino == inode
+    assert second.item(DOLLAR.id) == DOLLAR
+    await second.update([EURO_LATER, POUND], RECORDED_AT + timedelta(minutes=10))
+    # Workers that fall behind can't bring back outdated prices.
+    await first.update([EURO_OUTDATED], RECORDED_AT + timedelta(minutes=5))
+    assert first.item(EURO.id) == EURO_LATER
+    assert first.items_by_names(["pound"]) == [POUND]
+    assert len(first) == 3
+
+
+@pytest.mark.anyio
+async def test_price_snapshot_renamed(tmp_path: Path) -> None:
+    """Tests that items keep their latest names."""
+    snapshot = PriceSnapshot(tmp_path)
+    await snapshot.update([EURO, DOLLAR], RECORDED_AT)
+
+    await snapshot.update([EURO_RENAMED], RECORDED_AT + timedelta(minutes=5))
+
+    assert snapshot.item(EURO.id) == EURO_RENAMED
+    assert snapshot.items_by_names(["euro", "euro note"]) == [EURO_RENAMED]
+    assert snapshot.item(DOLLAR.id) == DOLLAR
+    assert len(snapshot) == 2
+
+
+@pytest.mark.anyio
+async def test_price_snapshot_unavailable(tmp_path: Path) -> None:
+    """Tests that snapshots which can't be read are skipped."""
+    (tmp_path / SNAPSHOT_FILE).write_bytes(b"not a snapshot")
+    snapshot = PriceSnapshot(tmp_path)
+
+    await snapshot.open()
+
+    assert not snapshot.available
+    assert snapshot.item(EURO.id) is None
+    assert not PriceSnapshot(None).items([EURO.id], ["euro"])
+
+
+@pytest.mark.anyio
+async def test_price_snapshot_reload(tmp_path: Path, dbsession: AsyncSession) -> None:
+    """Tests that reloads keep newer prices and drop deleted items."""
+    name = uuid.uuid4().hex
+    tarkov_item_dao = TarkovItemDAO(dbsession)
+    row = {"name": name, "price": 10, "base_price": 5}
+    await tarkov_item_dao.bulk_upsert([row])
+    tarkov_items = await tarkov_item_dao.get_tarkov_items_by_names([name])
+    snapshot = PriceSnapshot(tmp_path)
+    deleted = SnapshotItem(id=SNAPSHOT_ONLY_ID, name="deleted", price=1, base_price=1)
+    item_id = tarkov_items[0].id
+    newer = SnapshotItem(id=item_id, name=name, price=20, base_price=5)
+    await snapshot.update([deleted, newer], RECORDED_AT)
+
+    await snapshot.reload(tarkov_item_dao)
+
+    assert snapshot.item(SNAPSHOT_ONLY_ID) is None
+    assert snapshot.item(newer.id) == newer
+
+
+@pytest.mark.anyio
+async def test_price_updates_snapshot(tmp_path: Path) -> None:
+    """Tests that applied price changes reach the snapshot."""
+    snapshot = PriceSnapshot(tmp_path)
+    price_updates = PriceUpdates(
+        TarkovItemCache(max_size=16, ttl=60),
+        ExchangeRates(),
+        queue_size=16,
+        price_snapshot=snapshot,
+    )
+
+    price_updates.apply([PriceChange(*EURO)], RECORDED_AT, generation="next")
+
+    # The snapshot is updated in the background.
+    assert snapshot.item(EURO.id) is None
+    await asyncio.wait_for(_wait_for_generation(snapshot, "next"), timeout=5)
+    assert snapshot.item(EURO.id) == EURO
+
+
+@pytest.mark.anyio
+async def test_items_served_from_snapshot(
+    tmp_path: Path,
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests that items in the snapshot are read without the database."""
+    snapshot = PriceSnapshot(tmp_path)
+    only_snapshot = SnapshotItem(
+        id=SNAPSHOT_ONLY_ID,
+        name=uuid.uuid4().hex,
+        price=1,
+        base_price=1,
+    )
+    await snapshot.update([only_snapshot], RECORDED_AT)
+    fastapi_app.dependency_overrides[get_price_snapshot] = lambda: snapshot
+    name = uuid.uuid4().hex
+    await TarkovItemDAO(dbsession).bulk_upsert(
+        [{"name": name, "price": 10, "base_price": 5}],
+    )
+
+    item_url = fastapi_app.url_path_for(
+        "get_tarkov_item_model_by_id",
+        tarkov_item_id=SNAPSHOT_ONLY_ID,
+    )
+    response = await client.get(item_url)
+    batch_response = await client.post(
+        fastapi_app.url_path_for("post_tarkov_item_batch"),
+        json={"ids": [SNAPSHOT_ONLY_ID], "names": [name]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == only_snapshot._asdict()  # noqa: WPS437
+    batch = batch_response.json()
+    assert batch["ids"][str(SNAPSHOT_ONLY_ID)]["name"] == only_snapshot.name
+    assert batch["names"][name]["price"] == 10
+
+
+async def _wait_for_generation(snapshot: PriceSnapshot, generation: str) -> None:
+    while snapshot.info()["generation"] != generation:
+        await asyncio.sleep(0.01)
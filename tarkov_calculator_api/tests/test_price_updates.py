@@ -0,0 +1,158 @@
+import asyncio
+from contextlib import suppress
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+import asyncpg
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from tarkov_calculator_api.calculator.rates import Currency, ExchangeRates
+from tarkov_calculator_api.services.cache import TarkovItemCache
+from tarkov_calculator_api.services.price_updates import PriceChange, PriceUpdates
+from tarkov_calculator_api.services.shared_cache import MemorySharedCache, SharedCache
+from tarkov_calculator_api.settings import settings
+from tarkov_calculator_api.web.api.prices.views import KEEPALIVE_EVENT, price_events
+
+UPDATED_AT = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+
+def _new_worker(
+    queue_size: int = 16,
+    shared: Optional[SharedCache] = None,
+) -> PriceUpdates:
+    return PriceUpdates(
+        TarkovItemCache(max_size=16, ttl=60, shared=shared),
+        ExchangeRates(),
+        queue_size=queue_size,
+    )
+
+
+def test_apply_changes(price_updates: PriceUpdates) -> None:
+    """Tests that changes reach the cache, exchange rates and subscribers."""
+    subscription = price_updates.subscribe()
+    cache_version = price_updates.tarkov_item_cache.version
+
+    price_updates.apply([PriceChange(1, "euro", 150, 120)], UPDATED_AT)
+
+    assert price_updates.tarkov_item_cache.version == cache_version + 1
+    rate_table = price_updates.exchange_rates.table
+    assert rate_table is not None
+    assert rate_table.rate(Currency.EURO, Currency.ROUBLE) == 150
+    event = subscription.get_nowait()
+    assert event is not None
+    assert event["items"] == [
+        {"id": 1, "name": "euro", "price": 150, "base_price": 120},
+    ]
+
+
+def test_slow_subscriber_is_dropped() -> None:
+    """Tests that a subscriber that doesn't read is dropped, not buffered."""
+    price_updates = _new_worker(queue_size=2)
+    slow = price_updates.subscribe()
+
+    for price in range(3):
+        price_updates.apply([PriceChange(1, "euro", price, price)], UPDATED_AT)
+
+    assert slow.closed
+    assert price_updates.subscribers == 0
+    assert slow.get_nowait() is None
+
+
+@pytest.mark.anyio
+async def test_warmup_after_changes(
+    tarkov_item_cache: TarkovItemCache,
+    exchange_rates: ExchangeRates,
+) -> None:
+    """Tests that the cache is warmed up after prices change."""
+    warmed_up = asyncio.Event()
+
+    async def warmup() -> None:  # noqa: WPS430
+        warmed_up.set()
+
+    price_updates = PriceUpdates(
+        tarkov_item_cache,
+        exchange_rates,
+        queue_size=1,
+        warmup=warmup,
+    )
+    price_updates.apply([PriceChange(1, "euro", 150, 120)], UPDATED_AT)
+    await asyncio.wait_for(warmed_up.wait(), timeout=1)
+
+
+@pytest.mark.anyio
+async def test_price_events(price_updates: PriceUpdates) -> None:
+    """Tests the server-sent event stream."""
+    events = price_events(price_updates, keepalive=0.01)
+    keepalive = await events.__anext__()  # noqa: WPS609
+    assert keepalive == KEEPALIVE_EVENT
+    assert price_updates.subscribers == 1
+
+    price_updates.apply([PriceChange(1, "euro", 150, 120)], UPDATED_AT)
+    event = await events.__anext__()  # noqa: WPS609
+    assert event.startswith("event: prices\ndata: ")
+    assert '"price":150' in event
+
+    await events.aclose()
+    assert price_updates.subscribers == 0
+
+
+@pytest.mark.anyio
+async def test_notifications_across_workers(_engine: AsyncEngine) -> None:
+    """Tests that other workers apply changes published by a refresh."""
+    shared = MemorySharedCache()
+    publisher = _new_worker(shared=shared)
+    listener = _new_worker(shared=shared)
+    subscription = listener.subscribe()
+    listen_task = asyncio.create_task(
+        listener.listen(str(settings.db_url.with_scheme("postgresql")), 0.1),
+    )
+    # Enough items to be split into several notifications.
+    name = "x" * 100
+    changes = [PriceChange(index, name, index, index) for index in range(200)]
+    try:
+        await asyncio.wait_for(listener.listening.wait(), timeout=5)
+        listener.tarkov_item_cache.set("item", "stale")
+        async with AsyncSession(_engine) as session:
+            await publisher.publish(session, changes, UPDATED_AT)
+
+        received: List[Dict[str, Any]] = []
+        while len(received) < len(changes):
+            event = await asyncio.wait_for(subscription.get(), timeout=5)
+            assert event is not None
+            received.extend(event["items"])
+    finally:
+        listen_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await listen_task
+
+    received_ids = [item["id"] for item in received]
+    assert received_ids == list(range(200))
+    assert listener.tarkov_item_cache.get("item") is None
+    generation = publisher.tarkov_item_cache.generation
+    assert listener.tarkov_item_cache.generation == generation
+    late_worker = _new_worker(shared=shared)
+    await late_worker.tarkov_item_cache.sync_generation()
+    assert late_worker.tarkov_item_cache.generation == generation
+
+
+@pytest.mark.anyio
+async def test_listener_reconnects(price_updates: PriceUpdates) -> None:
+    """Tests that the listener keeps reconnecting after interface errors."""
+    attempts: List[str] = []
+
+    async def connect(dsn: str) -> None:  # noqa: WPS430
+        attempts.append(dsn)
+        raise asyncpg.InterfaceError("connection is closed")
+
+    with patch("asyncpg.connect", connect):
+        listen_task = asyncio.create_task(price_updates.listen("postgresql://", 0))
+        try:
+            while len(attempts) < 3:
+                assert not listen_task.done()
+                await asyncio.sleep(0)
+        finally:
+            listen_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await listen_task
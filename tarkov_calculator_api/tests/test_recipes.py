@@ -0,0 +1,147 @@
+import uuid
+from pathlib import Path
+from typing import List
+
+import pytest
+import ujson
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tarkov_calculator_api.calculator.recipes import (
+    SECONDS_PER_HOUR,
+    Recipe,
+    RecipeItems,
+    RecipeKind,
+    RecipeMetric,
+    RecipeProfits,
+    get_recipe_profits,
+    load_recipes,
+)
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.services.price_updates import PriceChange
+
+
+def _recipe(name: str, kind: RecipeKind, hours: int, *items: RecipeItems) -> Recipe:
+    inputs, outputs = items
+    return Recipe(name, kind, hours * SECONDS_PER_HOUR, inputs, outputs)
+
+
+RIFLE_INPUTS = (("bolts", 2), ("wires", 1))
+RECIPES = (
+    _recipe("bolts", RecipeKind.CRAFT, 2, (("screw", 4),), (("bolts", 1),)),
+    _recipe("wires", RecipeKind.CRAFT, 1, (("cable", 1),), (("wires", 2),)),
+    _recipe("rifle", RecipeKind.BARTER, 0, RIFLE_INPUTS, (("rifle", 1),)),
+    _recipe("gold", RecipeKind.BARTER, 0, (("rifle", 1),), (("chain", 1),)),
+)
+PRICES = {"screw": 100, "bolts": 1000, "cable": 500, "wires": 450, "rifle": 3000}
+
+
+def _names(recipe_profits: RecipeProfits, *args: object) -> List[str]:
+    return [recipe.recipe.name for recipe in recipe_profits.top(10, *args)]  # type: ignore
+
+
+def test_recipe_profits() -> None:
+    """Tests metrics and rankings of recipes."""
+    recipe_profits = RecipeProfits(RECIPES)
+    recipe_profits.set_prices(PRICES)
+
+    bolts = recipe_profits.profit(0)
+    assert (bolts.cost, bolts.revenue, bolts.profit) == (400, 1000, 600)
+    assert bolts.profit_per_hour == 300
+    assert bolts.roi == pytest.approx(1.5)
+    rifle = recipe_profits.profit(2)
+    assert rifle.profit == 550
+    assert rifle.profit_per_hour is None
+
+    assert _names(recipe_profits) == ["bolts", "rifle", "wires"]
+    assert _names(recipe_profits, RecipeMetric.PROFIT_PER_HOUR) == ["wires", "bolts"]
+    assert _names(recipe_profits, RecipeMetric.ROI) == ["bolts", "wires", "rifle"]
+    barters = _names(recipe_profits, RecipeMetric.PROFIT, RecipeKind.BARTER)
+    assert barters == ["rifle"]
+    assert [recipe.recipe.name for recipe in recipe_profits.top(1)] == ["bolts"]
+
+
+def test_recipe_profits_update() -> None:
+    """Tests that updates give the same profits as recomputing everything."""
+    recipe_profits = RecipeProfits(RECIPES)
+    recipe_profits.set_prices(PRICES)
+
+    recipe_profits.update(
+        [
+            PriceChange(1, "bolts", 1500, 1),
+            PriceChange(2, "chain", 5000, 1),
+            PriceChange(3, "rifle", 0, 1),
+            PriceChange(4, "unknown", 1, 1),
+        ],
+    )
+
+    expected = RecipeProfits(RECIPES)
+    expected.set_prices({**PRICES, "bolts": 1500, "chain": 5000, "rifle": 0})
+    for index, _ in enumerate(RECIPES):
+        assert recipe_profits.profit(index) == expected.profit(index)
+    assert _names(recipe_profits) == _names(expected) == ["bolts", "wires"]
+
+    recipe_profits.update([PriceChange(3, "rifle", 9000, 1)])
+
+    assert _names(recipe_profits) == ["rifle", "bolts", "wires", "gold"]
+
+
+def test_load_recipes(tmp_path: Path) -> None:
+    """Tests loading recipes and rejecting malformed ones."""
+    path = tmp_path / "recipes.json"
+    raw_recipe = {
+        "name": "bolts",
+        "kind": "craft",
+        "duration": 7200,
+        "inputs": [{"item": "screw", "count": 4}],
+        "outputs": [{"item": "bolts"}],
+    }
+    path.write_text(ujson.dumps([raw_recipe]))
+
+    assert load_recipes(path) == [RECIPES[0]]
+
+    path.write_text(ujson.dumps([raw_recipe, {**raw_recipe, "outputs": []}]))
+    with pytest.raises(ValueError, match="recipe 1"):
+        load_recipes(path)
+    no_inputs = [{"item": "screw", "count": 0}]
+    path.write_text(ujson.dumps([{**raw_recipe, "inputs": no_inputs}]))
+    with pytest.raises(ValueError, match="recipe 0"):
+        load_recipes(path)
+
+
+@pytest.mark.anyio
+async def test_top_recipes(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests ranking recipes with prices from the database."""
+    prefix = uuid.uuid4().hex
+    input_name = "{0} input".format(prefix)
+    output_name = "{0} output".format(prefix)
+    inputs = ((input_name, 2),)
+    recipe = _recipe(prefix, RecipeKind.CRAFT, 1, inputs, ((output_name, 1),))
+    await TarkovItemDAO(dbsession).bulk_upsert(
+        [
+            {"name": input_name, "price": 100, "base_price": 1},
+            {"name": output_name, "price": 500, "base_price": 1},
+        ],
+    )
+    recipe_profits = RecipeProfits([recipe])
+    await recipe_profits.reload(TarkovItemDAO(dbsession))
+    fastapi_app.dependency_overrides[get_recipe_profits] = lambda: recipe_profits
+    url = fastapi_app.url_path_for("get_top_recipes")
+
+    response = await client.get(url, params={"sort_by": "roi"})
+
+    assert response.status_code == status.HTTP_200_OK
+    recipes = response.json()
+    assert [recipe["name"] for recipe in recipes] == [prefix]
+    assert recipes[0]["profit"] == 300
+    assert recipes[0]["roi"] == pytest.approx(1.5)
+    recipe_input = {"name": input_name, "count": 2, "price": 100}
+    assert recipes[0]["inputs"] == [recipe_input]
+    barters = await client.get(url, params={"kind": "barter"})
+    assert not barters.json()
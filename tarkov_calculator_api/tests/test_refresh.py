@@ -1,14 +1,29 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+import uuid
+from typing import Any, Dict, List
+from unittest.mock import patch
 
 import pytest
 from fastapi import FastAPI
-from httpx import AsyncClient
+from httpx import AsyncClient, MockTransport, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.db.dao.tarkov_item_price_dao import TarkovItemPriceDAO
+from tarkov_calculator_api.services.cache import TarkovItemCache
+from tarkov_calculator_api.services.fingerprints import UpstreamFingerprints
+from tarkov_calculator_api.services.price_updates import PriceUpdates
+from tarkov_calculator_api.services.refresh import (
+    refresh_market_data,
+    refresh_prices,
+    write_changes,
+)
+from tarkov_calculator_api.services.tarkov_market import (
+    TarkovMarketClient,
+    create_tarkov_market_client,
+)
 from tarkov_calculator_api.settings import settings
-from tarkov_calculator_api.web.api.refresh.views import refresh_dollar, refresh_euro
 
 
 @pytest.mark.anyio
@@ -38,16 +53,26 @@ async def test_refresh_request(
 
 
 @pytest.mark.anyio
-async def test_handle_refresh(dbsession: AsyncSession) -> None:
+async def test_handle_refresh(
+    dbsession: AsyncSession,
+    tarkov_item_cache: TarkovItemCache,
+    price_updates: PriceUpdates,
+    tarkov_market_client: TarkovMarketClient,
+    tarkov_market_items: Dict[str, Dict[str, Any]],
+) -> None:
     """Tests the handling of refresh requests.
 
     This test function creates two TarkovItem models in the database, one for "euro" and one for "dollar".
-    It then mocks the response from the Tarkov Market API and calls the `refresh_euro` and `refresh_dollar`
-    functions to update the prices of the items in the database. Finally, it asserts that the prices of the
-    items have been updated correctly.
+    It then mocks the response from the Tarkov Market API and calls `refresh_prices`
+    to update the prices of the items in the database. Finally, it asserts that the prices of the
+    items have been updated correctly and that the cache is only invalidated when they change.
 
     Args:
         dbsession (AsyncSession): The async database session.
+        tarkov_item_cache (TarkovItemCache): The tarkov item cache.
+        price_updates (PriceUpdates): The price updates hub.
+        tarkov_market_client (TarkovMarketClient): The mocked Tarkov Market API client.
+        tarkov_market_items (dict): The items served by the mocked Tarkov Market API.
 
     Returns:
         None
@@ -55,61 +80,231 @@ async def test_handle_refresh(dbsession: AsyncSession) -> None:
     dao = TarkovItemDAO(dbsession)
 
     await dao.create_tarkov_item_model("euro", 25, 50)
-    euro = await dao.get_tarkov_item_by_id(1)
-    assert euro is not None
-    assert euro.price == 25
+    await dao.create_tarkov_item_model("dollar", 75, 100)
+
+    tarkov_market_items["euro"] = {"name": "Euro", "price": 100, "basePrice": 50}
+    tarkov_market_items["dollar"] = {"name": "Dollar", "price": 120, "basePrice": 60}
+    cache_version = tarkov_item_cache.version
+
+    await refresh_prices(
+        dao,
+        TarkovItemPriceDAO(dbsession),
+        tarkov_market_client,
+        price_updates,
+    )
+
+    euro = (await dao.filter(name="euro"))[0]
+    assert euro.price == 100
     assert euro.base_price == 50
 
-    await dao.create_tarkov_item_model("dollar", 75, 100)
-    dollar = await dao.get_tarkov_item_by_id(2)
-    assert dollar is not None
-    assert dollar.price == 75
-    assert dollar.base_price == 100
-
-    # Mock the response from the Tarkov Market API
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = [
-        {
-            "name": "Euro",
-            "price": 100,
-            "basePrice": 50,
-        },
-    ]
-
-    with patch("requests.get", return_value=mock_response) as mock_get_dollar:
-        # Call the refresh_euro function
-        await refresh_euro(dao)
-        # Assert that the requests.get method is called with the correct URL
-        mock_get_dollar.assert_called_once_with(
-            f"https://api.tarkov-market.app/api/v1/item?q={euro.name}&x-api-key={settings.tarkov_market_api_key}",
-        )
+    dollar = (await dao.filter(name="dollar"))[0]
+    assert dollar.price == 120
+    assert dollar.base_price == 60
+
+    assert tarkov_item_cache.version == cache_version + 1
+
+    # Nothing changed upstream, so cached reads stay valid.
+    await refresh_prices(
+        dao,
+        TarkovItemPriceDAO(dbsession),
+        tarkov_market_client,
+        price_updates,
+    )
+    assert tarkov_item_cache.version == cache_version + 1
+
+
+@pytest.mark.anyio
+async def test_refresh_fetches_concurrently(
+    dbsession: AsyncSession,
+    price_updates: PriceUpdates,
+) -> None:
+    """Tests that euro and dollar quotes are requested at the same time.
+
+    The mocked upstream only answers once both requests are in flight,
+    so a sequential refresh would time out.
+
+    Args:
+        dbsession (AsyncSession): The async database session.
+        price_updates (PriceUpdates): The price updates hub.
+
+    Returns:
+        None
+    """
+    queries = []
+    both_requested = asyncio.Event()
+
+    async def handler(request: Request) -> Response:  # noqa: WPS430
+        queries.append(request.url.params["q"])
+        assert request.headers["x-api-key"] == settings.tarkov_market_api_key
+        if len(queries) == 2:
+            both_requested.set()
+        await asyncio.wait_for(both_requested.wait(), timeout=1)
+        return Response(200, json=[])
 
-    item = await dao.get_tarkov_item_by_id(1)
-    assert item is not None
-    assert item.price == 100
-    assert item.base_price == 50
-
-    # Mock the response from the Tarkov Market API
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = [
-        {
-            "name": "Euro",
-            "price": 100,
-            "basePrice": 50,
-        },
-    ]
-
-    with patch("requests.get", return_value=mock_response) as mock_get_euro:
-        # Call the refresh_euro function
-        await refresh_dollar(dao)
-        # Assert that the requests.get method is called with the correct URL
-        mock_get_euro.assert_called_once_with(
-            f"https://api.tarkov-market.app/api/v1/item?q={dollar.name}&x-api-key={settings.tarkov_market_api_key}",
+    market_client = create_tarkov_market_client(
+        transport=MockTransport(handler),  # type: ignore[arg-type]
+    )
+    try:
+        await refresh_prices(
+            TarkovItemDAO(dbsession),
+            TarkovItemPriceDAO(dbsession),
+            market_client,
+            price_updates,
         )
+    finally:
+        await market_client.close()
+
+    assert sorted(queries) == ["dollar", "euro"]
+
+
+@pytest.mark.anyio
+async def test_refresh_unchanged_items(
+    dbsession: AsyncSession,
+    price_updates: PriceUpdates,
+    upstream_fingerprints: UpstreamFingerprints,
+) -> None:
+    """Tests that unchanged quotes are requested conditionally and not written.
+
+    The mocked upstream tags quotes with an ETag and answers
+    304 Not Modified once it's sent back.
+
+    Args:
+        dbsession (AsyncSession): The async database session.
+        price_updates (PriceUpdates): The price updates hub.
+        upstream_fingerprints (UpstreamFingerprints): The prices last written.
+
+    Returns:
+        None
+    """
+    not_modified = []
+
+    def handler(request: Request) -> Response:  # noqa: WPS430
+        if request.headers.get("if-none-match") == '"v1"':
+            not_modified.append(request.url.params["q"])
+            return Response(304)
+        item = {"name": request.url.params["q"], "price": 10, "basePrice": 5}
+        return Response(200, json=[item], headers={"etag": '"v1"'})
+
+    market_client = create_tarkov_market_client(transport=MockTransport(handler))
+    reports = []
+    try:
+        for _ in range(2):
+            report = await refresh_prices(
+                TarkovItemDAO(dbsession),
+                TarkovItemPriceDAO(dbsession),
+                market_client,
+                price_updates,
+                upstream_fingerprints,
+            )
+            reports.append((report.changed, report.unchanged, report.failed))
+    finally:
+        await market_client.close()
+
+    assert reports[1] == (0, 2, 0)
+    assert sorted(not_modified) == ["dollar", "euro"]
+
+
+@pytest.mark.anyio
+async def test_refresh_invalid_quotes(
+    dbsession: AsyncSession,
+    price_updates: PriceUpdates,
+    tarkov_market_client: TarkovMarketClient,
+    tarkov_market_items: Dict[str, Dict[str, Any]],
+) -> None:
+    """Tests that malformed quotes are skipped instead of failing the refresh.
+
+    Args:
+        dbsession (AsyncSession): The async database session.
+        price_updates (PriceUpdates): The price updates hub.
+        tarkov_market_client (TarkovMarketClient): The mocked Tarkov Market API client.
+        tarkov_market_items (dict): The items served by the mocked Tarkov Market API.
+
+    Returns:
+        None
+    """
+    dao = TarkovItemDAO(dbsession)
+    tarkov_market_items["euro"] = {"name": "Euro", "price": 100}
+    tarkov_market_items["dollar"] = {"name": "Dollar", "price": 120, "basePrice": 60}
+
+    report = await refresh_prices(
+        dao,
+        TarkovItemPriceDAO(dbsession),
+        tarkov_market_client,
+        price_updates,
+    )
+
+    assert (report.changed, report.failed) == (1, 1)
+    assert not await dao.filter(name="euro")
+    assert (await dao.filter(name="dollar"))[0].price == 120
+
+
+@pytest.mark.anyio
+async def test_get_item_invalid_response() -> None:
+    """Tests that a body that isn't JSON is reported as missing data.
+
+    Returns:
+        None
+    """
+    market_client = create_tarkov_market_client(
+        transport=MockTransport(lambda request: Response(200, text="<html>")),
+    )
+    try:
+        assert await market_client.get_item("euro") is None
+    finally:
+        await market_client.close()
+
+
+@pytest.mark.anyio
+async def test_unchanged_refresh_writes_nothing(
+    dbsession: AsyncSession,
+    price_updates: PriceUpdates,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests that fingerprints of a new worker skip writes of unchanged prices.
+
+    The same catalogue and quotes are served twice, only the first
+    refresh writes them.
+
+    Args:
+        dbsession (AsyncSession): The async database session.
+        price_updates (PriceUpdates): The price updates hub.
+        monkeypatch (MonkeyPatch): The fixture to change settings with.
+
+    Returns:
+        None
+    """
+    catalogue = [{"name": uuid.uuid4().hex, "price": 1, "basePrice": 1}]
+
+    def handler(request: Request) -> Response:  # noqa: WPS430
+        if request.url.path.endswith("/items/all"):
+            return Response(200, json=catalogue)
+        item = {"name": request.url.params["q"], "price": 10, "basePrice": 5}
+        return Response(200, json=[item])
+
+    monkeypatch.setattr(settings, "refresh_full_catalogue", value=True)
+    fingerprints = UpstreamFingerprints()
+    market_client = create_tarkov_market_client(transport=MockTransport(handler))
+    writes: List[int] = []
+
+    async def counted_write_changes(*args: Any) -> Any:  # noqa: WPS430
+        writes.append(len(args[2]))
+        return await write_changes(*args)
+
+    try:
+        with patch(
+            "tarkov_calculator_api.services.refresh.write_changes",
+            counted_write_changes,
+        ):
+            for _ in range(2):
+                await refresh_market_data(
+                    TarkovItemDAO(dbsession),
+                    TarkovItemPriceDAO(dbsession),
+                    market_client,
+                    price_updates,
+                    fingerprints,
+                )
+    finally:
+        await market_client.close()
 
-    item = await dao.get_tarkov_item_by_id(2)
-    assert item is not None
-    assert item.price == 100
-    assert item.base_price == 50
+    # The catalogue and the tracked items of the first refresh.
+    assert writes == [1, 2]
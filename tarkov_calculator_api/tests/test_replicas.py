@@ -0,0 +1,74 @@
+from typing import AsyncGenerator, List, cast
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import Pool
+
+from tarkov_calculator_api.db.replicas import ReplicaRouter
+from tarkov_calculator_api.settings import settings
+
+READ_OPTIONS = {"isolation_level": "AUTOCOMMIT"}
+# Nothing listens on this port, so connections are refused right away.
+UNREACHABLE_PORT = 1
+
+
+def _pool(router: ReplicaRouter) -> Pool:
+    return cast(AsyncEngine, router().bind).pool
+
+
+@pytest.fixture
+async def replicas(
+    _engine: AsyncEngine,
+) -> AsyncGenerator[List[AsyncEngine], None]:
+    """
+    Engines of two replicas, the second one is down.
+
+    :param _engine: engine that created the test database.
+    :yield: engines.
+    """
+    engines = [
+        create_async_engine(str(settings.db_url)),
+        create_async_engine(str(settings.db_url.with_port(UNREACHABLE_PORT))),
+    ]
+    try:
+        yield engines
+    finally:
+        for engine in engines:
+            await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_round_robin(_engine: AsyncEngine, replicas: List[AsyncEngine]) -> None:
+    """Tests that sessions are spread over replicas."""
+    router = ReplicaRouter(_engine, replicas, READ_OPTIONS)
+    router.healthy = [True, True]
+
+    pools = [_pool(router) for _ in range(4)]
+
+    first, second = (replica.pool for replica in replicas)
+    assert pools == [first, second, first, second]
+    assert cast(AsyncEngine, router.primary().bind).pool is _engine.pool
+
+
+@pytest.mark.anyio
+async def test_unhealthy_replicas(
+    _engine: AsyncEngine,
+    replicas: List[AsyncEngine],
+) -> None:
+    """Tests that unhealthy replicas are skipped, down to the primary."""
+    router = ReplicaRouter(_engine, replicas, READ_OPTIONS)
+
+    await router.check(timeout=5)
+
+    assert router.healthy == [True, False]
+    pools = {_pool(router) for _ in range(3)}
+    assert pools == {replicas[0].pool}
+    async with router() as session:
+        assert (await session.execute(text("SELECT 1"))).scalar() == 1
+    health = [info["healthy"] for info in router.info()]
+    assert health == [True, False]
+
+    router.healthy[0] = False
+
+    assert _pool(router) is _engine.pool
@@ -0,0 +1,99 @@
+import asyncio
+from contextlib import suppress
+from typing import Callable, Dict, List
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from tarkov_calculator_api.services.scheduler import (
+    RefreshScheduler,
+    seconds_until_next_run,
+)
+from tarkov_calculator_api.settings import settings
+
+# Separate lock, so tests don't compete with a running application.
+TEST_LOCK_ID = 7318245999
+
+
+async def _wait_for(condition: Callable[[], bool]) -> None:
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition was not met in time.")
+
+
+async def _stop(task: "asyncio.Task[None]") -> None:
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+def test_seconds_until_next_run() -> None:
+    """Tests that refreshes are scheduled within interval and jitter."""
+    for _ in range(100):
+        delay = seconds_until_next_run(60, 5)
+        assert 0 < delay <= 65
+
+
+@pytest.mark.anyio
+async def test_leader_election(_engine: AsyncEngine) -> None:
+    """Tests that only one scheduler refreshes and another one takes over."""
+    refreshes: Dict[str, int] = {"first": 0, "second": 0}
+
+    def new_scheduler(name: str) -> RefreshScheduler:  # noqa: WPS430
+        async def refresh() -> None:  # noqa: WPS430
+            refreshes[name] += 1
+
+        return RefreshScheduler(
+            str(settings.db_url.with_scheme("postgresql")),
+            refresh,
+            interval=0.05,
+            jitter=0,
+            election_interval=0.05,
+            lock_id=TEST_LOCK_ID,
+        )
+
+    first = new_scheduler("first")
+    second = new_scheduler("second")
+    first_task = asyncio.create_task(first.run())
+    await _wait_for(lambda: first.is_leader)
+    second_task = asyncio.create_task(second.run())
+    try:
+        await _wait_for(lambda: refreshes["first"] >= 3)
+        assert not second.is_leader
+        assert not refreshes["second"]
+
+        # Leader goes away, its lock is released with the connection.
+        await _stop(first_task)
+        await _wait_for(lambda: second.is_leader)
+        await _wait_for(lambda: refreshes["second"] >= 1)
+    finally:
+        await _stop(first_task)
+        await _stop(second_task)
+
+
+@pytest.mark.anyio
+async def test_failed_refresh(_engine: AsyncEngine) -> None:
+    """Tests that the scheduler keeps refreshing after a refresh fails."""
+    refreshes: List[int] = []
+
+    async def refresh() -> None:  # noqa: WPS430
+        refreshes.append(len(refreshes))
+        if len(refreshes) == 1:
+            raise KeyError("price")
+
+    scheduler = RefreshScheduler(
+        str(settings.db_url.with_scheme("postgresql")),
+        refresh,
+        interval=0.05,
+        jitter=0,
+        election_interval=0.05,
+        lock_id=TEST_LOCK_ID,
+    )
+    task = asyncio.create_task(scheduler.run())
+    try:
+        await _wait_for(lambda: len(refreshes) >= 2)
+        assert scheduler.is_leader
+    finally:
+        await _stop(task)
@@ -0,0 +1,97 @@
+import uuid
+from typing import Any, List
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.services.price_updates import PriceChange
+from tarkov_calculator_api.services.search import SearchIndex
+
+
+def _ids(tarkov_items: List[Any]) -> List[int]:
+    return [tarkov_item.id for tarkov_item in tarkov_items]
+
+
+def test_search_index() -> None:
+    """Tests prefix matching of words and ranking."""
+    index = SearchIndex()
+    index.replace(
+        [
+            PriceChange(1, "AK-74N 5.45x39 assault rifle", 1, 1),
+            PriceChange(2, "AKM 7.62x39 assault rifle", 1, 1),
+            PriceChange(3, "Pack of sugar", 1, 1),
+            PriceChange(4, "Ak", 1, 1),
+        ],
+    )
+
+    assert _ids(index.search("ak", 10)) == [4, 2, 1]
+    assert _ids(index.search(" RIFLE", 1)) == [2]
+    assert _ids(index.search("45", 10)) == [1]
+    assert not index.search("ifle", 10)
+    assert not index.search("  ", 10)
+
+    index.update([PriceChange(3, "Pack of sugar", 100, 1)])
+    assert index.search("sugar", 10)[0].price == 100
+    index.update([PriceChange(3, "Sugar pack", 100, 1)])
+    assert _ids(index.search("pack", 10)) == [3]
+
+
+@pytest.mark.anyio
+async def test_search_endpoint(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    search_index: SearchIndex,
+) -> None:
+    """Tests that autocomplete is answered from the worker's index."""
+    prefix = uuid.uuid4().hex
+    dao = TarkovItemDAO(dbsession)
+    await dao.bulk_upsert(
+        [
+            {"name": f"{prefix} long", "price": 1, "base_price": 1},
+            {"name": prefix, "price": 2, "base_price": 2},
+        ],
+    )
+    search_index.replace(await dao.get_tarkov_item_rows())
+
+    url = fastapi_app.url_path_for("search_tarkov_items")
+    query = prefix[:8].upper()
+    response = await client.get(url, params={"q": query, "limit": 2})
+
+    assert response.status_code == status.HTTP_200_OK
+    names = [tarkov_item["name"] for tarkov_item in response.json()]
+    assert names == [prefix, f"{prefix} long"]
+    empty_response = await client.get(url, params={"q": ""})
+    assert empty_response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.anyio
+async def test_search_tarkov_items(dbsession: AsyncSession) -> None:
+    """Tests substring and fuzzy search in the database."""
+    available = await dbsession.scalar(
+        select(func.count())
+        .select_from(text("pg_available_extensions"))
+        .where(text("name = 'pg_trgm'")),
+    )
+    if not available:
+        pytest.skip("pg_trgm extension is not available")
+    await dbsession.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    word = uuid.uuid4().hex
+    dao = TarkovItemDAO(dbsession)
+    await dao.bulk_upsert(
+        [
+            {"name": f"Bottle of {word} water", "price": 1, "base_price": 1},
+            {"name": f"{word} water", "price": 1, "base_price": 1},
+        ],
+    )
+
+    name = f"{word} water"
+    found = await dao.search_tarkov_items(word[4:20], 10)
+    assert [tarkov_item.name for tarkov_item in found] == [name, f"Bottle of {name}"]
+    misspelled = await dao.search_tarkov_items(f"{word}x water", 1)
+    assert misspelled[0].name == name
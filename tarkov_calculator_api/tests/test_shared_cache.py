@@ -0,0 +1,203 @@
+import uuid
+from typing import Optional
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.services.cache import (
+    SharedCodec,
+    TarkovItemCache,
+    get_tarkov_item_cache,
+)
+from tarkov_calculator_api.services.shared_cache import (
+    MemorySharedCache,
+    RedisSharedCache,
+    SharedCache,
+    SharedCacheError,
+)
+from tarkov_calculator_api.web.api.tarkov_item.snapshots import ITEM_CODEC
+
+CODEC = SharedCodec(encode=str.encode, decode=bytes.decode)
+# Redis of the docker-compose setup, tests using it are skipped without it.
+REDIS_URL = "redis://localhost:6379/0"
+
+
+class Loader:
+    """Counts loads of a value."""
+
+    def __init__(self, value: str) -> None:
+        self.value = value
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        """
+        Load the value.
+
+        :return: value.
+        """
+        self.calls += 1
+        return self.value
+
+
+class WriteOnlySharedCache(SharedCache):
+    """Shared cache missing ``get``."""
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        """
+        Drop the value.
+
+        :param key: key without the prefix.
+        :param value: encoded value.
+        :param ttl: seconds the value is kept for.
+        """
+
+
+class BrokenSharedCache(SharedCache):
+    """Shared cache that can't be reached."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """
+        Fail to get the key.
+
+        :raises SharedCacheError: always.
+        """
+        raise SharedCacheError("Connection refused")
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        """
+        Fail to set the key.
+
+        :raises SharedCacheError: always.
+        """
+        raise SharedCacheError("Connection refused")
+
+
+def _worker(shared: SharedCache) -> TarkovItemCache:
+    return TarkovItemCache(max_size=16, ttl=60, shared=shared)
+
+
+def test_incomplete_shared_cache() -> None:
+    """Tests that a shared cache missing a method can't be created."""
+    with pytest.raises(TypeError):
+        WriteOnlySharedCache("test")  # type: ignore[abstract]
+
+
+@pytest.mark.anyio
+async def test_two_level_cache() -> None:
+    """Tests that workers load values once for all of them."""
+    shared = MemorySharedCache()
+    first, second = _worker(shared), _worker(shared)
+    loader = Loader("price")
+
+    await first.get_or_load("key", loader, CODEC)
+    # Entries of other workers are skipped until the generation is synced.
+    await second.get_or_load("key", loader, CODEC)
+    await first.share_generation()
+    await second.sync_generation()
+    second.set("key", "outdated", version=second.version - 1)
+
+    assert await second.get_or_load("other", loader, CODEC) == "price"
+    assert loader.calls == 3
+    second.invalidate()
+    await second.sync_generation()
+    assert await second.get_or_load("key", Loader("reloaded"), CODEC) == "price"
+    assert second.stats.shared_hits == 1
+
+
+@pytest.mark.anyio
+async def test_shared_invalidation() -> None:
+    """Tests that workers invalidated together reload values once."""
+    shared = MemorySharedCache()
+    first, second = _worker(shared), _worker(shared)
+    loader = Loader("price")
+    await first.get_or_load("key", loader, CODEC)
+
+    first.invalidate("next")
+    second.invalidate("next")
+    assert await first.get_or_load("key", Loader("new price"), CODEC) == "new price"
+    assert await second.get_or_load("key", loader, CODEC) == "new price"
+    assert await second.get_or_load("uncoded", Loader("local")) == "local"
+    assert loader.calls == 1
+    assert len(shared) == 2
+
+
+@pytest.mark.anyio
+async def test_stale_loads_not_shared() -> None:
+    """Tests that values loaded before an invalidation aren't shared."""
+    shared = MemorySharedCache()
+    cache = _worker(shared)
+
+    async def load() -> str:  # noqa: WPS430
+        cache.invalidate()
+        return "outdated"
+
+    await cache.get_or_load("key", load, CODEC)
+
+    assert not len(shared)
+
+
+@pytest.mark.anyio
+async def test_broken_shared_cache() -> None:
+    """Tests that reads go on without the shared cache."""
+    cache = _worker(BrokenSharedCache("test"))
+    loader = Loader("price")
+
+    assert await cache.get_or_load("key", loader, CODEC) == "price"
+    await cache.share_generation()
+    await cache.sync_generation()
+
+    assert cache.get("key") == "price"
+    assert cache.stats.shared_errors == 4
+
+
+@pytest.mark.anyio
+async def test_redis_shared_cache() -> None:
+    """Tests storing values in Redis."""
+    shared = RedisSharedCache(REDIS_URL, uuid.uuid4().hex, timeout=1)
+    try:
+        await shared.get("key")
+    except SharedCacheError:
+        await shared.close()
+        pytest.skip("Redis is not available")
+    try:
+        await shared.set("key", b"value", ttl=60)
+        assert await shared.get("key") == b"value"
+        assert await shared.get("missing") is None
+    finally:
+        await shared.close()
+
+
+@pytest.mark.anyio
+async def test_item_shared_by_workers(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests that items read by one worker are served to others."""
+    shared = MemorySharedCache()
+    worker = _worker(shared)
+    other_worker = _worker(shared)
+    other_worker.generation = worker.generation
+    fastapi_app.dependency_overrides[get_tarkov_item_cache] = lambda: worker
+    name = uuid.uuid4().hex
+    await TarkovItemDAO(dbsession).bulk_upsert(
+        [{"name": name, "price": 1, "base_price": 1}],
+    )
+    tarkov_items = await TarkovItemDAO(dbsession).get_tarkov_items_by_names([name])
+    tarkov_item = tarkov_items[0]
+    url = fastapi_app.url_path_for(
+        "get_tarkov_item_model_by_id",
+        tarkov_item_id=tarkov_item.id,
+    )
+
+    response = await client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    cache_key = ("item", tarkov_item.id)
+    encoded = await other_worker.get_or_load(cache_key, Loader("unused"), ITEM_CODEC)
+    assert encoded.body == response.content
+    assert encoded.content.name == name
@@ -0,0 +1,44 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from tarkov_calculator_api.gunicorn_runner import GunicornApplication
+
+APP_FACTORY = "tarkov_calculator_api.web.application:get_app"
+
+
+def test_preloaded_app() -> None:
+    """Tests that a preloaded app is built once and shared by workers."""
+    preloaded = GunicornApplication(
+        APP_FACTORY,
+        host="127.0.0.1",
+        port=0,
+        workers=1,
+        preload_app=True,
+    ).load()
+    lazy = GunicornApplication(APP_FACTORY, host="127.0.0.1", port=0, workers=1).load()
+
+    app = preloaded()
+
+    assert preloaded() is app
+    assert app.middleware_stack is not None
+    assert app.state.startup_report.preloaded
+    assert app.state.startup_report.app_import_seconds is not None
+    assert app.state.startup_report.build_seconds is not None
+    assert not lazy().state.startup_report.preloaded
+
+
+@pytest.mark.anyio
+async def test_startup_report(fastapi_app: FastAPI, client: AsyncClient) -> None:
+    """Tests that the first request of the worker is timed."""
+    url = fastapi_app.url_path_for("startup_stats")
+
+    response = await client.get(url)
+    second_response = await client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["first_request_seconds"] is None
+    report = second_response.json()
+    assert report["first_request_seconds"] > 0
+    assert report["pid"] > 0
@@ -1,13 +1,25 @@
 import random
 import uuid
+from typing import Any, Dict
 
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from starlette import status
 
-from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.db.dao.tarkov_item_dao import (
+    TarkovItemDAO,
+    TarkovItemOrdering,
+)
+from tarkov_calculator_api.services.cache import TarkovItemCache
+from tarkov_calculator_api.settings import settings
+from tarkov_calculator_api.web.api.tarkov_item.conditional import (
+    seconds_until_next_refresh,
+    version_etag,
+)
+from tarkov_calculator_api.web.api.tarkov_item.snapshots import warm_pages
+from tarkov_calculator_api.web.api.tarkov_item.views import MAX_LIMIT
 
 
 @pytest.mark.anyio
@@ -89,3 +101,284 @@ async def test_getting_by_id(
     assert tarkov_item["name"] == created_item.name
     assert tarkov_item["price"] == created_item.price
     assert tarkov_item["base_price"] == created_item.base_price
+
+
+@pytest.mark.anyio
+async def test_cached_item_read(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    tarkov_item_cache: TarkovItemCache,
+) -> None:
+    """Second read is served from the cache until it is invalidated."""
+    dao = TarkovItemDAO(dbsession)
+    test_name = uuid.uuid4().hex
+    await dao.create_tarkov_item_model(name=test_name, price=10, base_price=20)
+    created_item = (await dao.filter(name=test_name))[0]
+    url = fastapi_app.url_path_for(
+        "get_tarkov_item_model_by_id",
+        tarkov_item_id=created_item.id,
+    )
+
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    await dao.update_tarkov_item(created_item.id, price=30)
+
+    response = await client.get(url)
+    assert response.json()["price"] == 10
+    assert tarkov_item_cache.stats.hits == 1
+
+    tarkov_item_cache.invalidate()
+    response = await client.get(url)
+    assert response.json()["price"] == 30
+
+    response = await client.get(fastapi_app.url_path_for("cache_stats"))
+    assert response.json()["hits"] == 1
+    assert response.json()["misses"] == 2
+
+
+@pytest.mark.anyio
+async def test_warm_pages(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    tarkov_item_cache: TarkovItemCache,
+) -> None:
+    """Warmed up first pages are served without loading them."""
+    dao = TarkovItemDAO(dbsession)
+    test_name = uuid.uuid4().hex
+    await dao.create_tarkov_item_model(name=test_name, price=10, base_price=20)
+    created_item = (await dao.filter(name=test_name))[0]
+
+    await warm_pages(async_sessionmaker(dbsession.bind), tarkov_item_cache)
+    await dao.update_tarkov_item(created_item.id, price=30)
+
+    url = fastapi_app.url_path_for("get_tarkov_item_models")
+    for order_by in TarkovItemOrdering:
+        response = await client.get(url, params={"order_by": order_by.value})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()[0]["price"] == 10
+    assert not tarkov_item_cache.stats.misses
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"limit": 0},
+        {"limit": -1},
+        {"limit": MAX_LIMIT + 1},
+        {"offset": -1},
+    ],
+)
+async def test_invalid_page(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    params: Dict[str, Any],
+) -> None:
+    """Tests that pages out of bounds are rejected before they're cached."""
+    url = fastapi_app.url_path_for("get_tarkov_item_models")
+
+    response = await client.get(url, params=params)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.anyio
+async def test_bulk_upsert(dbsession: AsyncSession) -> None:
+    """Tests inserting and updating many tarkov items at once."""
+    dao = TarkovItemDAO(dbsession)
+    first_name = uuid.uuid4().hex
+    second_name = uuid.uuid4().hex
+
+    written = await dao.bulk_upsert(
+        [
+            {"name": first_name, "price": 1, "base_price": 2},
+            {"name": second_name, "price": 3, "base_price": 4},
+        ],
+    )
+    assert len(written) == 2
+
+    written = await dao.bulk_upsert(
+        [
+            {"name": first_name, "price": 1, "base_price": 2},
+            {"name": second_name, "price": 5, "base_price": 4},
+            {"name": second_name, "price": 6, "base_price": 4},
+        ],
+    )
+    assert len(written) == 1
+    assert written[0].name == second_name
+    assert written[0].price == 6
+
+    first_item = (await dao.filter(name=first_name))[0]
+    assert first_item.price == 1
+    second_item = (await dao.filter(name=second_name))[0]
+    assert second_item.price == 6
+    assert not await dao.bulk_upsert([])
+
+
+@pytest.mark.anyio
+async def test_cursor_pagination(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests paging through tarkov items with cursors."""
+    dao = TarkovItemDAO(dbsession)
+    prices = [5, 3, 3, 9, 1]
+    await dao.bulk_upsert(
+        [
+            {"name": uuid.uuid4().hex, "price": price, "base_price": 1}
+            for price in prices
+        ],
+    )
+
+    url = fastapi_app.url_path_for("get_tarkov_item_models")
+    params: Dict[str, Any] = {"limit": 2, "order_by": "price"}
+    seen = []
+    while True:
+        response = await client.get(url, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+
+    seen_prices = [item["price"] for item in seen]
+    assert seen_prices == sorted(prices)
+    unique_ids = {item["id"] for item in seen}
+    assert len(unique_ids) == len(prices)
+
+
+@pytest.mark.anyio
+async def test_invalid_cursor(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests that malformed cursors are rejected."""
+    dao = TarkovItemDAO(dbsession)
+    await dao.bulk_upsert(
+        [
+            {"name": uuid.uuid4().hex, "price": price, "base_price": 1}
+            for price in range(2)
+        ],
+    )
+    url = fastapi_app.url_path_for("get_tarkov_item_models")
+
+    response = await client.get(url, params={"cursor": "not a cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = await client.get(url, params={"limit": 1, "order_by": "price"})
+    cursor = response.headers["X-Next-Cursor"]
+    response = await client.get(url, params={"cursor": cursor})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.anyio
+async def test_conditional_get(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    tarkov_item_cache: TarkovItemCache,
+) -> None:
+    """Tests that unchanged items are answered with 304 Not Modified."""
+    dao = TarkovItemDAO(dbsession)
+    test_name = uuid.uuid4().hex
+    await dao.bulk_upsert([{"name": test_name, "price": 10, "base_price": 20}])
+    url = fastapi_app.url_path_for("get_tarkov_item_models")
+
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["ETag"]
+    max_age = int(response.headers["Cache-Control"].split("max-age=")[1])
+    assert 0 < max_age <= settings.refresh_interval
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert not response.content
+
+    await dao.bulk_upsert([{"name": test_name, "price": 30, "base_price": 20}])
+    tarkov_item_cache.invalidate()
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+
+
+def test_max_age(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that responses run out once the delayed refresh is over."""
+    monkeypatch.setattr(settings, "refresh_interval", 600)
+    monkeypatch.setattr(settings, "refresh_jitter", 30)
+    monkeypatch.setattr(settings, "scheduler_enabled", value=True)
+
+    # Before the refresh is scheduled, after it's done and in between.
+    assert seconds_until_next_refresh(6000 - 100) == 130
+    assert seconds_until_next_refresh(6000 + 40) == 590
+    assert seconds_until_next_refresh(6000 + 10) == 20
+
+    monkeypatch.setattr(settings, "scheduler_enabled", value=False)
+    assert seconds_until_next_refresh(6000 + 10) == 590
+
+
+@pytest.mark.anyio
+async def test_conditional_get_skips_loading(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    tarkov_item_cache: TarkovItemCache,
+) -> None:
+    """Tests that requests for the current version are answered without a read."""
+    # Id far beyond the ones the database hands out.
+    tarkov_item_id = 10**9
+    url = fastapi_app.url_path_for(
+        "get_tarkov_item_model_by_id",
+        tarkov_item_id=tarkov_item_id,
+    )
+    etag = version_etag(tarkov_item_cache, ("item", tarkov_item_id))
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert not len(tarkov_item_cache)
+
+
+@pytest.mark.anyio
+async def test_batch_lookup(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests looking up many tarkov items by ids and names at once."""
+    dao = TarkovItemDAO(dbsession)
+    first_name = uuid.uuid4().hex
+    second_name = uuid.uuid4().hex
+    missing_name = uuid.uuid4().hex
+    await dao.create_tarkov_item_model(name=first_name, price=1, base_price=2)
+    await dao.create_tarkov_item_model(name=second_name, price=3, base_price=4)
+    first_id = (await dao.filter(name=first_name))[0].id
+    missing_id = first_id + 1000
+
+    url = fastapi_app.url_path_for("get_tarkov_item_batch")
+    get_response = await client.get(
+        url,
+        params={"ids": [first_id, missing_id], "names": [second_name, missing_name]},
+    )
+    post_response = await client.post(
+        fastapi_app.url_path_for("post_tarkov_item_batch"),
+        json={"ids": [first_id, missing_id], "names": [second_name, missing_name]},
+    )
+
+    for batch_response in (get_response, post_response):
+        assert batch_response.status_code == status.HTTP_200_OK
+        batch = batch_response.json()
+        assert batch["ids"][str(first_id)]["name"] == first_name
+        assert batch["ids"][str(missing_id)] is None
+        assert batch["names"][second_name]["price"] == 3
+        assert batch["names"][missing_name] is None
+
+    too_many = {"ids": list(range(1000))}
+    too_large_response = await client.get(url, params=too_many)
+    assert too_large_response.status_code == status.HTTP_400_BAD_REQUEST
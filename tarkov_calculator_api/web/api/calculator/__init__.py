@@ -0,0 +1,5 @@
+"""API for calculating profits of crafts and barters."""
+
+from tarkov_calculator_api.web.api.calculator.views import router
+
+__all__ = ["router"]
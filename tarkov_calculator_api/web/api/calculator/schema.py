@@ -0,0 +1,66 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from tarkov_calculator_api.calculator.recipes import RecipeKind
+
+
+class RecipeItemDTO(BaseModel):
+    """DTO for an input or output of a recipe."""
+
+    name: str
+    count: int
+    price: float
+
+
+class RecipeProfitDTO(BaseModel):
+    """
+    DTO for profitability of a recipe.
+
+    Profit per hour is missing for recipes that take no time,
+    ROI for recipes that cost nothing.
+    """
+
+    name: str
+    kind: RecipeKind
+    duration: float
+    inputs: List[RecipeItemDTO]
+    outputs: List[RecipeItemDTO]
+    cost: float
+    revenue: float
+    profit: float
+    profit_per_hour: Optional[float]
+    roi: Optional[float]
+
+
+class FleaFeeResultDTO(BaseModel):
+    """
+    DTO for fees of a batch of flea market listings.
+
+    Every list has an entry for each line of the request, in its order.
+    Best price is the listing price with the most profit after the fee,
+    but not above the current flea price of the item.
+    """
+
+    base_prices: List[int]
+    fees: List[int]
+    profits: List[int]
+    best_prices: List[int]
+    best_profits: List[int]
+
+
+# Body of flea fee requests, lines are parsed without pydantic
+# since validating thousands of models takes longer than the fees.
+FLEA_FEE_LINES_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "array",
+        "prefixItems": [
+            {"title": "Item", "type": "string"},
+            {"title": "Price", "type": "integer", "exclusiveMinimum": 0},
+            {"title": "Quantity", "type": "integer", "minimum": 1},
+        ],
+        "minItems": 3,
+        "maxItems": 3,
+    },
+}
@@ -0,0 +1,151 @@
+from typing import List, Optional
+
+import ujson
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
+
+from tarkov_calculator_api.calculator.flea import (
+    DEFAULT_TAX_INPUTS,
+    DEFAULT_TAX_REQUIREMENTS,
+    FleaTaxes,
+    ItemPrices,
+    UnknownItemsError,
+    get_item_prices,
+    parse_lines,
+)
+from tarkov_calculator_api.calculator.recipes import (
+    RecipeItems,
+    RecipeKind,
+    RecipeMetric,
+    RecipeProfit,
+    RecipeProfits,
+    get_recipe_profits,
+)
+from tarkov_calculator_api.web.api.calculator.schema import (
+    FLEA_FEE_LINES_SCHEMA,
+    FleaFeeResultDTO,
+    RecipeItemDTO,
+    RecipeProfitDTO,
+)
+
+router = APIRouter()
+
+# Most recipes a single ranking may return.
+MAX_RECIPES_LIMIT = 100
+# Most listings a single flea fee request may have.
+MAX_FLEA_FEE_LINES = 10000
+
+
+@router.get("/recipes", response_model=List[RecipeProfitDTO])
+async def get_top_recipes(
+    limit: int = Query(10, ge=1, le=MAX_RECIPES_LIMIT),
+    sort_by: RecipeMetric = RecipeMetric.PROFIT,
+    kind: Optional[RecipeKind] = None,
+    recipe_profits: RecipeProfits = Depends(get_recipe_profits),
+) -> List[RecipeProfitDTO]:
+    """
+    Rank crafts and barters by profitability at current prices.
+
+    Profits are kept in memory and updated on every refresh,
+    so rankings never touch the database. Recipes with an item
+    that has no price are left out.
+
+    :param limit: most recipes to return.
+    :param sort_by: metric to rank recipes by.
+    :param kind: only rank crafts or barters.
+    :param recipe_profits: recipe profits of the worker.
+    :return: recipes with the highest metric first.
+    """
+    return [
+        _recipe_profit_dto(recipe_profits, recipe_profit)
+        for recipe_profit in recipe_profits.top(limit, sort_by, kind)
+    ]
+
+
+@router.post(
+    "/flea_fee",
+    response_model=FleaFeeResultDTO,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": FLEA_FEE_LINES_SCHEMA}},
+        },
+    },
+)
+async def calculate_flea_fees(
+    request: Request,
+    tax_inputs: float = Query(DEFAULT_TAX_INPUTS, ge=0, le=1),
+    tax_requirements: float = Query(DEFAULT_TAX_REQUIREMENTS, gt=0, le=1),
+    fee_reduction: float = Query(0, ge=0, lt=1),
+    item_prices: ItemPrices = Depends(get_item_prices),
+) -> Response:
+    """
+    Calculate flea market fees of many listings at once.
+
+    The body is a list of item name, listing price of a single item
+    and quantity triples. Base prices come from the worker's snapshot
+    of items, and all fees are calculated in a single pass.
+
+    :param request: current request.
+    :param tax_inputs: tax rate of the item value.
+    :param tax_requirements: tax rate of the listing price.
+    :param fee_reduction: share of the fee taken off by the hideout.
+    :param item_prices: item prices of the worker.
+    :return: fees, profits and best listing prices.
+    :raises HTTPException: if lines are malformed or items unknown.
+    """
+    try:
+        lines = parse_lines(ujson.loads(await request.body()))
+    except ValueError as parse_error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(parse_error),
+        ) from parse_error
+    if len(lines.names) > MAX_FLEA_FEE_LINES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_FLEA_FEE_LINES} lines can be calculated",
+        )
+    taxes = FleaTaxes(tax_inputs, tax_requirements, fee_reduction)
+    try:
+        fees = item_prices.flea_fees(lines, taxes)
+    except UnknownItemsError as error:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(error),
+        ) from error
+    return Response(
+        content=ujson.dumps(fees.to_dict()),
+        media_type="application/json",
+    )
+
+
+def _recipe_profit_dto(
+    recipe_profits: RecipeProfits,
+    recipe_profit: RecipeProfit,
+) -> RecipeProfitDTO:
+    recipe = recipe_profit.recipe
+    return RecipeProfitDTO(
+        name=recipe.name,
+        kind=recipe.kind,
+        duration=recipe.duration,
+        inputs=_recipe_items(recipe_profits, recipe.inputs),
+        outputs=_recipe_items(recipe_profits, recipe.outputs),
+        cost=recipe_profit.cost,
+        revenue=recipe_profit.revenue,
+        profit=recipe_profit.profit,
+        profit_per_hour=recipe_profit.profit_per_hour,
+        roi=recipe_profit.roi,
+    )
+
+
+def _recipe_items(
+    recipe_profits: RecipeProfits,
+    items: RecipeItems,
+) -> List[RecipeItemDTO]:
+    return [
+        RecipeItemDTO(name=name, count=count, price=recipe_profits.price(name))
+        for name, count in items
+    ]
@@ -0,0 +1,5 @@
+"""API for converting between currencies."""
+
+from tarkov_calculator_api.web.api.convert.views import router
+
+__all__ = ["router"]
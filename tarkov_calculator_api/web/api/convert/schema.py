@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel, ConstrainedFloat
+
+from tarkov_calculator_api.calculator.rates import Currency, RateSide
+
+
+class FiniteFloat(ConstrainedFloat):
+    """Float that JSON can carry, neither NaN nor infinite."""
+
+    allow_inf_nan = False
+
+
+class ConversionInputDTO(BaseModel):
+    """DTO for a single conversion request."""
+
+    amount: FiniteFloat
+    source: Currency
+    target: Currency
+    side: RateSide = RateSide.BUY
+
+
+class ConversionDTO(ConversionInputDTO):
+    """DTO for a converted amount."""
+
+    rate: float
+    result: float
+
+
+class ConversionResultDTO(BaseModel):
+    """
+    DTO for conversion results.
+
+    It carries the time rates were read, so clients
+    can tell how fresh the prices are.
+    """
+
+    updated_at: datetime
+    conversions: List[ConversionDTO]
@@ -0,0 +1,119 @@
+import math
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from starlette import status
+
+from tarkov_calculator_api.calculator.rates import (
+    Currency,
+    ExchangeRates,
+    RateSide,
+    RateTable,
+    get_exchange_rates,
+)
+from tarkov_calculator_api.web.api.convert.schema import (
+    ConversionDTO,
+    ConversionInputDTO,
+    ConversionResultDTO,
+    FiniteFloat,
+)
+
+router = APIRouter()
+
+# Most amounts a single batch conversion may ask for.
+MAX_BATCH_SIZE = 200
+
+
+def get_rate_table(
+    exchange_rates: ExchangeRates = Depends(get_exchange_rates),
+) -> RateTable:
+    """
+    Get current rate table.
+
+    :param exchange_rates: exchange rates of the worker.
+    :return: current rate table.
+    :raises HTTPException: If rates were not loaded yet.
+    """
+    if exchange_rates.table is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Exchange rates are not loaded yet",
+        )
+    return exchange_rates.table
+
+
+@router.get("/", response_model=ConversionResultDTO)
+async def convert(
+    amount: FiniteFloat,
+    source: Currency,
+    target: Currency,
+    side: RateSide = RateSide.BUY,
+    rate_table: RateTable = Depends(get_rate_table),
+) -> ConversionResultDTO:
+    """
+    Convert amount between currencies.
+
+    Rates are kept in memory and rebuilt on every refresh,
+    so conversions never touch the database.
+
+    :param amount: amount of source currency.
+    :param source: currency to convert from.
+    :param target: currency to convert to.
+    :param side: buy converts with market prices, sell with trader prices.
+    :param rate_table: current rate table.
+    :return: converted amount.
+    """
+    conversion = ConversionInputDTO(
+        amount=amount,
+        source=source,
+        target=target,
+        side=side,
+    )
+    return ConversionResultDTO(
+        updated_at=rate_table.updated_at,
+        conversions=[_convert(rate_table, conversion)],
+    )
+
+
+@router.post("/", response_model=ConversionResultDTO)
+async def convert_batch(
+    conversions: List[ConversionInputDTO],
+    rate_table: RateTable = Depends(get_rate_table),
+) -> ConversionResultDTO:
+    """
+    Convert many amounts at once.
+
+    All amounts are converted with the same rate table.
+
+    :param conversions: amounts to convert.
+    :param rate_table: current rate table.
+    :return: converted amounts in the order of the request.
+    :raises HTTPException: If too many amounts were requested.
+    """
+    if len(conversions) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_SIZE} amounts can be converted",
+        )
+    return ConversionResultDTO(
+        updated_at=rate_table.updated_at,
+        conversions=[_convert(rate_table, conversion) for conversion in conversions],
+    )
+
+
+def _convert(rate_table: RateTable, conversion: ConversionInputDTO) -> ConversionDTO:
+    source, target, side = conversion.source, conversion.target, conversion.side
+    rate = rate_table.rate(source, target, side)
+    if rate is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"No {side.value} rate from {source.value} to {target.value}",
+        )
+    result = conversion.amount * rate
+    # Finite amounts can still overflow, which JSON can't carry.
+    if not math.isfinite(result):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Amount {conversion.amount} is too large to convert",
+        )
+    return ConversionDTO(**conversion.dict(), rate=rate, result=result)
@@ -1,4 +1,18 @@
-from fastapi import APIRouter
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from tarkov_calculator_api.db.dependencies import get_db_engine, get_db_replicas
+from tarkov_calculator_api.db.replicas import ReplicaRouter
+from tarkov_calculator_api.services.cache import TarkovItemCache, get_tarkov_item_cache
+from tarkov_calculator_api.services.metrics import pool_info, render_metrics
+from tarkov_calculator_api.services.price_snapshot import (
+    PriceSnapshot,
+    get_price_snapshot,
+)
+from tarkov_calculator_api.web.startup import StartupReport, get_startup_report
 
 router = APIRouter()
 
@@ -10,3 +24,80 @@ def health_check() -> None:
 
     It returns 200 if the project is healthy.
     """
+
+
+@router.get("/cache")
+def cache_stats(
+    tarkov_item_cache: TarkovItemCache = Depends(get_tarkov_item_cache),
+) -> Dict[str, Any]:
+    """
+    Statistics of the tarkov item cache of this worker.
+
+    :param tarkov_item_cache: cache for tarkov_item reads.
+    :return: hit, miss and eviction counters.
+    """
+    return tarkov_item_cache.info()
+
+
+@router.get("/price_snapshot")
+def price_snapshot_stats(
+    price_snapshot: PriceSnapshot = Depends(get_price_snapshot),
+) -> Dict[str, Any]:
+    """
+    State of the price snapshot mapped by this worker.
+
+    :param price_snapshot: price snapshot.
+    :return: path, item count and generation of the snapshot.
+    """
+    return price_snapshot.info()
+
+
+@router.get("/startup")
+def startup_stats(
+    startup_report: StartupReport = Depends(get_startup_report),
+) -> Dict[str, Any]:
+    """
+    Startup times of this worker and latency of its first request.
+
+    :param startup_report: startup report of the worker.
+    :return: import, build and startup times, first request latency and memory.
+    """
+    return startup_report.to_dict()
+
+
+@router.get("/db_pool")
+def db_pool_stats(
+    db_engine: AsyncEngine = Depends(get_db_engine),
+) -> Dict[str, Any]:
+    """
+    Statistics of the database connection pool of this worker.
+
+    :param db_engine: database engine.
+    :return: pool limits, connections in use and checkout waits.
+    """
+    return pool_info(db_engine.pool)
+
+
+@router.get("/db_replicas")
+def db_replica_stats(
+    db_replicas: ReplicaRouter = Depends(get_db_replicas),
+) -> List[Dict[str, Any]]:
+    """
+    Health and pool statistics of database replicas of this worker.
+
+    :param db_replicas: replica router.
+    :return: statistics of every replica, empty if there are none.
+    """
+    return db_replicas.info()
+
+
+@router.get("/metrics", response_class=Response)
+def metrics() -> Response:
+    """
+    Metrics in the Prometheus text format.
+
+    With several workers, metrics of all of them are reported.
+
+    :return: encoded metrics.
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,5 @@
+"""API for streaming price updates."""
+
+from tarkov_calculator_api.web.api.prices.views import router
+
+__all__ = ["router"]
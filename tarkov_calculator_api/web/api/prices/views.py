@@ -0,0 +1,74 @@
+import asyncio
+from typing import AsyncGenerator, Optional
+
+import ujson
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from tarkov_calculator_api.services.price_updates import (
+    PriceUpdates,
+    Subscription,
+    get_price_updates,
+)
+from tarkov_calculator_api.settings import settings
+
+router = APIRouter()
+
+# Sent on idle streams, so proxies don't close them.
+KEEPALIVE_EVENT = ": keepalive\n\n"
+
+
+async def price_events(
+    price_updates: PriceUpdates,
+    keepalive: float,
+) -> AsyncGenerator[str, None]:
+    """
+    Server-sent events with price changes.
+
+    The stream ends when the client falls too far behind,
+    clients are expected to reconnect and fetch current prices.
+
+    :param price_updates: price updates hub of the worker.
+    :param keepalive: seconds of silence before a keep-alive comment.
+    :yield: encoded events.
+    """
+    subscription = price_updates.subscribe()
+    try:  # noqa: WPS501
+        while True:  # noqa: WPS457
+            message = await _next_message(subscription, keepalive)
+            if message is None:
+                return
+            yield message
+    finally:
+        price_updates.unsubscribe(subscription)
+
+
+async def _next_message(subscription: Subscription, keepalive: float) -> Optional[str]:
+    try:
+        event = await asyncio.wait_for(subscription.get(), keepalive)
+    except asyncio.TimeoutError:
+        return KEEPALIVE_EVENT
+    if event is None:
+        return None
+    data = ujson.dumps(event)
+    return f"event: prices\ndata: {data}\n\n"
+
+
+@router.get("/stream")
+async def stream_prices(
+    price_updates: PriceUpdates = Depends(get_price_updates),
+) -> StreamingResponse:
+    """
+    Stream price changes as server-sent events.
+
+    Every event carries the items whose prices changed
+    in a refresh, so clients don't need to poll.
+
+    :param price_updates: price updates hub of the worker.
+    :return: event stream.
+    """
+    return StreamingResponse(
+        price_events(price_updates, settings.price_stream_keepalive),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,107 +1,51 @@
-import logging
-
-import requests
 from fastapi import APIRouter, BackgroundTasks, Depends
 
 from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
-from tarkov_calculator_api.settings import settings
+from tarkov_calculator_api.db.dao.tarkov_item_price_dao import TarkovItemPriceDAO
+from tarkov_calculator_api.services.fingerprints import (
+    UpstreamFingerprints,
+    get_upstream_fingerprints,
+)
+from tarkov_calculator_api.services.price_updates import PriceUpdates, get_price_updates
+from tarkov_calculator_api.services.refresh import refresh_market_data
+from tarkov_calculator_api.services.tarkov_market import (
+    TarkovMarketClient,
+    get_tarkov_market_client,
+)
 
 router = APIRouter()
 
-# Create a logger
-logger = logging.getLogger(__name__)
-
-
-async def refresh_background(tarkov_item_dao: TarkovItemDAO) -> None:
-    """
-    Refreshes the euro and dollar prices in the background.
-
-    Args:
-        tarkov_item_dao (TarkovItemDAO): The data access object for Tarkov items.
-    """
-    logger.info("Starting to refresh euro and dollar prices.")
-    await refresh_euro(tarkov_item_dao)
-    await refresh_dollar(tarkov_item_dao)
-    logger.info("Refreshed euro and dollar prices.")
-
-
-async def refresh_euro(tarkov_item_dao: TarkovItemDAO) -> None:
-    """
-    Refreshes the euro price.
-
-    Args:
-        tarkov_item_dao (TarkovItemDAO): The data access object for Tarkov items.
-    """
-    euro = await tarkov_item_dao.get_tarkov_item_by_id(1)
-    euro_response = requests.get(
-        f"https://api.tarkov-market.app/api/v1/item?q=euro&x-api-key={settings.tarkov_market_api_key}",
-    )
-    if euro_response.status_code != requests.status_codes.codes.ok:
-        logger.error(
-            f"Error with {euro_response.url} {euro_response.status_code} {euro_response.text}",
-        )
-        return
-    euro_data = euro_response.json()[0]
-
-    if euro is None:
-        await tarkov_item_dao.create_tarkov_item_model(
-            "euro",
-            price=euro_data["price"],
-            base_price=euro_data["basePrice"],
-        )
-    else:
-        await tarkov_item_dao.update_tarkov_item(
-            euro.id,
-            price=euro_data["price"],
-            base_price=euro_data["basePrice"],
-        )
-
-
-async def refresh_dollar(tarkov_item_dao: TarkovItemDAO) -> None:
-    """
-    Refreshes the dollar price.
-
-    Args:
-        tarkov_item_dao (TarkovItemDAO): The data access object for Tarkov items.
-    """
-    dollar = await tarkov_item_dao.get_tarkov_item_by_id(2)
-    dollar_response = requests.get(
-        f"https://api.tarkov-market.app/api/v1/item?q=dollar&x-api-key={settings.tarkov_market_api_key}",
-    )
-    if dollar_response.status_code != requests.status_codes.codes.ok:
-        logger.error(
-            f"Error with {dollar_response.url} {dollar_response.status_code} {dollar_response.text}",
-        )
-        return
-    dollar_data = dollar_response.json()[0]
-
-    if dollar is None:
-        await tarkov_item_dao.create_tarkov_item_model(
-            "dollar",
-            price=dollar_data["price"],
-            base_price=dollar_data["basePrice"],
-        )
-    else:
-        await tarkov_item_dao.update_tarkov_item(
-            dollar.id,
-            price=dollar_data["price"],
-            base_price=dollar_data["basePrice"],
-        )
-
 
 @router.post("/")
-async def send_refresh_request(
+async def send_refresh_request(  # noqa: WPS211
     background_task: BackgroundTasks,
     tarkov_item_dao: TarkovItemDAO = Depends(),
+    tarkov_item_price_dao: TarkovItemPriceDAO = Depends(),
+    tarkov_market_client: TarkovMarketClient = Depends(get_tarkov_market_client),
+    price_updates: PriceUpdates = Depends(get_price_updates),
+    fingerprints: UpstreamFingerprints = Depends(get_upstream_fingerprints),
 ) -> None:
     """
     Sends a refresh request to update the euro and dollar prices.
 
+    The whole item catalogue is ingested too, if it's enabled in settings.
+
     Args:
         background_task (BackgroundTasks): The background task manager.
         tarkov_item_dao (TarkovItemDAO, optional): The data access object for Tarkov items.
+        tarkov_item_price_dao (TarkovItemPriceDAO, optional): The data access object for price history.
+        tarkov_market_client (TarkovMarketClient, optional): The client for the Tarkov Market API.
+        price_updates (PriceUpdates, optional): The price updates hub of the worker.
+        fingerprints (UpstreamFingerprints, optional): The prices last written by the worker.
 
     Returns:
         None
     """
-    background_task.add_task(refresh_background, tarkov_item_dao)
+    background_task.add_task(
+        refresh_market_data,
+        tarkov_item_dao,
+        tarkov_item_price_dao,
+        tarkov_market_client,
+        price_updates,
+        fingerprints,
+    )
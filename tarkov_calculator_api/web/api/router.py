@@ -1,6 +1,14 @@
 from fastapi.routing import APIRouter
 
-from tarkov_calculator_api.web.api import docs, monitoring, refresh, tarkov_item
+from tarkov_calculator_api.web.api import (
+    calculator,
+    convert,
+    docs,
+    monitoring,
+    prices,
+    refresh,
+    tarkov_item,
+)
 
 api_router = APIRouter()
 api_router.include_router(monitoring.router)
@@ -11,3 +19,10 @@ api_router.include_router(
     tags=["tarkov_item"],
 )
 api_router.include_router(refresh.router, prefix="/refresh", tags=["refresh"])
+api_router.include_router(convert.router, prefix="/convert", tags=["convert"])
+api_router.include_router(prices.router, prefix="/prices", tags=["prices"])
+api_router.include_router(
+    calculator.router,
+    prefix="/calculator",
+    tags=["calculator"],
+)
@@ -0,0 +1,155 @@
+import hashlib
+import time
+from dataclasses import dataclass
+from functools import partial
+from operator import attrgetter
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import ujson
+from fastapi.encoders import jsonable_encoder
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
+
+from tarkov_calculator_api.services.cache import SharedCodec, TarkovItemCache
+from tarkov_calculator_api.settings import settings
+
+ETAG_DIGEST_SIZE = 16
+
+
+@dataclass(frozen=True)
+class EncodedContent:
+    """Response content along with its body, encoded as JSON."""
+
+    content: Any
+    body: bytes
+
+
+def encode_content(content: Any) -> EncodedContent:
+    """
+    Encode the content.
+
+    It's meant to be done once per cache entry, so it's only
+    done again after a refresh changes the data.
+
+    :param content: content of the response.
+    :return: content with its encoded body.
+    """
+    body = ujson.dumps(jsonable_encoder(content), ensure_ascii=False).encode("utf-8")
+    return EncodedContent(content=content, body=body)
+
+
+def encoded_codec(parse: Callable[[Any], Any]) -> SharedCodec:
+    """
+    Codec of encoded content in the shared cache.
+
+    Only the body is stored, the content is parsed back from it.
+
+    :param parse: builds content from the decoded JSON body.
+    :return: codec.
+    """
+    return SharedCodec(
+        encode=attrgetter("body"),
+        decode=partial(_decode, parse),
+    )
+
+
+def version_etag(tarkov_item_cache: TarkovItemCache, key: Hashable) -> str:
+    """
+    Get ETag of a cache entry, derived from the version of the data.
+
+    The tag is a digest of the key and the cache generation,
+    which changes with every price change, so it's known before
+    the entry is loaded and requests that already have it are answered
+    without reading the data. Workers move to the generation
+    of every price change together, so they agree on tags, except
+    right after startup, which only costs a full response.
+    It has to be taken before the entry is loaded, so content read
+    while prices change is tagged with the outdated generation.
+
+    :param tarkov_item_cache: cache the entry is stored in.
+    :param key: cache key of the entry.
+    :return: strong ETag.
+    """
+    tagged = f"{tarkov_item_cache.generation}:{key!r}".encode("utf-8")
+    digest = hashlib.blake2b(tagged, digest_size=ETAG_DIGEST_SIZE).hexdigest()
+    return f'"{digest}"'
+
+
+def seconds_until_next_refresh(now: float) -> int:
+    """
+    Get number of seconds until the latest time the next refresh may happen.
+
+    Refreshes are scheduled at multiples of ``refresh_interval``
+    since the epoch, delayed by up to ``refresh_jitter`` when workers
+    run them, so every worker agrees on when the next one is over.
+    Responses may outlive a refresh by at most the jitter, while
+    responses served between a multiple of the interval and the delayed
+    refresh run out with it instead of a whole interval later.
+
+    :param now: current unix time.
+    :return: seconds until the next refresh is over.
+    """
+    interval = settings.refresh_interval
+    jitter = settings.refresh_jitter if settings.scheduler_enabled else 0
+    return max(1, int(interval - (now - jitter) % interval))
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    Answer with 304 Not Modified if the client already has the version.
+
+    :param request: current request.
+    :param etag: ETag of the current version.
+    :return: empty 304 response if it matches If-None-Match, None otherwise.
+    """
+    if not _etag_matches(request.headers.get("If-None-Match"), etag):
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=_cache_headers(etag),
+    )
+
+
+def conditional_response(
+    response: Response,
+    encoded: EncodedContent,
+    etag: str,
+) -> Response:
+    """
+    Answer with encoded content, tagged with its version.
+
+    The already encoded body is sent as is, skipping validation
+    and serialization of the response model.
+    ETag and Cache-Control headers are added to the response,
+    with max-age running out right at the next refresh.
+
+    :param response: current response.
+    :param encoded: content to answer with.
+    :param etag: ETag of the version of the content.
+    :return: JSON response.
+    """
+    response.headers.update(_cache_headers(etag))
+    return Response(
+        content=encoded.body,
+        media_type="application/json",
+        headers=dict(response.headers),
+    )
+
+
+def _cache_headers(etag: str) -> Dict[str, str]:
+    max_age = seconds_until_next_refresh(time.time())
+    return {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+
+def _decode(parse: Callable[[Any], Any], body: bytes) -> EncodedContent:
+    return EncodedContent(content=parse(ujson.loads(body)), body=body)
+
+
+def _etag_matches(if_none_match: Any, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored.
+    # "*" isn't honoured, it would take loading the entry to know it exists.
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
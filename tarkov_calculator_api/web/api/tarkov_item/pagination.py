@@ -0,0 +1,81 @@
+import base64
+from typing import Any, List, Optional
+
+import ujson
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import (
+    ORDERING_KEYS,
+    TarkovItemOrdering,
+)
+from tarkov_calculator_api.db.models.tarkov_item_model import TarkovItem
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(order_by: TarkovItemOrdering, item: Any) -> str:
+    """
+    Build opaque cursor pointing right after the item.
+
+    :param order_by: ordering of the listing.
+    :param item: last item of the current page.
+    :return: cursor for the next page.
+    """
+    keys = [getattr(item, key) for key in ORDERING_KEYS[order_by]]
+    payload = ujson.dumps([order_by.value, *keys]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: TarkovItemOrdering) -> List[Any]:
+    """
+    Get ordering key values stored in the cursor.
+
+    :param cursor: cursor from a previous page.
+    :param order_by: ordering of the listing.
+    :return: ordering key values of the last seen item.
+    :raises ValueError: if cursor is malformed or made for another ordering.
+    """
+    payload = _load_payload(cursor)
+    if payload[:1] != [order_by.value]:
+        raise ValueError("Cursor doesn't match the ordering")
+    keys = ORDERING_KEYS[order_by]
+    key_values = payload[1:]
+    if len(key_values) != len(keys):
+        raise ValueError("Malformed cursor")
+    if not all(map(_is_key_value, keys, key_values)):
+        raise ValueError("Malformed cursor")
+    return key_values
+
+
+def next_cursor(
+    order_by: TarkovItemOrdering,
+    items: List[Any],
+    limit: int,
+) -> Optional[str]:
+    """
+    Build cursor for the page after the given one.
+
+    :param order_by: ordering of the listing.
+    :param items: items of the current page.
+    :param limit: requested page size.
+    :return: cursor, or None if this is the last page.
+    """
+    if not items or len(items) < limit:
+        return None
+    return encode_cursor(order_by, items[-1])
+
+
+def _load_payload(cursor: str) -> List[Any]:
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        payload = ujson.loads(base64.urlsafe_b64decode(cursor + padding))
+    except ValueError as error:
+        raise ValueError("Malformed cursor") from error
+    if not isinstance(payload, list):
+        raise ValueError("Malformed cursor")
+    return payload
+
+
+def _is_key_value(key: str, key_value: Any) -> bool:
+    column = TarkovItem.__table__.columns[key]
+    python_type = column.type.python_type
+    return isinstance(key_value, python_type) and not isinstance(key_value, bool)
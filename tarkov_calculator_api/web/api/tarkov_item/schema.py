@@ -1,3 +1,6 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
 from pydantic import BaseModel
 
 
@@ -23,3 +26,39 @@ class TarkovItemModelInputDTO(BaseModel):
     name: str
     price: int
     base_price: int
+
+
+class TarkovItemBatchInputDTO(BaseModel):
+    """DTO for looking up many TarkovItem models at once."""
+
+    ids: List[int] = []
+    names: List[str] = []
+
+
+class TarkovItemBatchDTO(BaseModel):
+    """
+    DTO for results of a batch lookup.
+
+    Items are keyed by the requested id or name,
+    items that were not found are null.
+    """
+
+    ids: Dict[int, Optional[TarkovItemModelDTO]]
+    names: Dict[str, Optional[TarkovItemModelDTO]]
+
+
+class TarkovItemPriceBucketDTO(BaseModel):
+    """
+    DTO for downsampled TarkovItem price history.
+
+    Prices are aggregated over the time bucket starting at the timestamp,
+    each price holding until the next sample. Samples counts the ones
+    recorded within the bucket.
+    """
+
+    timestamp: datetime
+    price: float
+    price_min: int
+    price_max: int
+    base_price: float
+    samples: int
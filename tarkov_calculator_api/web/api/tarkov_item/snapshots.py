@@ -0,0 +1,103 @@
+from functools import partial
+from typing import Any, Hashable, List, Optional
+
+from pydantic import parse_obj_as
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from tarkov_calculator_api.db.dao.tarkov_item_dao import (
+    TarkovItemDAO,
+    TarkovItemOrdering,
+)
+from tarkov_calculator_api.services.cache import TarkovItemCache
+from tarkov_calculator_api.web.api.tarkov_item.conditional import (
+    EncodedContent,
+    encode_content,
+    encoded_codec,
+)
+from tarkov_calculator_api.web.api.tarkov_item.schema import TarkovItemModelDTO
+
+# Page size of the item listing when no limit is passed.
+DEFAULT_LIMIT = 10
+
+# Codecs of encoded pages and single items in the shared cache.
+PAGE_CODEC = encoded_codec(partial(parse_obj_as, List[TarkovItemModelDTO]))
+ITEM_CODEC = encoded_codec(TarkovItemModelDTO.parse_obj)
+
+
+def page_cache_key(
+    order_by: TarkovItemOrdering,
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+) -> Hashable:
+    """
+    Cache key of a page of the item listing.
+
+    :param order_by: ordering of the page.
+    :param limit: size of the page.
+    :param offset: offset of the page.
+    :param cursor: cursor of the page.
+    :return: cache key.
+    """
+    return ("list", order_by, limit, offset, cursor)
+
+
+async def load_page(  # noqa: WPS211
+    tarkov_item_dao: TarkovItemDAO,
+    limit: int,
+    offset: int,
+    order_by: TarkovItemOrdering,
+    after: Optional[List[Any]],
+) -> EncodedContent:
+    """
+    Load a page of the item listing and encode it.
+
+    :param tarkov_item_dao: DAO for tarkov_item models.
+    :param limit: size of the page.
+    :param offset: offset of the page, keyset pagination is used if it's 0.
+    :param order_by: ordering of the page.
+    :param after: keys of the last item of the previous page.
+    :return: encoded page.
+    """
+    if offset:
+        tarkov_items = await tarkov_item_dao.get_all_tarkov_items(
+            limit=limit,
+            offset=offset,
+            order_by=order_by,
+        )
+    else:
+        tarkov_items = await tarkov_item_dao.get_tarkov_items_page(
+            limit=limit,
+            order_by=order_by,
+            after=after,
+        )
+    return encode_content([TarkovItemModelDTO.from_orm(item) for item in tarkov_items])
+
+
+async def warm_pages(
+    session_factory: "async_sessionmaker[AsyncSession]",
+    tarkov_item_cache: TarkovItemCache,
+) -> None:
+    """
+    Build encoded first pages of every ordering ahead of requests.
+
+    It's run after every price change, so the most requested pages
+    are served from the cache without touching the database.
+    Pages are stored under the cache version they were loaded with,
+    so a warmup racing with another change can't store outdated pages.
+    With a shared cache, pages are stored there as well, so other workers
+    don't have to build them.
+
+    :param session_factory: factory of database sessions.
+    :param tarkov_item_cache: cache to put pages in.
+    """
+    version = tarkov_item_cache.version
+    async with session_factory() as session:
+        tarkov_item_dao = TarkovItemDAO(session)
+        for order_by in TarkovItemOrdering:
+            await tarkov_item_cache.put(
+                page_cache_key(order_by, DEFAULT_LIMIT, 0, None),
+                await load_page(tarkov_item_dao, DEFAULT_LIMIT, 0, order_by, None),
+                version=version,
+                codec=PAGE_CODEC,
+            )
@@ -1,50 +1,345 @@
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from fastapi.param_functions import Depends
+from starlette import status
 
-from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
-from tarkov_calculator_api.db.models.tarkov_item_model import TarkovItem
-from tarkov_calculator_api.web.api.tarkov_item.schema import TarkovItemModelDTO
+from tarkov_calculator_api.db.dao.tarkov_item_dao import (
+    TarkovItemDAO,
+    TarkovItemOrdering,
+)
+from tarkov_calculator_api.db.dao.tarkov_item_price_dao import TarkovItemPriceDAO
+from tarkov_calculator_api.services.cache import TarkovItemCache, get_tarkov_item_cache
+from tarkov_calculator_api.services.price_snapshot import (
+    PriceSnapshot,
+    get_price_snapshot,
+)
+from tarkov_calculator_api.services.search import SearchIndex, get_search_index
+from tarkov_calculator_api.web.api.tarkov_item.conditional import (
+    EncodedContent,
+    conditional_response,
+    encode_content,
+    not_modified,
+    version_etag,
+)
+from tarkov_calculator_api.web.api.tarkov_item.pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    next_cursor,
+)
+from tarkov_calculator_api.web.api.tarkov_item.schema import (
+    TarkovItemBatchDTO,
+    TarkovItemBatchInputDTO,
+    TarkovItemModelDTO,
+    TarkovItemPriceBucketDTO,
+)
+from tarkov_calculator_api.web.api.tarkov_item.snapshots import (
+    DEFAULT_LIMIT,
+    ITEM_CODEC,
+    PAGE_CODEC,
+    load_page,
+    page_cache_key,
+)
 
 router = APIRouter()
 
+# Most ids and names a single batch lookup may ask for.
+MAX_BATCH_SIZE = 200
+# Longest search query, as long as the longest name.
+MAX_QUERY_LENGTH = 200
+# Most items a single search may return.
+MAX_SEARCH_LIMIT = 50
+# Most items a single page may hold.
+MAX_LIMIT = 100
+
 
 @router.get("/", response_model=List[TarkovItemModelDTO])
-async def get_tarkov_item_models(
-    limit: int = 10,
-    offset: int = 0,
-    tarkov_item_dao: TarkovItemDAO = Depends(),
-) -> List[TarkovItem]:
+async def get_tarkov_item_models(  # noqa: WPS210, WPS211
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    order_by: TarkovItemOrdering = TarkovItemOrdering.ID,
+    tarkov_item_dao: TarkovItemDAO = Depends(TarkovItemDAO.read_only_primary),
+    tarkov_item_cache: TarkovItemCache = Depends(get_tarkov_item_cache),
+) -> Any:
     """
     Retrieve all tarkov_item objects from the database.
 
-    :param limit: limit of tarkov_item objects, defaults to 10.
-    :param offset: offset of tarkov_item objects, defaults to 0.
+    Pages are chained with cursors: if there may be more items,
+    the response carries the cursor of the next page in
+    the X-Next-Cursor header. Cursor pages cost the same at any depth,
+    while offset is kept for compatibility and gets slower as it grows.
+
+    Pages are cached already encoded, and first pages are built
+    after every refresh, so most requests skip the database
+    and response model serialization altogether.
+
+    Responses are tagged with an ETag derived from the version of prices,
+    and If-None-Match requests for unchanged pages are answered
+    with 304 Not Modified before the page is even looked up.
+
+    :param request: current request.
+    :param response: current response.
+    :param limit: limit of tarkov_item objects, defaults to 10, at most 100.
+    :param offset: offset of tarkov_item objects, ignored if cursor is passed.
+    :param cursor: cursor of the page to get.
+    :param order_by: ordering of tarkov_item objects, defaults to id.
     :param tarkov_item_dao: DAO for tarkov_item models.
+    :param tarkov_item_cache: cache for tarkov_item reads.
     :return: list of tarkov_item objects from database.
     """
-    return await tarkov_item_dao.get_all_tarkov_items(limit=limit, offset=offset)
+    after = _parse_cursor(cursor, order_by)
+    if after is not None:
+        offset = 0
+
+    async def load() -> EncodedContent:  # noqa: WPS430
+        return await load_page(tarkov_item_dao, limit, offset, order_by, after)
+
+    cache_key = page_cache_key(order_by, limit, offset, cursor)
+    etag = version_etag(tarkov_item_cache, cache_key)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    tarkov_items = await tarkov_item_cache.get_or_load(cache_key, load, PAGE_CODEC)
+    next_page = next_cursor(order_by, tarkov_items.content, limit)
+    if next_page is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_page
+    return conditional_response(response, tarkov_items, etag)
+
+
+@router.get("/batch", response_model=TarkovItemBatchDTO)
+async def get_tarkov_item_batch(
+    ids: List[int] = Query([]),
+    names: List[str] = Query([]),
+    tarkov_item_dao: TarkovItemDAO = Depends(TarkovItemDAO.read_only),
+    price_snapshot: PriceSnapshot = Depends(get_price_snapshot),
+) -> TarkovItemBatchDTO:
+    """
+    Retrieve many tarkov_item objects by ids and names at once.
+
+    Ids and names are passed as repeated query parameters,
+    e.g. ``?ids=1&ids=2&names=euro``. They are looked up in
+    the price snapshot of the host, and the ones that are not there
+    in a single query.
+
+    :param ids: ids of tarkov_item objects.
+    :param names: names of tarkov_item objects.
+    :param tarkov_item_dao: DAO for tarkov_item models.
+    :param price_snapshot: price snapshot of the host.
+    :return: tarkov_item objects keyed by id and name, null if not found.
+    """
+    return await _get_batch(tarkov_item_dao, price_snapshot, ids, names)
+
+
+@router.post("/batch", response_model=TarkovItemBatchDTO)
+async def post_tarkov_item_batch(
+    batch: TarkovItemBatchInputDTO,
+    tarkov_item_dao: TarkovItemDAO = Depends(TarkovItemDAO.read_only),
+    price_snapshot: PriceSnapshot = Depends(get_price_snapshot),
+) -> TarkovItemBatchDTO:
+    """
+    Retrieve many tarkov_item objects by ids and names at once.
+
+    Same as the GET lookup, for batches too long for a query string.
+
+    :param batch: ids and names of tarkov_item objects.
+    :param tarkov_item_dao: DAO for tarkov_item models.
+    :param price_snapshot: price snapshot of the host.
+    :return: tarkov_item objects keyed by id and name, null if not found.
+    """
+    return await _get_batch(tarkov_item_dao, price_snapshot, batch.ids, batch.names)
+
+
+@router.get("/search", response_model=List[TarkovItemModelDTO])
+async def search_tarkov_items(
+    query: str = Query(..., alias="q", min_length=1, max_length=MAX_QUERY_LENGTH),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    tarkov_item_dao: TarkovItemDAO = Depends(TarkovItemDAO.read_only),
+    search_index: SearchIndex = Depends(get_search_index),
+) -> List[TarkovItemModelDTO]:
+    """
+    Search tarkov_item objects by name.
+
+    Names with a word starting with the query are looked up
+    in the in-memory index of the worker, which is enough to
+    autocomplete without touching the database. If it has fewer
+    than limit matches, names containing the query or similar to it
+    are looked up in the database to fill the rest.
+
+    :param query: text to look for.
+    :param limit: most tarkov_item objects to return, defaults to 10.
+    :param tarkov_item_dao: DAO for tarkov_item models.
+    :param search_index: search index of the worker.
+    :return: best matching tarkov_item objects, prefix matches first.
+    """
+    tarkov_items = search_index.search(query, limit)
+    if len(tarkov_items) < limit:
+        found = {tarkov_item.id for tarkov_item in tarkov_items}
+        for similar in await tarkov_item_dao.search_tarkov_items(query, limit):
+            if len(tarkov_items) < limit and similar.id not in found:
+                tarkov_items.append(similar)
+    return [TarkovItemModelDTO.from_orm(tarkov_item) for tarkov_item in tarkov_items]
 
 
 @router.get("/{tarkov_item_id}", response_model=TarkovItemModelDTO)
-async def get_tarkov_item_model_by_id(
+async def get_tarkov_item_model_by_id(  # noqa: WPS210, WPS211
+    request: Request,
+    response: Response,
     tarkov_item_id: int,
-    tarkov_item_dao: TarkovItemDAO = Depends(),
-) -> TarkovItem:
+    tarkov_item_dao: TarkovItemDAO = Depends(TarkovItemDAO.read_only_primary),
+    tarkov_item_cache: TarkovItemCache = Depends(get_tarkov_item_cache),
+    price_snapshot: PriceSnapshot = Depends(get_price_snapshot),
+) -> Any:
     """
     Retrieve a single tarkov_item object from the database.
 
+    Items missing from the cache are read from the price snapshot
+    of the host, and only from the database if they are not there,
+    so they are served even while the database is unreachable.
+
+    Responses are tagged with an ETag derived from the version of prices,
+    and If-None-Match requests for unchanged items are answered
+    with 304 Not Modified before the item is even looked up.
+
+    :param request: current request.
+    :param response: current response.
     :param tarkov_item_id: id of tarkov_item object.
     :param tarkov_item_dao: DAO for tarkov_item models.
+    :param tarkov_item_cache: cache for tarkov_item reads.
+    :param price_snapshot: price snapshot of the host.
     :return: tarkov_item object from database.
     :raises HTTPException: If the tarkov_item is not found in the database.
     """
-    tarkov_item = await tarkov_item_dao.get_tarkov_item_by_id(tarkov_item_id)
+
+    async def load() -> Optional[EncodedContent]:  # noqa: WPS430
+        tarkov_item: Any = price_snapshot.item(tarkov_item_id)
+        if tarkov_item is None:
+            tarkov_item = await tarkov_item_dao.get_tarkov_item_by_id(tarkov_item_id)
+        if tarkov_item is None:
+            return None
+        return encode_content(TarkovItemModelDTO.from_orm(tarkov_item))
+
+    cache_key = ("item", tarkov_item_id)
+    etag = version_etag(tarkov_item_cache, cache_key)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    # The snapshot is closer than the shared cache.
+    codec = None if price_snapshot.available else ITEM_CODEC
+    tarkov_item = await tarkov_item_cache.get_or_load(cache_key, load, codec)
     status_code_not_found = 404
     if tarkov_item is None:
         raise HTTPException(
             status_code=status_code_not_found,
             detail="Tarkov item not found",
         )
-    return tarkov_item
+    return conditional_response(response, tarkov_item, etag)
+
+
+@router.get(
+    "/{tarkov_item_id}/history",
+    response_model=List[TarkovItemPriceBucketDTO],
+)
+async def get_tarkov_item_price_history(
+    tarkov_item_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    buckets: int = Query(100, ge=1, le=1000),
+    tarkov_item_price_dao: TarkovItemPriceDAO = Depends(
+        TarkovItemPriceDAO.read_only,
+    ),
+) -> List[TarkovItemPriceBucketDTO]:
+    """
+    Retrieve price history of a tarkov_item object.
+
+    The period is split into equal buckets and prices are aggregated
+    over each of them. Prices hold until they change, so averages
+    are weighted by time and buckets without samples carry the last
+    price, only buckets before the first known price are omitted.
+    Times without timezone are treated as UTC.
+
+    :param tarkov_item_id: id of tarkov_item object.
+    :param start: start of the period, defaults to a week before end.
+    :param end: end of the period, defaults to now.
+    :param buckets: number of buckets, defaults to 100.
+    :param tarkov_item_price_dao: DAO for tarkov_item price history.
+    :return: aggregated prices for each bucket.
+    :raises HTTPException: If the period is empty.
+    """
+    end = _as_utc(end) if end else datetime.now(timezone.utc)
+    start = _as_utc(start) if start else end - timedelta(days=7)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start must be before end",
+        )
+    rows = await tarkov_item_price_dao.get_price_history(
+        tarkov_item_id,
+        start=start,
+        end=end,
+        buckets=buckets,
+    )
+    bucket_width = (end - start) / buckets
+    return [
+        TarkovItemPriceBucketDTO(
+            timestamp=start + bucket_width * int(row.bucket),
+            price=row.price,
+            price_min=row.price_min,
+            price_max=row.price_max,
+            base_price=row.base_price,
+            samples=row.samples,
+        )
+        for row in rows
+    ]
+
+
+async def _get_batch(  # noqa: WPS210
+    tarkov_item_dao: TarkovItemDAO,
+    price_snapshot: PriceSnapshot,
+    ids: List[int],
+    names: List[str],
+) -> TarkovItemBatchDTO:
+    if len(ids) + len(names) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_SIZE} ids and names can be requested",
+        )
+    items: List[Any] = price_snapshot.items(ids, names)
+    missing_ids = set(ids) - {item.id for item in items}
+    missing_names = set(names) - {item.name for item in items}
+    if missing_ids or missing_names:
+        items += await tarkov_item_dao.get_tarkov_items_by_ids_or_names(
+            list(missing_ids),
+            list(missing_names),
+        )
+    found = [TarkovItemModelDTO.from_orm(item) for item in items]
+    by_id = {item.id: item for item in found}
+    by_name = {item.name: item for item in found}
+    return TarkovItemBatchDTO(
+        ids={item_id: by_id.get(item_id) for item_id in ids},
+        names={name: by_name.get(name) for name in names},
+    )
+
+
+def _as_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+def _parse_cursor(
+    cursor: Optional[str],
+    order_by: TarkovItemOrdering,
+) -> Optional[List[Any]]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor, order_by)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(error),
+        ) from error
@@ -6,11 +6,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import UJSONResponse
 from fastapi.staticfiles import StaticFiles
 
+from tarkov_calculator_api.services.metrics import MetricsMiddleware
+from tarkov_calculator_api.settings import settings
 from tarkov_calculator_api.web.api.router import api_router
+from tarkov_calculator_api.web.api.tarkov_item.pagination import NEXT_CURSOR_HEADER
 from tarkov_calculator_api.web.lifetime import (
     register_shutdown_event,
     register_startup_event,
 )
+from tarkov_calculator_api.web.startup import FirstRequestTimer, StartupReport
 
 APP_ROOT = Path(__file__).parent.parent
 
@@ -31,6 +35,7 @@ def get_app() -> FastAPI:
         openapi_url="/api/openapi.json",
         default_response_class=UJSONResponse,
     )
+    app.state.startup_report = StartupReport()
 
     origins = ["*"]
 
@@ -40,7 +45,11 @@ def get_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
     )
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+    app.add_middleware(FirstRequestTimer)
 
     # Adds startup and shutdown events.
     register_startup_event(app)
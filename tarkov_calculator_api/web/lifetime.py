@@ -1,9 +1,36 @@
-from typing import Awaitable, Callable
+import asyncio
+import logging
+from contextlib import suppress
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from fastapi import FastAPI
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 
+from tarkov_calculator_api.calculator.flea import ItemPrices
+from tarkov_calculator_api.calculator.rates import Currency, ExchangeRates
+from tarkov_calculator_api.calculator.recipes import RecipeProfits, load_recipes
+from tarkov_calculator_api.db.dao.tarkov_item_dao import TarkovItemDAO
+from tarkov_calculator_api.db.replicas import ReplicaRouter
+from tarkov_calculator_api.services.cache import TarkovItemCache
+from tarkov_calculator_api.services.fingerprints import UpstreamFingerprints
+from tarkov_calculator_api.services.metrics import (
+    PRIMARY_POOL,
+    InstrumentedQueuePool,
+    instrument_engine,
+)
+from tarkov_calculator_api.services.price_snapshot import PriceSnapshot
+from tarkov_calculator_api.services.price_updates import PriceUpdates
+from tarkov_calculator_api.services.refresh import run_refresh
+from tarkov_calculator_api.services.scheduler import RefreshScheduler
+from tarkov_calculator_api.services.search import SearchIndex
+from tarkov_calculator_api.services.shared_cache import create_shared_cache
+from tarkov_calculator_api.services.tarkov_market import create_tarkov_market_client
 from tarkov_calculator_api.settings import settings
+from tarkov_calculator_api.web.api.tarkov_item.snapshots import warm_pages
+
+logger = logging.getLogger(__name__)
 
 
 def _setup_db(app: FastAPI) -> None:  # pragma: no cover
@@ -16,13 +43,247 @@ def _setup_db(app: FastAPI) -> None:  # pragma: no cover
 
     :param app: fastAPI application.
     """
-    engine = create_async_engine(str(settings.db_url), echo=settings.db_echo)
+    engine = _create_engine(str(settings.db_url), PRIMARY_POOL)
     session_factory = async_sessionmaker(
         engine,
         expire_on_commit=False,
     )
     app.state.db_engine = engine
     app.state.db_session_factory = session_factory
+    replicas = ReplicaRouter(
+        engine,
+        [
+            _create_engine(url, f"replica-{index}")
+            for index, url in enumerate(settings.db_replica_urls)
+        ],
+        _read_options(),
+    )
+    app.state.db_replicas = replicas
+    app.state.db_read_session_factory = replicas
+    app.state.db_replica_check_task = None
+    if replicas.replicas:
+        app.state.db_replica_check_task = asyncio.create_task(
+            replicas.run(
+                settings.db_replica_check_interval,
+                settings.db_replica_check_timeout,
+            ),
+        )
+
+
+def _create_engine(url: str, pool_name: str) -> AsyncEngine:  # pragma: no cover
+    engine = create_async_engine(
+        url,
+        echo=settings.db_echo,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name=pool_name,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+            "statement_cache_size": settings.db_statement_cache_size,
+        },
+    )
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+def _read_options() -> Dict[str, Any]:
+    if settings.db_read_only_transactions:
+        return {"postgresql_readonly": True}
+    return {"isolation_level": "AUTOCOMMIT"}
+
+
+def _setup_cache(app: FastAPI) -> None:
+    """
+    Creates per-worker cache for tarkov item reads.
+
+    If a shared cache is configured, it's put behind the per-worker one.
+
+    :param app: fastAPI application.
+    """
+    app.state.shared_cache = create_shared_cache(
+        settings.shared_cache_url,
+        settings.shared_cache_prefix,
+        settings.shared_cache_timeout,
+    )
+    app.state.tarkov_item_cache = TarkovItemCache(
+        max_size=settings.tarkov_item_cache_size,
+        ttl=settings.tarkov_item_cache_ttl,
+        shared=app.state.shared_cache,
+    )
+
+
+def _setup_tarkov_market(app: FastAPI) -> None:
+    """
+    Creates pooled client for the tarkov-market.app API.
+
+    Fingerprints of its items are created along with it.
+
+    :param app: fastAPI application.
+    """
+    app.state.tarkov_market_client = create_tarkov_market_client()
+    app.state.upstream_fingerprints = UpstreamFingerprints()
+
+
+async def _setup_price_snapshot(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Brings the price snapshot of the host up to date and maps it.
+
+    If the database is not reachable yet, the snapshot left
+    by workers that ran before is served as it is.
+
+    :param app: fastAPI application.
+    """
+    app.state.price_snapshot = PriceSnapshot(settings.price_snapshot_dir)
+    if settings.price_snapshot_dir is None:
+        return
+    try:
+        await _reload_price_snapshot(app)
+    except (SQLAlchemyError, OSError) as error:
+        logger.warning(f"Could not load price snapshot: {error!r}")
+        await app.state.price_snapshot.open()
+
+
+async def _reload_price_snapshot(app: FastAPI) -> None:  # pragma: no cover
+    async with app.state.db_session_factory() as session:
+        await app.state.price_snapshot.reload(TarkovItemDAO(session))
+
+
+async def _setup_exchange_rates(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Loads the price snapshot and exchange rates of the worker.
+
+    If the database is not reachable yet, rates are loaded from
+    the price snapshot, without one they stay empty until the next refresh.
+
+    :param app: fastAPI application.
+    """
+    await _setup_price_snapshot(app)
+    app.state.exchange_rates = ExchangeRates()
+    try:
+        async with app.state.db_session_factory() as session:
+            await app.state.exchange_rates.reload(TarkovItemDAO(session))
+    except (SQLAlchemyError, OSError) as error:
+        logger.warning(f"Could not load exchange rates: {error!r}")
+        price_snapshot = app.state.price_snapshot
+        if price_snapshot.available:
+            app.state.exchange_rates.update(
+                price_snapshot.items_by_names(currency.value for currency in Currency),
+                price_snapshot.recorded_at,
+            )
+
+
+async def _setup_search_index(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Loads item names of the worker for search.
+
+    If the database is not reachable yet, the index stays empty
+    and searches go to the database.
+
+    :param app: fastAPI application.
+    """
+    app.state.search_index = SearchIndex()
+    try:
+        async with app.state.db_session_factory() as session:
+            await app.state.search_index.reload(TarkovItemDAO(session))
+    except (SQLAlchemyError, OSError) as error:
+        logger.warning(f"Could not load search index: {error!r}")
+
+
+async def _setup_calculator(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Loads recipes of the worker and prices of items for calculations.
+
+    Without a recipes file there are no recipes to rank.
+    If the database is not reachable yet, there are no prices
+    until items are refreshed.
+
+    :param app: fastAPI application.
+    """
+    recipes = []
+    if settings.recipes_file is not None:
+        recipes = load_recipes(settings.recipes_file)
+    app.state.recipe_profits = RecipeProfits(recipes)
+    app.state.item_prices = ItemPrices()
+    try:
+        async with app.state.db_session_factory() as session:
+            await app.state.recipe_profits.reload(TarkovItemDAO(session))
+            await app.state.item_prices.reload(TarkovItemDAO(session))
+    except (SQLAlchemyError, OSError) as error:
+        logger.warning(f"Could not load calculator prices: {error!r}")
+
+
+def _setup_price_updates(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Creates price updates hub and starts listening for other workers.
+
+    :param app: fastAPI application.
+    """
+    price_updates = PriceUpdates(
+        app.state.tarkov_item_cache,
+        app.state.exchange_rates,
+        queue_size=settings.price_stream_queue_size,
+        warmup=partial(
+            warm_pages,
+            app.state.db_session_factory,
+            app.state.tarkov_item_cache,
+        ),
+        search_index=app.state.search_index,
+        recipe_profits=app.state.recipe_profits,
+        item_prices=app.state.item_prices,
+        price_snapshot=app.state.price_snapshot,
+        resync=(
+            partial(_reload_price_snapshot, app)
+            if settings.price_snapshot_dir is not None
+            else None
+        ),
+    )
+    app.state.price_updates = price_updates
+    app.state.price_updates_listener = asyncio.create_task(
+        price_updates.listen(
+            str(settings.db_url.with_scheme("postgresql")),
+            retry_delay=settings.price_listener_retry_delay,
+        ),
+    )
+
+
+def _setup_scheduler(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Starts the refresh scheduler of the worker.
+
+    Every worker runs it, but only the elected one refreshes.
+
+    :param app: fastAPI application.
+    """
+    app.state.refresh_scheduler_task = None
+    if not settings.scheduler_enabled:
+        return
+    scheduler = RefreshScheduler(
+        str(settings.db_url.with_scheme("postgresql")),
+        partial(
+            run_refresh,
+            app.state.db_session_factory,
+            app.state.tarkov_market_client,
+            app.state.price_updates,
+            app.state.upstream_fingerprints,
+        ),
+        interval=settings.refresh_interval,
+        jitter=settings.refresh_jitter,
+        election_interval=settings.scheduler_election_interval,
+    )
+    app.state.refresh_scheduler = scheduler
+    app.state.refresh_scheduler_task = asyncio.create_task(scheduler.run())
+
+
+async def _cancel(task: "Optional[asyncio.Task[None]]") -> None:  # pragma: no cover
+    if task is None:
+        return
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
 
 
 def register_startup_event(
@@ -40,10 +301,15 @@ def register_startup_event(
 
     @app.on_event("startup")
     async def _startup() -> None:  # noqa: WPS430
-        app.middleware_stack = None
-        _setup_db(app)
-        app.middleware_stack = app.build_middleware_stack()
-        pass  # noqa: WPS420
+        with app.state.startup_report.startup():
+            _setup_db(app)
+            _setup_cache(app)
+            _setup_tarkov_market(app)
+            await _setup_exchange_rates(app)
+            await _setup_search_index(app)
+            await _setup_calculator(app)
+            _setup_price_updates(app)
+            _setup_scheduler(app)
 
     return _startup
 
@@ -60,7 +326,14 @@ def register_shutdown_event(
 
     @app.on_event("shutdown")
     async def _shutdown() -> None:  # noqa: WPS430
+        await _cancel(app.state.refresh_scheduler_task)
+        await _cancel(app.state.price_updates_listener)
+        await _cancel(app.state.db_replica_check_task)
+        await app.state.db_replicas.dispose()
         await app.state.db_engine.dispose()
+        await app.state.tarkov_market_client.close()
+        if app.state.shared_cache is not None:
+            await app.state.shared_cache.close()
 
         pass  # noqa: WPS420
 
@@ -0,0 +1,184 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from fastapi import FastAPI
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Memory summary of the process, Linux only.
+SMAPS_ROLLUP = Path("/proc/self/smaps_rollup")
+PRIVATE_MEMORY_FIELDS = ("Private_Clean:", "Private_Dirty:")
+
+
+class StartupReport:
+    """
+    Time it took the worker to start and serve its first request.
+
+    With a preloaded app, the app is imported and built once
+    in the master, before workers are forked, so those times are
+    the ones of the master. Only the import of the app module is timed,
+    on top of the modules the entrypoint has imported already.
+    Private memory is the memory of the worker that isn't shared
+    with the master or other workers.
+    """
+
+    def __init__(self) -> None:
+        self.preloaded = False
+        self.app_import_seconds: Optional[float] = None
+        self.build_seconds: Optional[float] = None
+        self.startup_seconds: Optional[float] = None
+        self.first_request_seconds: Optional[float] = None
+        self.private_memory_kib: Optional[int] = None
+
+    def __str__(self) -> str:  # noqa: WPS210
+        started, imported, built = map(
+            _seconds,
+            (self.startup_seconds, self.app_import_seconds, self.build_seconds),
+        )
+        origin = "master" if self.preloaded else "worker"
+        loaded = (
+            f"app module imported in {imported} and built in {built} by the {origin}"
+        )
+        memory = self.private_memory_kib
+        return f"started in {started}, {loaded}, {memory} KiB of private memory"
+
+    @contextmanager
+    def startup(self) -> Iterator[None]:
+        """
+        Time startup of the worker.
+
+        :yield: nothing, startup runs within the block.
+        """
+        started_at = time.perf_counter()
+        yield
+        self.startup_seconds = time.perf_counter() - started_at
+        self.private_memory_kib = _private_memory_kib()
+        logger.info(f"Worker {os.getpid()} {self}.")
+
+    def first_request(self, seconds: float) -> None:
+        """
+        Record latency of the first request of the worker.
+
+        :param seconds: time the request took.
+        """
+        self.first_request_seconds = seconds
+        pid = os.getpid()
+        logger.info(f"Worker {pid} served its first request in {seconds:.3f}s.")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Report along with the worker it belongs to.
+
+        :return: report fields and pid of the worker.
+        """
+        return {"pid": os.getpid(), **vars(self)}
+
+
+class AppFactory:
+    """
+    Builds the app once, on the first call or ahead of time.
+
+    Gunicorn calls ``build`` in the master when the app is preloaded,
+    workers forked from it share the app copy-on-write, uvicorn
+    just gets the same app from every call.
+    Connections are only opened by startup events, which run
+    in every worker after the fork.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], FastAPI],
+        app_import_seconds: float,
+    ) -> None:
+        self.factory = factory
+        self.app_import_seconds = app_import_seconds
+        self._app: Optional[FastAPI] = None
+
+    def __call__(self) -> FastAPI:
+        """
+        Get the app, building it if it wasn't yet.
+
+        :return: application.
+        """
+        if self._app is None:
+            return self.build(preloaded=False)
+        return self._app
+
+    def build(self, preloaded: bool) -> FastAPI:
+        """
+        Build the app along with its middleware stack.
+
+        :param preloaded: whether it's built before workers are forked.
+        :return: application.
+        """
+        started_at = time.perf_counter()
+        app = self.factory()
+        app.middleware_stack = app.build_middleware_stack()
+        report = app.state.startup_report
+        report.preloaded = preloaded
+        report.app_import_seconds = self.app_import_seconds
+        report.build_seconds = time.perf_counter() - started_at
+        self._app = app
+        return app
+
+
+class FirstRequestTimer:
+    """
+    Measures latency of the first HTTP request of the worker.
+
+    It's a plain ASGI middleware, every later request
+    only costs it a single check.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._timed = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handle a request.
+
+        :param scope: ASGI scope.
+        :param receive: ASGI receive channel.
+        :param send: ASGI send channel.
+        """
+        if self._timed or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self._timed = True
+        started_at = time.perf_counter()
+        try:  # noqa: WPS501
+            await self.app(scope, receive, send)
+        finally:
+            report = scope["app"].state.startup_report
+            report.first_request(time.perf_counter() - started_at)
+
+
+def get_startup_report(request: Request) -> StartupReport:
+    """
+    Get startup report of the current worker.
+
+    :param request: current request.
+    :return: startup report.
+    """
+    return request.app.state.startup_report
+
+
+def _seconds(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds:.3f}s"
+
+
+def _private_memory_kib() -> Optional[int]:
+    try:
+        lines = SMAPS_ROLLUP.read_text().splitlines()
+    except OSError:
+        return None
+    return sum(
+        int(line.split()[1]) for line in lines if line.startswith(PRIVATE_MEMORY_FIELDS)
+    )